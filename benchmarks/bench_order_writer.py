@@ -0,0 +1,66 @@
+# benchmarks/bench_order_writer.py
+"""Compare one-commit-per-order saving with the group-commit OrderWriter.
+
+Run from the project root:  python -m benchmarks.bench_order_writer [orders]
+Uses a throwaway database, never canteen.db.
+"""
+import os
+import sys
+import tempfile
+import threading
+import time
+
+from src.core import database
+from src.core.order_writer import OrderWriter
+
+ITEMS = [
+    {'id': 1, 'name': 'Tea', 'price': 10.0, 'qty': 2, 'total': 20.0},
+    {'id': 3, 'name': 'Sandwich', 'price': 30.0, 'qty': 1, 'total': 30.0},
+]
+
+def use_temp_db(directory, name):
+    database.DB_PATH = os.path.join(directory, name)
+    database.init_db()
+
+def bench_per_order(n, synchronous):
+    conn = database.get_db_connection()
+    conn.execute(f"PRAGMA synchronous = {synchronous}")
+    start = time.perf_counter()
+    for _ in range(n):
+        database.save_completed_order(ITEMS, 52.5)
+    return time.perf_counter() - start
+
+def bench_group_commit(n):
+    writer = OrderWriter()
+    writer.start()
+    latencies = []
+    start = time.perf_counter()
+    for _ in range(n):
+        t = time.perf_counter()
+        writer.submit(ITEMS, 52.5)      # What the cashier waits for
+        latencies.append(time.perf_counter() - t)
+    writer.flush()
+    elapsed = time.perf_counter() - start
+    writer.stop()
+    return elapsed, max(latencies), writer.batches
+
+def main(n=2000):
+    with tempfile.TemporaryDirectory() as tmp:
+        results = {}
+        for synchronous in ("FULL", "NORMAL"):
+            use_temp_db(tmp, f"per_order_{synchronous}.db")
+            results[f"per-order commit (synchronous={synchronous})"] = bench_per_order(n, synchronous)
+
+        use_temp_db(tmp, "group.db")
+        elapsed, worst_submit, batches = bench_group_commit(n)
+        results["group commit (synchronous=FULL)"] = elapsed
+        database.close_db_connection()
+
+    print(f"{n} orders")
+    for name, seconds in results.items():
+        print(f"  {name:<42} {seconds:7.3f}s  {n / seconds:9.0f} orders/s")
+    print(f"  group commit: {batches} transactions, worst submit() {worst_submit * 1000:.2f} ms")
+    return results
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 2000)
@@ -0,0 +1,234 @@
+# benchmarks/datagen.py
+"""Deterministic synthetic canteen data for benchmarks.
+
+Fills a database with a menu and an order history shaped like a real
+college canteen: a breakfast bump, a big lunch rush, an evening tea
+peak, quiet weekends, a few best sellers and many rarely ordered items.
+The same seed, sizes and end day always produce the same database.
+
+Run from the project root:
+    python -m benchmarks.datagen path/to/bench.db --items 500 --orders 100000
+Never point it at canteen.db: the target file must not exist yet.
+"""
+import argparse
+import json
+import math
+import os
+import random
+import sys
+import time
+from datetime import date, datetime, timedelta
+
+from src.core import database
+
+DEFAULT_SEED = 42
+ORDERS_PER_DAY = 800
+CHUNK_ORDERS = 20000
+
+# Relative number of orders per opening hour
+HOUR_WEIGHTS = {
+    8: 0.6, 9: 0.9, 10: 0.6, 11: 1.3, 12: 3.6, 13: 3.1,
+    14: 1.0, 15: 0.7, 16: 1.3, 17: 0.9, 18: 0.4,
+}
+# Monday..Sunday
+WEEKDAY_WEIGHTS = [1.0, 1.0, 1.0, 1.0, 0.9, 0.35, 0.15]
+BASKET_SIZES = {1: 45, 2: 30, 3: 15, 4: 7, 5: 3}
+LINE_QTYS = {1: 80, 2: 15, 3: 4, 4: 1}
+
+CATEGORIES = {
+    "Drinks": (["Tea", "Coffee", "Lassi", "Lime Soda", "Cold Coffee", "Juice", "Milk", "Buttermilk"], (10, 60)),
+    "Snacks": (["Samosa", "Vada Pav", "Sandwich", "Puff", "Biscuit", "Pakora", "Cutlet", "Spring Roll"], (5, 50)),
+    "Meals": (["Veg Thali", "Fried Rice", "Noodles", "Biryani", "Rajma Rice", "Chole Bhature", "Paratha", "Dosa"], (40, 150)),
+    "Desserts": (["Gulab Jamun", "Ice Cream", "Kheer", "Brownie", "Jalebi", "Halwa"], (15, 70)),
+}
+VARIANTS = ["", "Masala", "Special", "Cheese", "Jumbo", "Mini", "Paneer", "Spicy", "Classic", "Butter"]
+
+def _cum_weights(weights):
+    total, cum = 0.0, []
+    for w in weights:
+        total += w
+        cum.append(total)
+    return cum
+
+def make_menu(rng, n_items):
+    """Return [(name, category, price, stock_quantity)] with unique names."""
+    bases = [(base, category, price_range)
+             for category, (names, price_range) in CATEGORIES.items()
+             for base in names]
+    rng.shuffle(bases)
+    items = []
+    seen = set()
+    i = 0
+    while len(items) < n_items:
+        base, category, (low, high) = bases[i % len(bases)]
+        variant = VARIANTS[(i // len(bases)) % len(VARIANTS)]
+        name = f"{variant} {base}".strip()
+        round_no = i // (len(bases) * len(VARIANTS))
+        if round_no:
+            name = f"{name} {round_no + 1}"
+        i += 1
+        if name in seen:
+            continue
+        seen.add(name)
+        price = float(rng.randrange(low, high + 1, 5))
+        # Most items are made to order (999 = unlimited), packaged ones are counted
+        stock = 999 if rng.random() < 0.8 else rng.randrange(20, 500)
+        items.append((name, category, price, stock))
+    return items
+
+def day_counts(rng, n_orders, days, end_day):
+    """Split n_orders over the days ending at end_day, following WEEKDAY_WEIGHTS."""
+    day_list = [end_day - timedelta(days=offset) for offset in range(days - 1, -1, -1)]
+    weights = [WEEKDAY_WEIGHTS[d.weekday()] * rng.uniform(0.85, 1.15) for d in day_list]
+    total = sum(weights)
+    counts = [int(n_orders * w / total) for w in weights]
+    # Hand out the rounding remainder to the busiest days
+    for i in sorted(range(days), key=lambda i: -weights[i])[:n_orders - sum(counts)]:
+        counts[i] += 1
+    return list(zip(day_list, counts))
+
+def iter_orders(rng, menu, n_orders, days, end_day):
+    """Yield (date_time, total, items) in time order; item ids are menu positions + 1."""
+    hours = list(HOUR_WEIGHTS)
+    hour_cum = _cum_weights(HOUR_WEIGHTS.values())
+    sizes = list(BASKET_SIZES)
+    size_cum = _cum_weights(BASKET_SIZES.values())
+    qtys = list(LINE_QTYS)
+    qty_cum = _cum_weights(LINE_QTYS.values())
+    # Zipf-like popularity: a handful of best sellers, a long tail
+    ranked = list(range(len(menu)))
+    rng.shuffle(ranked)
+    popularity_cum = _cum_weights(1.0 / (rank + 1) ** 0.9 for rank in range(len(menu)))
+
+    for day, count in day_counts(rng, n_orders, days, end_day):
+        if not count:
+            continue
+        midnight = datetime.combine(day, datetime.min.time())
+        seconds = sorted(
+            hour * 3600 + rng.randrange(3600)
+            for hour in rng.choices(hours, cum_weights=hour_cum, k=count)
+        )
+        for second in seconds:
+            date_time = (midnight + timedelta(seconds=second)).strftime("%Y-%m-%d %H:%M:%S")
+            size = min(rng.choices(sizes, cum_weights=size_cum)[0], len(menu))
+            picked = {}
+            for position in rng.choices(ranked, cum_weights=popularity_cum, k=size):
+                picked[position] = picked.get(position, 0) + rng.choices(qtys, cum_weights=qty_cum)[0]
+            items = []
+            total = 0.0
+            for position, qty in picked.items():
+                name, _, price, _ = menu[position]
+                items.append({'id': position + 1, 'name': name, 'price': price,
+                              'qty': qty, 'total': price * qty})
+                total += price * qty
+            yield date_time, total, items
+
+def generate(path, n_items=200, n_orders=10000, days=None, n_held=30, seed=DEFAULT_SEED,
+             end_day=None, progress=None):
+    """Create a new benchmark database at path; returns its metadata dict.
+
+    days defaults to about ORDERS_PER_DAY orders a day; end_day defaults
+    to today so "today" reports have data.
+    """
+    if os.path.exists(path):
+        raise FileExistsError(f"{path} already exists")
+    if n_items < 1:
+        raise ValueError("n_items must be at least 1")
+    days = days or max(1, math.ceil(n_orders / ORDERS_PER_DAY))
+    end_day = end_day or date.today()
+    rng = random.Random(seed)
+
+    database.DB_PATH = path
+    database.init_db()
+    conn = database.get_db_connection()
+    conn.execute("PRAGMA synchronous = OFF")   # Throwaway data, load fast
+    cursor = conn.cursor()
+
+    # Replace the sample menu
+    cursor.execute("DELETE FROM items")
+    cursor.execute("DELETE FROM sqlite_sequence WHERE name = 'items'")
+    menu = make_menu(rng, n_items)
+    cursor.executemany(
+        "INSERT INTO items (id, name, category, price, stock_quantity) VALUES (?, ?, ?, ?, ?)",
+        [(i + 1, *item) for i, item in enumerate(menu)]
+    )
+    conn.commit()
+
+    orders, lines = [], []
+    order_id = 0
+    for date_time, total, items in iter_orders(rng, menu, n_orders, days, end_day):
+        order_id += 1
+        orders.append((order_id, date_time, total, json.dumps(items)))
+        lines.extend((order_id, item['id'], item['name'], item['price'], item['qty'], item['total'])
+                     for item in items)
+        if len(orders) >= CHUNK_ORDERS:
+            _flush(cursor, orders, lines)
+            conn.commit()
+            if progress:
+                progress(order_id, n_orders)
+    _flush(cursor, orders, lines)
+    if progress:
+        progress(order_id, n_orders)
+
+    database.rebuild_rollups(cursor)
+
+    # Parked carts from the last couple of hours
+    now = datetime.now()
+    held = []
+    for _ in range(n_held):
+        _, _, items = next(iter_orders(rng, menu, 1, 1, end_day))
+        stamp = (now - timedelta(seconds=rng.randrange(7200))).strftime("%Y-%m-%d %H:%M:%S")
+        held.append((stamp, stamp, sum(item['total'] for item in items), json.dumps(items)))
+    cursor.executemany(
+        "INSERT INTO held_orders (created_at, updated_at, total_amount, items_json) VALUES (?, ?, ?, ?)",
+        held
+    )
+    conn.commit()
+    conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+    conn.execute("ANALYZE")
+    database.close_db_connection()
+
+    return {
+        'items': n_items, 'orders': order_id, 'held': n_held, 'days': days,
+        'seed': seed, 'end_day': end_day.isoformat(),
+    }
+
+def _flush(cursor, orders, lines):
+    cursor.executemany(
+        "INSERT INTO orders (order_id, date_time, total_amount, items_json, status) "
+        "VALUES (?, ?, ?, ?, 'completed')",
+        orders
+    )
+    cursor.executemany(
+        "INSERT INTO order_lines (order_id, item_id, name, unit_price, qty, line_total) "
+        "VALUES (?, ?, ?, ?, ?, ?)",
+        lines
+    )
+    orders.clear()
+    lines.clear()
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Generate a synthetic canteen database")
+    parser.add_argument("path", help="new database file (must not exist)")
+    parser.add_argument("--items", type=int, default=200, help="menu size (10 to 5,000)")
+    parser.add_argument("--orders", type=int, default=10000, help="order history size (1k to 5M)")
+    parser.add_argument("--days", type=int, default=None, help=f"days of history (default: ~{ORDERS_PER_DAY} orders/day)")
+    parser.add_argument("--held", type=int, default=30, help="held carts")
+    parser.add_argument("--seed", type=int, default=DEFAULT_SEED)
+    parser.add_argument("--end-day", type=date.fromisoformat, default=None, help="last day of history (YYYY-MM-DD)")
+    args = parser.parse_args(argv)
+
+    started = time.perf_counter()
+
+    def progress(done, total):
+        print(f"\r  {done:,}/{total:,} orders", end="", file=sys.stderr, flush=True)
+
+    meta = generate(args.path, args.items, args.orders, args.days, args.held, args.seed,
+                    args.end_day, progress)
+    print(file=sys.stderr)
+    print(f"✅ {meta['orders']:,} orders over {meta['days']} days, {meta['items']} items "
+          f"in {time.perf_counter() - started:.1f}s → {args.path}")
+    return meta
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,225 @@
+# benchmarks/run.py
+"""Time the POS hot paths on synthetic data and write the results to JSON.
+
+Run from the project root:
+    python -m benchmarks.run --items 500 --orders 100000
+    python -m benchmarks.run --orders 1000000 --compare benchmarks/results/<older>.json
+
+Generated databases are cached in benchmarks/.data/ by size and seed, so
+large histories are only built once. Read benchmarks run on the cached
+database; write benchmarks run on a copy. canteen.db is never touched.
+"""
+import argparse
+import json
+import os
+import platform
+import shutil
+import sqlite3
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import date, datetime, timedelta
+
+from src.core import database
+from . import datagen
+from .bench_order_writer import bench_group_commit
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+DATA_DIR = os.path.join(BENCH_DIR, ".data")
+RESULTS_DIR = os.path.join(BENCH_DIR, "results")
+FULL_SCAN_LIMIT = 500000   # get_all_orders / full export load everything; skip above this
+SLOWER_THRESHOLD = 1.10    # --compare flags medians more than 10% slower
+
+def timed(fn, repeat):
+    """Run fn repeat times; returns timing stats in milliseconds."""
+    runs = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        runs.append((time.perf_counter() - start) * 1000)
+    runs.sort()
+    return {
+        'runs': repeat,
+        'min_ms': runs[0],
+        'median_ms': statistics.median(runs),
+        'p95_ms': runs[min(len(runs) - 1, int(len(runs) * 0.95))],
+        'max_ms': runs[-1],
+    }
+
+def dataset_path(args):
+    end_day = args.end_day or date.today()
+    name = f"items{args.items}_orders{args.orders}_seed{args.seed}_{end_day:%Y%m%d}.db"
+    return os.path.join(DATA_DIR, name)
+
+def use_db(path):
+    database.DB_PATH = path
+    database.init_db()   # Cached databases may predate newer migrations
+    database.reload_settings()
+
+def sample_cart(items=3):
+    conn = database.get_db_connection()
+    rows = conn.execute(
+        "SELECT id, name, price FROM items ORDER BY id LIMIT ?", (items,)
+    ).fetchall()
+    conn.close()
+    return {(name, price): {'id': item_id, 'name': name, 'price': price, 'qty': 2}
+            for item_id, name, price in rows}
+
+def bench_reads(meta, repeat, results, skipped):
+    from src.core.export import export_sales_csv
+    from src.core.printer import render_receipt
+
+    end_day = date.fromisoformat(meta['end_day'])
+    month_ago = end_day - timedelta(days=29)
+    month_start, _ = database.day_bounds(month_ago)
+    _, month_end = database.day_bounds(end_day)
+
+    results['get_held_orders'] = timed(database.get_held_orders, repeat)
+    results['get_daily_summary'] = timed(lambda: database.get_daily_summary(end_day), repeat)
+    results['get_most_sold_items (all time)'] = timed(database.get_most_sold_items, repeat)
+    results['get_most_sold_items (30 days)'] = timed(
+        lambda: database.get_most_sold_items(5, month_ago, end_day), repeat)
+    results['get_orders_page (first page)'] = timed(database.get_orders_page, repeat)
+    try:
+        from src.core.analytics import sales_analytics
+        year_ago = end_day - timedelta(days=364)
+        results['sales_analytics (365 days)'] = timed(lambda: sales_analytics(year_ago, end_day), repeat)
+    except ImportError:
+        pass   # numpy is optional
+
+    with tempfile.TemporaryDirectory() as tmp:
+        out = os.path.join(tmp, "sales.csv")
+        results['export_sales_csv (30 days)'] = timed(
+            lambda: export_sales_csv(out, month_start, month_end), repeat)
+        if meta['orders'] <= FULL_SCAN_LIMIT:
+            results['export_sales_csv (all)'] = timed(lambda: export_sales_csv(out), max(1, repeat // 3))
+        else:
+            skipped.append('export_sales_csv (all)')
+
+    if meta['orders'] <= FULL_SCAN_LIMIT:
+        results['get_all_orders'] = timed(database.get_all_orders, max(1, repeat // 3))
+    else:
+        skipped.append('get_all_orders')
+
+    cart = sample_cart()
+    subtotal = sum(item['price'] * item['qty'] for item in cart.values())
+    render_receipt(cart, subtotal, 0.0, subtotal)   # Build the cached template first
+    results['render_receipt'] = timed(
+        lambda: render_receipt(cart, subtotal, 0.0, subtotal, 500.0, 1), repeat * 20)
+
+def bench_writes(repeat, results):
+    items = [{'id': item['id'], 'name': item['name'], 'price': item['price'],
+              'qty': item['qty'], 'total': item['price'] * item['qty']}
+             for item in sample_cart().values()]
+    total = sum(item['total'] for item in items)
+    results['save_completed_order'] = timed(lambda: database.save_completed_order(items, total), repeat * 10)
+
+    n = repeat * 100
+    elapsed, worst_submit, batches = bench_group_commit(n)
+    results['order_writer (group commit)'] = {
+        'orders': n,
+        'batches': batches,
+        'per_order_ms': elapsed * 1000 / n,
+        'worst_submit_ms': worst_submit * 1000,
+    }
+
+def git_revision():
+    try:
+        rev = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True,
+                             text=True, check=True).stdout.strip()
+        dirty = bool(subprocess.run(["git", "status", "--porcelain", "--untracked-files=no"],
+                                    capture_output=True, text=True).stdout.strip())
+        return rev, dirty
+    except (OSError, subprocess.CalledProcessError):
+        return None, None
+
+def headline(stats):
+    """The number compared across runs for one result."""
+    return stats.get('median_ms', stats.get('per_order_ms'))
+
+def compare(old_path, results):
+    with open(old_path, encoding='utf-8') as f:
+        old = json.load(f)
+    print(f"\nCompared with {old_path} ({old['meta'].get('commit')}):")
+    for name, stats in results.items():
+        before = old['results'].get(name)
+        if before is None:
+            continue
+        old_ms, new_ms = headline(before), headline(stats)
+        ratio = new_ms / old_ms if old_ms else float('inf')
+        flag = "  ⚠️ slower" if ratio > SLOWER_THRESHOLD else ""
+        print(f"  {name:<36} {old_ms:10.3f} → {new_ms:10.3f} ms  x{ratio:5.2f}{flag}")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the POS hot paths")
+    parser.add_argument("--items", type=int, default=200, help="menu size (10 to 5,000)")
+    parser.add_argument("--orders", type=int, default=10000, help="order history size (1k to 5M)")
+    parser.add_argument("--seed", type=int, default=datagen.DEFAULT_SEED)
+    parser.add_argument("--end-day", type=date.fromisoformat, default=None)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--out", default=None, help="results file (default: benchmarks/results/<time>-<commit>.json)")
+    parser.add_argument("--compare", default=None, help="earlier results file to compare against")
+    args = parser.parse_args(argv)
+
+    path = dataset_path(args)
+    meta_path = path + ".json"
+    if not os.path.exists(meta_path):
+        os.makedirs(DATA_DIR, exist_ok=True)
+        if os.path.exists(path):
+            os.remove(path)   # Left over from an interrupted run
+        print(f"Generating {args.orders:,} orders, {args.items} items...")
+        meta = datagen.generate(path, args.items, args.orders, seed=args.seed, end_day=args.end_day)
+        with open(meta_path, 'w', encoding='utf-8') as f:
+            json.dump(meta, f)
+    with open(meta_path, encoding='utf-8') as f:
+        meta = json.load(f)
+
+    results, skipped = {}, []
+    use_db(path)
+    bench_reads(meta, args.repeat, results, skipped)
+    database.close_db_connection()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        copy = os.path.join(tmp, "bench.db")
+        shutil.copyfile(path, copy)
+        use_db(copy)
+        bench_writes(args.repeat, results)
+        database.close_db_connection()
+
+    commit, dirty = git_revision()
+    report = {
+        'meta': {
+            **meta,
+            'commit': commit,
+            'dirty': dirty,
+            'timestamp': datetime.now().isoformat(timespec='seconds'),
+            'python': platform.python_version(),
+            'sqlite': sqlite3.sqlite_version,
+            'platform': platform.platform(),
+            'repeat': args.repeat,
+            'skipped': skipped,
+        },
+        'results': results,
+    }
+    out = args.out
+    if out is None:
+        os.makedirs(RESULTS_DIR, exist_ok=True)
+        out = os.path.join(RESULTS_DIR, f"{datetime.now():%Y%m%d-%H%M%S}-{commit or 'nogit'}.json")
+    with open(out, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2)
+
+    print(f"{meta['orders']:,} orders, {meta['items']} items, {meta['days']} days")
+    for name, stats in results.items():
+        print(f"  {name:<36} {headline(stats):10.3f} ms")
+    if skipped:
+        print(f"  skipped above {FULL_SCAN_LIMIT:,} orders: {', '.join(skipped)}")
+    print(f"✅ Results written to {out}")
+
+    if args.compare:
+        compare(args.compare, results)
+    return report
+
+if __name__ == "__main__":
+    main()
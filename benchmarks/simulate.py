@@ -0,0 +1,303 @@
+# benchmarks/simulate.py
+"""Headless lunch-rush simulator: N virtual cashiers sharing one database.
+
+Each cashier builds carts, holds and resumes orders and checks out
+through src.models.cart.Cart, the same code MainWindow uses, without Qt.
+It reports throughput, checkout latency percentiles and how often SQLite
+was busy.
+
+Run from the project root:
+    python -m benchmarks.simulate --cashiers 4 --orders 500
+    python -m benchmarks.simulate --cashiers 6 --mode threads --think-ms 3000
+    python -m benchmarks.simulate --cashiers 4 --mode server
+
+By default a throwaway database is generated. --db runs against a real
+file instead, so only point it at a copy of canteen.db.
+  processes: one process per cashier, each with its own order writer,
+             like separate counters sharing a database file (default)
+  threads:   all cashiers in one process sharing one writer and ledger
+  server:    one process per cashier, all talking to an order server
+             (src/core/order_server.py) that owns the database
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import random
+import socket
+import sqlite3
+import tempfile
+import threading
+import time
+
+from src.core import database
+from . import datagen
+
+BUSY_BACKOFF = 0.01
+BUSY_MAX_RETRIES = 20
+
+def percentile(sorted_values, p):
+    """Nearest-rank percentile of an already sorted list (0 if empty)."""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, int(round(p / 100.0 * len(sorted_values))))
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+def new_stats():
+    return {
+        'checkouts': 0, 'failed': 0, 'holds': 0, 'resumes': 0, 'out_of_stock': 0,
+        'busy_retries': 0, 'checkout_ms': [], 'commit_ms': [],
+        'started': None, 'finished': None,
+    }
+
+def retry_busy(fn, stats, can_retry=lambda: True):
+    """Call fn, retrying while SQLite reports busy/locked; counts the retries."""
+    for attempt in range(BUSY_MAX_RETRIES + 1):
+        try:
+            return fn()
+        except sqlite3.OperationalError as e:
+            message = str(e).lower()
+            if ("locked" not in message and "busy" not in message) \
+                    or attempt == BUSY_MAX_RETRIES or not can_retry():
+                raise
+            stats['busy_retries'] += 1
+            time.sleep(BUSY_BACKOFF * (2 ** min(attempt, 6)))
+
+def load_menu(store=database):
+    rows = sorted(store.get_menu_items())
+    return [(row[0], row[1], row[2]) for row in rows]
+
+def run_cashier(number, orders, seed, writer, hold_rate=0.1, think_ms=0.0, receipts=True, ledger=None,
+                store=database):
+    """Serve customers until orders checkouts are done; returns a stats dict."""
+    from src.models.cart import Cart
+    if receipts:
+        from src.core.printer import render_receipt
+
+    rng = random.Random(seed * 1000 + number)
+    menu = load_menu(store)
+    ranked = list(range(len(menu)))
+    rng.shuffle(ranked)
+    popularity_cum = datagen._cum_weights(1.0 / (rank + 1) ** 0.9 for rank in range(len(menu)))
+    sizes = list(datagen.BASKET_SIZES)
+    size_cum = datagen._cum_weights(datagen.BASKET_SIZES.values())
+
+    cart = Cart(f"till-{number}", ledger=ledger, writer=writer, store=store)
+    stats = new_stats()
+    # Like the till, don't wait for the commit; the writer reports it later
+    submitted = {}   # order_id: perf_counter at checkout
+    written = {}     # order_id: (perf_counter at commit, ok)
+
+    def on_written(order_id, ok, error):
+        written[order_id] = (time.perf_counter(), ok)
+        cart.order_written(order_id, ok)
+
+    writer.add_listener(on_written)
+    parked = []   # This cashier's held orders, oldest first
+    stats['started'] = time.time()
+    while stats['checkouts'] < orders:
+        if parked and rng.random() < 0.5:
+            # F2: list held orders, resume the oldest
+            retry_busy(store.get_held_orders, stats)
+            held_id = parked.pop(0)
+            if retry_busy(lambda: cart.resume(held_id), stats) is not None:
+                stats['resumes'] += 1
+        else:
+            size = rng.choices(sizes, cum_weights=size_cum)[0]
+            for position in rng.choices(ranked, cum_weights=popularity_cum, k=size):
+                item_id, name, price = menu[position]
+                if cart.add(item_id, name, price) is None:
+                    stats['out_of_stock'] += 1
+        if not cart.items:
+            continue
+
+        if think_ms:
+            time.sleep(rng.expovariate(1000.0 / think_ms))
+
+        if rng.random() < hold_rate:
+            parked.append(retry_busy(cart.hold, stats))
+            stats['holds'] += 1
+            continue
+
+        subtotal, _, tax, total = cart.totals()
+        snapshot = cart.snapshot()
+        start = time.perf_counter()
+        # Only retry while nothing has been submitted (the cart is still full)
+        ticket = retry_busy(cart.checkout, stats, can_retry=lambda: bool(cart.items))
+        if receipts:
+            render_receipt(snapshot, subtotal, tax, total, total, ticket.order_id)
+        stats['checkout_ms'].append((time.perf_counter() - start) * 1000)
+        submitted[ticket.order_id] = start
+        stats['checkouts'] += 1
+
+    writer.flush()
+    stats['finished'] = time.time()
+    for order_id, start in submitted.items():
+        committed_at, ok = written[order_id]
+        if ok:
+            stats['commit_ms'].append((committed_at - start) * 1000)
+        else:
+            stats['checkouts'] -= 1
+            stats['failed'] += 1
+    database.close_db_connection()
+    return stats
+
+def _process_cashier(job):
+    """Process-mode worker: one counter with its own writer and stock ledger."""
+    from src.core.order_writer import OrderWriter
+    db_path, number, kwargs = job
+    database.DB_PATH = db_path
+    writer = OrderWriter()
+    writer.start()
+    try:
+        stats = run_cashier(number, writer=writer, **kwargs)
+    finally:
+        writer.stop()
+    stats['busy_retries'] += writer.busy_retries
+    return stats
+
+def _server_cashier(job):
+    """Server-mode worker: one counter connected to the order server."""
+    from src.core.order_client import OrderClient
+    from src.core.stock_ledger import StockLedger
+    address, number, kwargs = job
+    client = OrderClient(address)
+    client.connect()
+    ledger = StockLedger(store=client)
+    ledger.refresh()
+    ledger.sync_held()
+    # Other counters' sales arrive as pushed stock updates
+    client.add_listener(lambda event, data: event == "stock" and ledger.update_stock(data))
+    try:
+        return run_cashier(number, writer=client.writer, ledger=ledger, store=client, **kwargs)
+    finally:
+        client.close()
+
+def run_server(db_path, cashiers, kwargs):
+    import asyncio
+    from src.core.order_server import OrderServer
+    address = "unix:" + os.path.join(os.path.dirname(db_path), "orders.sock") \
+        if hasattr(socket, "AF_UNIX") else "127.0.0.1:0"
+    server = OrderServer(address)
+    loop = asyncio.new_event_loop()
+    started = threading.Event()
+
+    def serve():
+        asyncio.set_event_loop(loop)
+        loop.run_until_complete(server.start())
+        started.set()
+        loop.run_forever()
+
+    thread = threading.Thread(target=serve, name="order-server", daemon=True)
+    thread.start()
+    started.wait()
+    if address.endswith(":0"):
+        address = "127.0.0.1:%d" % server._server.sockets[0].getsockname()[1]
+    try:
+        with multiprocessing.Pool(cashiers) as pool:
+            results = pool.map(_server_cashier, [(address, n, kwargs) for n in range(cashiers)])
+    finally:
+        asyncio.run_coroutine_threadsafe(server.close(), loop).result()
+        loop.call_soon_threadsafe(loop.stop)
+        thread.join()
+    print(f"  server: {server.writer.orders:,} orders in {server.writer.batches:,} batches")
+    return results
+
+def run_threads(cashiers, kwargs):
+    from src.core.order_writer import OrderWriter
+    writer = OrderWriter()
+    writer.start()
+    results = [None] * cashiers
+
+    def work(number):
+        results[number] = run_cashier(number, writer=writer, **kwargs)
+
+    threads = [threading.Thread(target=work, args=(n,), name=f"cashier-{n}") for n in range(cashiers)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    writer.stop()
+    results[0]['busy_retries'] += writer.busy_retries
+    return results
+
+def run_processes(db_path, cashiers, kwargs):
+    with multiprocessing.Pool(cashiers) as pool:
+        return pool.map(_process_cashier, [(db_path, n, kwargs) for n in range(cashiers)])
+
+def summarize(results, cashiers, mode):
+    checkout_ms = sorted(ms for stats in results for ms in stats['checkout_ms'])
+    commit_ms = sorted(ms for stats in results for ms in stats['commit_ms'])
+    checkouts = sum(stats['checkouts'] for stats in results)
+    wall = max(stats['finished'] for stats in results) - min(stats['started'] for stats in results)
+    report = {
+        'mode': mode,
+        'cashiers': cashiers,
+        'checkouts': checkouts,
+        'seconds': wall,
+        'orders_per_second': checkouts / wall if wall else 0.0,
+        'checkout_ms': {p: percentile(checkout_ms, int(p[1:])) for p in ('p50', 'p95', 'p99')},
+        'commit_ms': {p: percentile(commit_ms, int(p[1:])) for p in ('p50', 'p95', 'p99')},
+    }
+    report['checkout_ms']['max'] = checkout_ms[-1] if checkout_ms else 0.0
+    report['commit_ms']['max'] = commit_ms[-1] if commit_ms else 0.0
+    for key in ('failed', 'holds', 'resumes', 'out_of_stock', 'busy_retries'):
+        report[key] = sum(stats[key] for stats in results)
+    return report
+
+def print_report(report):
+    print(f"{report['cashiers']} cashier(s), {report['mode']}: {report['checkouts']:,} checkouts "
+          f"in {report['seconds']:.2f}s")
+    print(f"  throughput       {report['orders_per_second']:8.1f} orders/s "
+          f"({report['orders_per_second'] * 60:,.0f}/min)")
+    for name, label in (('checkout_ms', 'checkout (bill)'), ('commit_ms', 'checkout (on disk)')):
+        stats = report[name]
+        print(f"  {label:<18} p50 {stats['p50']:7.2f}  p95 {stats['p95']:7.2f}  "
+              f"p99 {stats['p99']:7.2f}  max {stats['max']:7.2f} ms")
+    print(f"  SQLITE_BUSY retries {report['busy_retries']}, failed {report['failed']}, "
+          f"holds {report['holds']}, resumes {report['resumes']}, out of stock {report['out_of_stock']}")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Simulate several cashiers during the lunch rush")
+    parser.add_argument("--cashiers", type=int, default=4)
+    parser.add_argument("--orders", type=int, default=300, help="checkouts per cashier")
+    parser.add_argument("--mode", choices=("processes", "threads", "server"), default="processes")
+    parser.add_argument("--hold-rate", type=float, default=0.1, help="share of carts held before checkout")
+    parser.add_argument("--think-ms", type=float, default=0.0, help="mean pause before checkout (0 = flat out)")
+    parser.add_argument("--no-receipts", action="store_true", help="skip receipt rendering")
+    parser.add_argument("--seed", type=int, default=datagen.DEFAULT_SEED)
+    parser.add_argument("--db", default=None, help="existing database to use (writes orders to it!)")
+    parser.add_argument("--items", type=int, default=200, help="menu size of the generated database")
+    parser.add_argument("--history", type=int, default=10000, help="past orders in the generated database")
+    parser.add_argument("--out", default=None, help="also write the report to this JSON file")
+    args = parser.parse_args(argv)
+
+    kwargs = {
+        'orders': args.orders, 'seed': args.seed, 'hold_rate': args.hold_rate,
+        'think_ms': args.think_ms, 'receipts': not args.no_receipts,
+    }
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = args.db
+        if db_path is None:
+            db_path = os.path.join(tmp, "rush.db")
+            datagen.generate(db_path, args.items, args.history, seed=args.seed)
+        database.DB_PATH = db_path
+        database.init_db()
+        database.close_db_connection()
+
+        if args.mode == "threads":
+            results = run_threads(args.cashiers, kwargs)
+        elif args.mode == "server":
+            results = run_server(db_path, args.cashiers, kwargs)
+        else:
+            results = run_processes(db_path, args.cashiers, kwargs)
+
+    report = summarize(results, args.cashiers, args.mode)
+    print_report(report)
+    if args.out:
+        with open(args.out, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+    return report
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+# src/core/analytics.py
+import numpy as np
+
+WEEKDAYS = ["Mon", "Tue", "Wed", "Thu", "Fri", "Sat", "Sun"]
+
+def _days(day_strings):
+    return np.array(day_strings, dtype="datetime64[D]")
+
+def _periods(days, start_day, end_day):
+    """Bucket days into day/week/month periods; returns (kind, index per day, labels)."""
+    start = np.datetime64(start_day, "D")
+    span = (end_day - start_day).days + 1
+    if span <= 31:
+        index = (days - start).astype(np.int64)
+        labels = [str(start + i) for i in range(span)]
+        return "day", index, labels
+    if span <= 26 * 7:
+        index = (days - start).astype(np.int64) // 7
+        labels = [f"Wk {start + 7 * i}" for i in range(-(-span // 7))]
+        return "week", index, labels
+    first = start.astype("datetime64[M]")
+    index = (days.astype("datetime64[M]") - first).astype(np.int64)
+    months = (np.datetime64(end_day, "M") - first).astype(np.int64) + 1
+    labels = [str(first + i) for i in range(months)]
+    return "month", index, labels
+
+def _ratio(a, b):
+    return np.divide(a, b, out=np.zeros(len(a)), where=b > 0)
+
+def sales_analytics(start_day, end_day, store=None):
+    """Sales analytics for start_day..end_day inclusive, from the rollups.
+
+    Returns a dict:
+      orders, revenue, units, avg_basket_units, avg_order_value (totals)
+      heat_orders / heat_revenue / heat_units: 7 x 24 arrays, weekday
+        (Mon = 0) by hour of day
+      period: "day", "week" or "month" (picked from the range length),
+        period_labels, and per period: period_orders, period_revenue,
+        period_units, period_basket_units, period_order_value
+      categories, category_revenue / category_units: categories x periods
+    """
+    if store is None:
+        from . import database as store
+    # ISO strings, not dates: store may be an OrderClient, which sends JSON
+    hourly = store.get_hourly_rollup(start_day.isoformat(), end_day.isoformat())
+    by_category = store.get_category_daily(start_day.isoformat(), end_day.isoformat())
+
+    if hourly:
+        day_strings, hours, orders, revenue, units = zip(*hourly)
+        days = _days(day_strings)
+        hours = np.array(hours, dtype=np.int64)
+        orders = np.array(orders, dtype=np.float64)
+        revenue = np.array(revenue, dtype=np.float64)
+        units = np.array(units, dtype=np.float64)
+    else:
+        days = _days([])
+        hours = np.zeros(0, dtype=np.int64)
+        orders = revenue = units = np.zeros(0)
+
+    # 1970-01-01 was a Thursday, so +3 makes Monday 0
+    weekdays = (days.astype(np.int64) + 3) % 7
+    slot = weekdays * 24 + hours
+    heat = {
+        name: np.bincount(slot, weights=values, minlength=7 * 24).reshape(7, 24)
+        for name, values in (("orders", orders), ("revenue", revenue), ("units", units))
+    }
+
+    kind, period_index, labels = _periods(days, start_day, end_day)
+    n_periods = len(labels)
+    period_orders = np.bincount(period_index, weights=orders, minlength=n_periods)
+    period_revenue = np.bincount(period_index, weights=revenue, minlength=n_periods)
+    period_units = np.bincount(period_index, weights=units, minlength=n_periods)
+
+    if by_category:
+        day_strings, names, cat_units, cat_revenue = zip(*by_category)
+        categories, category_index = np.unique(np.array(names), return_inverse=True)
+        _, cat_period, _ = _periods(_days(day_strings), start_day, end_day)
+        cell = category_index * n_periods + cat_period
+        size = len(categories) * n_periods
+        category_revenue = np.bincount(cell, weights=np.array(cat_revenue, dtype=np.float64),
+                                       minlength=size).reshape(len(categories), n_periods)
+        category_units = np.bincount(cell, weights=np.array(cat_units, dtype=np.float64),
+                                     minlength=size).reshape(len(categories), n_periods)
+        categories = categories.tolist()
+    else:
+        categories = []
+        category_revenue = category_units = np.zeros((0, n_periods))
+
+    total_orders = orders.sum()
+    return {
+        'orders': int(total_orders),
+        'revenue': float(revenue.sum()),
+        'units': int(units.sum()),
+        'avg_basket_units': float(units.sum() / total_orders) if total_orders else 0.0,
+        'avg_order_value': float(revenue.sum() / total_orders) if total_orders else 0.0,
+        'heat_orders': heat["orders"],
+        'heat_revenue': heat["revenue"],
+        'heat_units': heat["units"],
+        'period': kind,
+        'period_labels': labels,
+        'period_orders': period_orders,
+        'period_revenue': period_revenue,
+        'period_units': period_units,
+        'period_basket_units': _ratio(period_units, period_orders),
+        'period_order_value': _ratio(period_revenue, period_orders),
+        'categories': categories,
+        'category_revenue': category_revenue,
+        'category_units': category_units,
+    }
@@ -0,0 +1,188 @@
+# src/core/archiver.py
+import atexit
+import os
+import threading
+from datetime import date, datetime, timedelta
+from .config import ARCHIVE_BATCH_SIZE, ARCHIVE_CHECK_INTERVAL
+from .database import (
+    get_db_connection, close_db_connection, get_setting,
+    attach_archive, archive_path, month_bounds
+)
+
+def _create_archive_tables(cursor, schema):
+    # Same columns as canteen.db; no items table, so no item foreign key
+    cursor.execute(f'''
+        CREATE TABLE IF NOT EXISTS {schema}.orders (
+            order_id INTEGER PRIMARY KEY,
+            date_time TEXT NOT NULL,
+            total_amount REAL NOT NULL,
+            items_json TEXT NOT NULL,
+            status TEXT NOT NULL DEFAULT 'completed'
+        )
+    ''')
+    cursor.execute(f'''
+        CREATE TABLE IF NOT EXISTS {schema}.order_lines (
+            line_id INTEGER PRIMARY KEY,
+            order_id INTEGER NOT NULL REFERENCES orders(order_id) ON DELETE CASCADE,
+            item_id INTEGER,
+            name TEXT NOT NULL,
+            unit_price REAL NOT NULL,
+            qty INTEGER NOT NULL,
+            line_total REAL NOT NULL
+        )
+    ''')
+    cursor.execute(f"CREATE INDEX IF NOT EXISTS {schema}.idx_orders_status_time ON orders (status, date_time)")
+    cursor.execute(f"CREATE INDEX IF NOT EXISTS {schema}.idx_order_lines_order ON order_lines (order_id)")
+
+def archive_cutoff(keep_days):
+    """Start of the oldest month to keep: every month before it is archived."""
+    return (date.today() - timedelta(days=keep_days)).strftime("%Y-%m-01 00:00:00")
+
+def archive_month(conn, month, should_stop=None):
+    """Move one month of completed orders from canteen.db to its archive file.
+
+    1. Copy the month into the archive (one transaction on the archive;
+       canteen.db is only read, so checkouts carry on).
+    2. Check every order arrived, then record the month in
+       archived_months: from here on queries read it from the archive.
+    3. Delete it from canteen.db in small transactions.
+    Every step can be re-run, so an interrupted run is finished next time;
+    should_stop() is polled between the deletes. Returns the number of
+    orders archived.
+    """
+    start, end = month_bounds(month)
+    os.makedirs(os.path.dirname(archive_path(month)), exist_ok=True)
+    schema = attach_archive(conn, month)
+    cursor = conn.cursor()
+    _create_archive_tables(cursor, schema)
+    cursor.execute(f"""
+        INSERT OR IGNORE INTO {schema}.orders
+        SELECT order_id, date_time, total_amount, items_json, status
+        FROM main.orders
+        WHERE status = 'completed' AND date_time >= ? AND date_time < ?
+    """, (start, end))
+    cursor.execute(f"""
+        INSERT OR IGNORE INTO {schema}.order_lines
+        SELECT l.line_id, l.order_id, l.item_id, l.name, l.unit_price, l.qty, l.line_total
+        FROM main.order_lines l
+        JOIN main.orders o ON o.order_id = l.order_id
+        WHERE o.status = 'completed' AND o.date_time >= ? AND o.date_time < ?
+    """, (start, end))
+    conn.commit()
+
+    cursor.execute(f"""
+        SELECT COUNT(*)
+        FROM main.orders o
+        WHERE o.status = 'completed' AND o.date_time >= ? AND o.date_time < ?
+          AND NOT EXISTS (SELECT 1 FROM {schema}.orders a WHERE a.order_id = o.order_id)
+    """, (start, end))
+    missing = cursor.fetchone()[0]
+    if missing:
+        raise RuntimeError(f"{missing} order(s) of {month} did not reach {archive_path(month)}")
+    cursor.execute(f"SELECT COUNT(*), MIN(order_id), MAX(order_id) FROM {schema}.orders")
+    orders, first_id, last_id = cursor.fetchone()
+    cursor.execute(f"SELECT COUNT(*) FROM {schema}.order_lines")
+    lines = cursor.fetchone()[0]
+    cursor.execute(
+        """
+        INSERT OR REPLACE INTO archived_months
+            (month, first_order_id, last_order_id, order_count, line_count, archived_at)
+        VALUES (?, ?, ?, ?, ?, ?)
+        """,
+        (month, first_id, last_id, orders, lines, datetime.now().strftime("%Y-%m-%d %H:%M:%S"))
+    )
+    conn.commit()
+
+    while not (should_stop and should_stop()):
+        cursor.execute("""
+            SELECT order_id FROM orders
+            WHERE status = 'completed' AND date_time >= ? AND date_time < ?
+            LIMIT ?
+        """, (start, end, ARCHIVE_BATCH_SIZE))
+        batch = [(row[0],) for row in cursor.fetchall()]
+        if not batch:
+            break
+        cursor.executemany("DELETE FROM order_lines WHERE order_id = ?", batch)
+        cursor.executemany("DELETE FROM orders WHERE order_id = ?", batch)
+        conn.commit()
+    return orders
+
+def archive_old_orders(keep_days=None, should_stop=None):
+    """Archive every whole month older than keep_days (default: the
+    archive_after_days setting; 0 = never). Returns the months archived.
+    """
+    if keep_days is None:
+        keep_days = int(get_setting("archive_after_days", "180"))
+    if keep_days <= 0:
+        return []
+
+    conn = get_db_connection()
+    cursor = conn.cursor()
+    # Uses the (status, date_time) index; empty once everything is archived
+    cursor.execute("""
+        SELECT DISTINCT substr(date_time, 1, 7)
+        FROM orders
+        WHERE status = 'completed' AND date_time < ?
+        ORDER BY 1
+    """, (archive_cutoff(keep_days),))
+    months = [row[0] for row in cursor.fetchall()]
+
+    archived = []
+    try:
+        # Oldest first, stopping at the first failure: queries treat
+        # everything before the newest archived month as archived
+        for month in months:
+            if should_stop and should_stop():
+                break
+            orders = archive_month(conn, month, should_stop)
+            archived.append(month)
+            print(f"📦 Archived {orders:,} order(s) of {month} to {archive_path(month)}")
+    finally:
+        conn.close()
+    return archived
+
+class OrderArchiver:
+    """Background thread that archives old months of orders on a timer."""
+
+    def __init__(self, interval=ARCHIVE_CHECK_INTERVAL):
+        self.interval = interval
+        self._thread = None
+        self._stop = threading.Event()
+
+    def start(self):
+        if self._thread is None:
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="order-archiver", daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        if self._thread is not None:
+            self._stop.set()
+            self._thread.join()
+            self._thread = None
+
+    def run_once(self):
+        try:
+            return archive_old_orders(should_stop=self._stop.is_set)
+        except Exception as e:
+            print(f"⚠️ Order archiving failed: {e}")
+            return []
+
+    def _run(self):
+        try:
+            self.run_once()
+            while not self._stop.wait(self.interval):
+                self.run_once()
+        finally:
+            close_db_connection()
+
+_archiver = None
+
+def get_order_archiver():
+    """Return the shared, started OrderArchiver."""
+    global _archiver
+    if _archiver is None:
+        _archiver = OrderArchiver()
+        _archiver.start()
+        atexit.register(_archiver.stop)
+    return _archiver
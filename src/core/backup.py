@@ -0,0 +1,193 @@
+# src/core/backup.py
+import atexit
+import glob
+import os
+import sqlite3
+import threading
+import time
+from datetime import datetime
+from . import database
+from .config import BACKUP_DIR, BACKUP_PAGES_PER_STEP, BACKUP_STEP_PAUSE, BACKUP_CHECK_INTERVAL, DB_TIMEOUT
+
+class BackupCancelled(Exception):
+    """Raised when a backup is stopped before it finishes."""
+
+def copy_database(src_path, dest_path, pages=BACKUP_PAGES_PER_STEP, pause=BACKUP_STEP_PAUSE,
+                  is_cancelled=None):
+    """Copy a live SQLite database to dest_path with the backup API.
+
+    Pages are copied a few at a time from one read transaction: with WAL
+    that snapshot never blocks a checkout, and the copy doesn't restart
+    every time someone commits (it would never finish at lunch). The copy
+    is written as dest_path + ".part" and only moved into place once
+    PRAGMA integrity_check passes.
+    """
+    tmp_path = dest_path + ".part"
+    if os.path.exists(tmp_path):
+        os.remove(tmp_path)
+
+    def step(status, remaining, total):
+        if is_cancelled and is_cancelled():
+            raise BackupCancelled()
+        time.sleep(pause)
+
+    src = sqlite3.connect(src_path, timeout=DB_TIMEOUT)
+    dst = sqlite3.connect(tmp_path)
+    try:
+        src.execute("BEGIN")
+        src.execute("SELECT COUNT(*) FROM sqlite_master").fetchone()   # Starts the snapshot
+        src.backup(dst, pages=pages, progress=step)
+        src.rollback()
+        # One self-contained file, readable without a -wal next to it
+        dst.execute("PRAGMA journal_mode = DELETE")
+        result = dst.execute("PRAGMA integrity_check").fetchone()[0]
+        if result != "ok":
+            raise RuntimeError(f"integrity check failed: {result}")
+    except BaseException:
+        dst.close()
+        src.close()
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    dst.close()
+    src.close()
+    os.replace(tmp_path, dest_path)
+
+def _db_name():
+    return os.path.splitext(os.path.basename(database.DB_PATH))[0]
+
+def list_backups(dest_dir=BACKUP_DIR):
+    """Snapshot files in dest_dir, oldest first."""
+    return sorted(glob.glob(os.path.join(dest_dir, f"{_db_name()}_????????-??????.db")))
+
+def backup_now(dest_dir=BACKUP_DIR, keep=None, is_cancelled=None):
+    """Snapshot canteen.db into dest_dir and keep the newest keep snapshots.
+
+    keep defaults to the backup_keep setting. Archive files (see
+    archiver.py) are copied to dest_dir/archive when new or changed.
+    Returns (snapshot path, size in bytes).
+    """
+    if keep is None:
+        keep = int(database.get_setting("backup_keep", "7"))
+    os.makedirs(dest_dir, exist_ok=True)
+    path = os.path.join(dest_dir, f"{_db_name()}_{datetime.now():%Y%m%d-%H%M%S}.db")
+    copy_database(database.DB_PATH, path, is_cancelled=is_cancelled)
+
+    for old in list_backups(dest_dir)[:-max(1, keep)]:
+        os.remove(old)
+
+    # Archived months are only written by the archiver, so copy them when they change
+    for archive in glob.glob(database.archive_path("????-??")):
+        target = os.path.join(dest_dir, "archive", os.path.basename(archive))
+        if not os.path.exists(target) or os.path.getmtime(archive) > os.path.getmtime(target):
+            os.makedirs(os.path.dirname(target), exist_ok=True)
+            copy_database(archive, target, is_cancelled=is_cancelled)
+    return path, os.path.getsize(path)
+
+class BackupService:
+    """Background thread that snapshots the database on a schedule.
+
+    A backup is due when the newest snapshot in BACKUP_DIR is older than
+    the backup_interval_hours setting (0 = only when asked). Listeners
+    get the status dict (see status()) after every attempt.
+    """
+
+    def __init__(self, dest_dir=BACKUP_DIR, interval=BACKUP_CHECK_INTERVAL):
+        self.dest_dir = dest_dir
+        self.interval = interval
+        self.listeners = []
+        self.running = False
+        self._last = None          # Status of the last attempt in this process
+        self._requested = False
+        self._thread = None
+        self._stop = threading.Event()
+        self._wake = threading.Event()
+
+    def add_listener(self, callback):
+        self.listeners.append(callback)
+
+    def remove_listener(self, callback):
+        if callback in self.listeners:
+            self.listeners.remove(callback)
+
+    def start(self):
+        if self._thread is None:
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="backup", daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        if self._thread is not None:
+            self._stop.set()
+            self._wake.set()
+            self._thread.join()
+            self._thread = None
+
+    def request_backup(self):
+        """Take a backup now (on the backup thread)."""
+        self._requested = True
+        self._wake.set()
+
+    def status(self):
+        """{'time', 'path', 'size', 'ok', 'error'} of the last backup, or None if there is none."""
+        if self._last is not None:
+            return dict(self._last)
+        backups = list_backups(self.dest_dir)
+        if not backups:
+            return None
+        path = backups[-1]
+        return {'time': datetime.fromtimestamp(os.path.getmtime(path)), 'path': path,
+                'size': os.path.getsize(path), 'ok': True, 'error': None}
+
+    def is_due(self):
+        hours = float(database.get_setting("backup_interval_hours", "24"))
+        if hours <= 0:
+            return False
+        backups = list_backups(self.dest_dir)
+        return not backups or time.time() - os.path.getmtime(backups[-1]) >= hours * 3600
+
+    def run_backup(self):
+        self.running = True
+        self._notify(self.status())
+        start = time.perf_counter()
+        try:
+            path, size = backup_now(self.dest_dir, is_cancelled=self._stop.is_set)
+            self._last = {'time': datetime.now(), 'path': path, 'size': size, 'ok': True, 'error': None}
+            print(f"✅ Backup saved to {path} ({size / 1e6:.1f} MB, {time.perf_counter() - start:.1f}s)")
+        except BackupCancelled:
+            self._last = None
+        except Exception as e:
+            self._last = {'time': datetime.now(), 'path': None, 'size': 0, 'ok': False, 'error': str(e)}
+            print(f"❌ Backup failed: {e}")
+        finally:
+            self.running = False
+        self._notify(self.status())
+
+    def _notify(self, status):
+        for callback in list(self.listeners):
+            try:
+                callback(status)
+            except Exception as e:
+                print(f"⚠️ Backup listener failed: {e}")
+
+    def _run(self):
+        while not self._stop.is_set():
+            requested, self._requested = self._requested, False
+            try:
+                if requested or self.is_due():
+                    self.run_backup()
+            except Exception as e:
+                print(f"⚠️ Backup check failed: {e}")
+            self._wake.wait(self.interval)
+            self._wake.clear()
+
+_service = None
+
+def get_backup_service():
+    """Return the shared, started BackupService."""
+    global _service
+    if _service is None:
+        _service = BackupService()
+        _service.start()
+        atexit.register(_service.stop)
+    return _service
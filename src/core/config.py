@@ -8,5 +8,76 @@ DEFAULT_SETTINGS = {
     "canteen_name": "College Canteen",
     "tax_percent": "5.0",
     "paper_width": "58",
-    "admin_password": "1234"  # Default PIN
-}
\ No newline at end of file
+    "admin_password": "1234",  # Default PIN
+    "held_ttl_minutes": "120",  # Held orders older than this are swept
+    "archive_after_days": "180",  # Older months move to archive files (0 = never)
+    "backup_interval_hours": "24",  # Time between automatic backups (0 = never)
+    "backup_keep": "7"  # Backup snapshots kept
+}
+
+# SQLite tuning applied once per pooled connection
+DB_TIMEOUT = 5.0            # seconds to wait on a locked database
+DB_STATEMENT_CACHE = 256    # prepared statements kept per connection
+DB_PRAGMAS = {
+    "journal_mode": "WAL",
+    "synchronous": "NORMAL",    # safe with WAL, skips fsync on every commit
+    "cache_size": -8000,        # ~8 MB page cache
+    "mmap_size": 67108864,      # 64 MB memory-mapped I/O
+    "temp_store": "MEMORY",
+    "foreign_keys": "ON",
+}
+
+# Receipt printing
+SPOOL_DIR = os.path.join(BASE_DIR, "spool")   # Receipts waiting to print
+PRINT_QUEUE_SIZE = 50
+PRINT_MAX_RETRIES = 5
+PRINT_RETRY_BASE_DELAY = 0.5   # seconds, doubled on every retry
+PRINT_RETRY_MAX_DELAY = 10.0
+
+# Group-commit order writer
+ORDER_WRITER_BATCH_MS = 50     # Max time an order waits for its batch
+ORDER_WRITER_BATCH_SIZE = 32   # Max orders per transaction
+ORDER_ID_BLOCK = 100           # Order ids reserved per allocation (unused ones are handed back on a clean shutdown)
+ORDER_ID_WAIT = 10.0           # seconds a checkout waits for the writer to reserve ids
+
+# Held order sweeper
+HELD_SWEEP_INTERVAL = 60.0     # seconds between expiry sweeps
+
+# UI responsiveness: DB calls from the UI run on one worker thread
+# (src/views/db_executor.py), in the order they were made
+UI_STALL_MS = 50               # UI-thread stalls longer than this are logged
+UI_WATCHDOG_INTERVAL_MS = 20   # Heartbeat period of the stall watchdog
+SETTINGS_POLL_INTERVAL = 2.0   # seconds between checks for settings edited elsewhere
+
+# Order archive: whole months older than archive_after_days move out of
+# canteen.db into one file per month, attached only when a query needs them
+ARCHIVE_DIR = os.path.join(BASE_DIR, "archive")
+ARCHIVE_CHECK_INTERVAL = 6 * 3600   # seconds between archive runs
+ARCHIVE_BATCH_SIZE = 2000      # Orders deleted from canteen.db per transaction
+ARCHIVE_MAX_ATTACHED = 8       # Archive files attached per connection (SQLite allows 10)
+
+# Online backups (src/core/backup.py): snapshots of canteen.db taken a few
+# pages at a time while the till keeps selling
+BACKUP_DIR = os.path.join(BASE_DIR, "backups")
+BACKUP_PAGES_PER_STEP = 256    # Pages copied per step (~1 MB with 4 KB pages)
+BACKUP_STEP_PAUSE = 0.005      # seconds slept between steps
+BACKUP_CHECK_INTERVAL = 300.0  # seconds between checks whether a backup is due
+
+# Multi-counter mode: one order server owns the database, tills connect
+# to it (python -m src.main --serve / --server ADDRESS). "host:port" or
+# "unix:/path/to/socket"
+ORDER_SERVER_ADDRESS = "127.0.0.1:8765"
+ORDER_SERVER_TIMEOUT = 10.0    # seconds a till waits for a reply
+# Shared secret every till must present; required for listening on
+# anything but loopback. Set POS_SERVER_SECRET on the server and the tills
+ORDER_SERVER_SECRET = os.environ.get("POS_SERVER_SECRET", "")
+
+# Hot-path timing (Admin → Performance); POS_PERF=0 starts with it off
+PERF_ENABLED = os.environ.get("POS_PERF", "1") != "0"
+PERF_RING_SIZE = 2000          # Recent timed calls kept for "slowest" view
+
+# Startup
+STARTUP_BUDGET_MS = 500        # Target for the window's first paint
+
+# Schema migrations
+MIGRATION_BATCH_SIZE = 5000    # Rows per committed batch in data migrations
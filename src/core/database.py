@@ -2,223 +2,808 @@
 import sqlite3
 import json
 import os
-from .config import DB_PATH, DEFAULT_SETTINGS
+import threading
+from collections import OrderedDict
+from .config import (
+    DB_PATH, DEFAULT_SETTINGS, DB_TIMEOUT, DB_STATEMENT_CACHE, DB_PRAGMAS,
+    ARCHIVE_DIR, ARCHIVE_MAX_ATTACHED
+)
 
-def get_db_connection():
-    """Get a new database connection."""
-    conn = sqlite3.connect(DB_PATH)
+_local = threading.local()
+
+# Settings cache: loaded once, updated by set_setting, reloaded when
+# PRAGMA data_version shows another connection has written to the DB
+_settings_cache = None
+_settings_seen_version = None   # (connection id, data_version) at last load/check
+_settings_seen_revision = None  # settings_revision.revision at last load
+_settings_lock = threading.Lock()
+_settings_listeners = []
+
+class PooledConnection(sqlite3.Connection):
+    """Long-lived connection; close() only releases it back to the thread."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.archives = OrderedDict()   # Attached archive month: schema, least recently used first
+
+    def close(self):
+        # Match the old behaviour of discarding uncommitted work on close
+        if self.in_transaction:
+            self.rollback()
+
+    def really_close(self):
+        super().close()
+
+def _open_connection(path):
+    conn = sqlite3.connect(
+        path,
+        timeout=DB_TIMEOUT,
+        cached_statements=DB_STATEMENT_CACHE,
+        factory=PooledConnection
+    )
     conn.row_factory = sqlite3.Row  # Enable dict-like access
+    for pragma, value in DB_PRAGMAS.items():
+        conn.execute(f"PRAGMA {pragma} = {value}")
+    return conn
+
+def get_db_connection():
+    """Get this thread's pooled database connection (opened on first use)."""
+    conn = getattr(_local, "conn", None)
+    if conn is None or _local.path != DB_PATH:
+        if conn is not None:
+            conn.really_close()
+        conn = _open_connection(DB_PATH)
+        _local.conn = conn
+        _local.path = DB_PATH
     return conn
 
-def init_db():
-    """Create tables if they don't exist + handle schema migrations."""
+def close_db_connection():
+    """Really close this thread's pooled connection (on shutdown/thread exit)."""
+    conn = getattr(_local, "conn", None)
+    if conn is not None:
+        conn.really_close()
+        _local.conn = None
+
+def init_db(progress=None):
+    """Bring the schema up to date (versioned migrations, see migrations.py).
+
+    When the database is already current this is one PRAGMA read.
+    progress(name, done, total) is called during long data migrations.
+    """
+    from .migrations import migrate, print_progress
     conn = get_db_connection()
-    cursor = conn.cursor()
+    try:
+        migrate(conn, progress or print_progress)
+    finally:
+        conn.close()
 
-    # Items table (original, no stock_quantity)
-    cursor.execute('''
-        CREATE TABLE IF NOT EXISTS items (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            name TEXT NOT NULL,
-            category TEXT,
-            price REAL NOT NULL,
-            available INTEGER DEFAULT 1
-        )
-    ''')
-
-    # Check if stock_quantity column exists, add if missing
-    cursor.execute("PRAGMA table_info(items)")
-    columns = [col[1] for col in cursor.fetchall()]
-    if "stock_quantity" not in columns:
-        cursor.execute("ALTER TABLE items ADD COLUMN stock_quantity INTEGER DEFAULT 999")
-
-    # Settings table
-    cursor.execute('''
-        CREATE TABLE IF NOT EXISTS settings (
-            name TEXT PRIMARY KEY,
-            value TEXT NOT NULL
-        )
-    ''')
-
-    # Orders table
-    cursor.execute('''
-        CREATE TABLE IF NOT EXISTS orders (
-            order_id INTEGER PRIMARY KEY AUTOINCREMENT,
-            date_time TEXT NOT NULL,
-            total_amount REAL NOT NULL,
-            items_json TEXT NOT NULL,
-            status TEXT NOT NULL DEFAULT 'completed'
-        )
-    ''')
+def _insert_order_lines(cursor, order_id, items, item_ids_by_name=None):
+    """Insert one order_lines row per cart item.
 
-    # Insert default settings if not present
-    for key, value in DEFAULT_SETTINGS.items():
-        cursor.execute(
-            "INSERT OR IGNORE INTO settings (name, value) VALUES (?, ?)",
-            (key, value)
-        )
+    item_id is left NULL for items deleted from the menu since they went
+    in the cart (as ON DELETE SET NULL does for older lines).
+    """
+    rows = []
+    for item in items:
+        item_id = item.get('id')
+        if not isinstance(item_id, int):
+            # Old carts stored the (name, price) key instead of the item id
+            item_id = (item_ids_by_name or {}).get(item['name'])
+        qty = int(item['qty'])
+        price = float(item['price'])
+        rows.append((order_id, item_id, item['name'], price, qty, price * qty))
+    cursor.executemany(
+        """
+        INSERT INTO order_lines (order_id, item_id, name, unit_price, qty, line_total)
+        VALUES (?, (SELECT id FROM items WHERE id = ?), ?, ?, ?, ?)
+        """,
+        rows
+    )
 
-    # Add sample items if no items exist
-    cursor.execute("SELECT COUNT(*) FROM items")
-    if cursor.fetchone()[0] == 0:
-        sample_items = [
-            ("Tea", "Drinks", 10.0, 50),
-            ("Coffee", "Drinks", 15.0, 30),
-            ("Sandwich", "Snacks", 30.0, 20),
-            ("Biscuit", "Snacks", 5.0, 100),
-        ]
-        cursor.executemany(
-            "INSERT INTO items (name, category, price, stock_quantity) VALUES (?, ?, ?, ?)",
-            sample_items
-        )
+def _apply_rollups(cursor, date_time, total, items):
+    """Add one completed order to the daily, hourly and per-item rollups."""
+    day, hour = date_time[:10], int(date_time[11:13])
+    cursor.execute(
+        """
+        INSERT INTO sales_daily (day, order_count, revenue) VALUES (?, 1, ?)
+        ON CONFLICT (day) DO UPDATE SET
+            order_count = order_count + 1,
+            revenue = revenue + excluded.revenue
+        """,
+        (day, total)
+    )
+    cursor.execute(
+        """
+        INSERT INTO sales_hourly (day, hour, order_count, revenue, units) VALUES (?, ?, 1, ?, ?)
+        ON CONFLICT (day, hour) DO UPDATE SET
+            order_count = order_count + 1,
+            revenue = revenue + excluded.revenue,
+            units = units + excluded.units
+        """,
+        (day, hour, total, sum(int(item['qty']) for item in items))
+    )
+    cursor.executemany(
+        """
+        INSERT INTO sales_item_daily (day, name, unit_price, qty, revenue) VALUES (?, ?, ?, ?, ?)
+        ON CONFLICT (day, name, unit_price) DO UPDATE SET
+            qty = qty + excluded.qty,
+            revenue = revenue + excluded.revenue
+        """,
+        [(day, item['name'], float(item['price']), int(item['qty']), float(item['price']) * int(item['qty']))
+         for item in items]
+    )
+
+def rebuild_rollups(cursor=None):
+    """Recompute the rollup tables from orders/order_lines (backfill).
+
+    Days in archived months are left as they are.
+    """
+    own_conn = cursor is None
+    if own_conn:
+        conn = get_db_connection()
+        cursor = conn.cursor()
+
+    # Archived months keep their rollups: their orders are no longer here
+    since = ""
+    if _has_table(cursor, "archived_months"):
+        archived = _archived_months(cursor)
+        if archived:
+            _, since = month_bounds(archived[0][0])
+    for table in ("sales_daily", "sales_hourly", "sales_item_daily"):
+        cursor.execute(f"DELETE FROM {table} WHERE day >= ?", (since[:10],))
+    cursor.execute("""
+        INSERT INTO sales_daily (day, order_count, revenue)
+        SELECT substr(date_time, 1, 10), COUNT(*), SUM(total_amount)
+        FROM orders
+        WHERE status = 'completed' AND date_time >= ?
+        GROUP BY 1
+    """, (since,))
+    # Called by migration 6 too, before sales_hourly had its units column
+    if _has_column(cursor, "sales_hourly", "units"):
+        cursor.execute("""
+            INSERT INTO sales_hourly (day, hour, order_count, revenue, units)
+            SELECT substr(o.date_time, 1, 10), CAST(substr(o.date_time, 12, 2) AS INTEGER),
+                   COUNT(*), SUM(o.total_amount),
+                   SUM((SELECT COALESCE(SUM(l.qty), 0) FROM order_lines l WHERE l.order_id = o.order_id))
+            FROM orders o
+            WHERE o.status = 'completed' AND o.date_time >= ?
+            GROUP BY 1, 2
+        """, (since,))
+    else:
+        cursor.execute("""
+            INSERT INTO sales_hourly (day, hour, order_count, revenue)
+            SELECT substr(date_time, 1, 10), CAST(substr(date_time, 12, 2) AS INTEGER), COUNT(*), SUM(total_amount)
+            FROM orders
+            WHERE status = 'completed' AND date_time >= ?
+            GROUP BY 1, 2
+        """, (since,))
+    cursor.execute("""
+        INSERT INTO sales_item_daily (day, name, unit_price, qty, revenue)
+        SELECT substr(o.date_time, 1, 10), l.name, l.unit_price, SUM(l.qty), SUM(l.line_total)
+        FROM order_lines l
+        JOIN orders o ON o.order_id = l.order_id
+        WHERE o.status = 'completed' AND o.date_time >= ?
+        GROUP BY 1, 2, 3
+    """, (since,))
+    cursor.execute("SELECT COUNT(*) FROM sales_daily")
+    days = cursor.fetchone()[0]
+
+    if own_conn:
+        conn.commit()
+        conn.close()
+    return days
+
+def _has_table(cursor, table):
+    cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (table,))
+    return cursor.fetchone() is not None
+
+def _has_column(cursor, table, column):
+    cursor.execute(f"PRAGMA table_info({table})")
+    return column in [col[1] for col in cursor.fetchall()]
+
+def write_completed_order(cursor, items_list, total, date_time, order_id=None):
+    """Insert a completed order, its lines and rollups (caller commits).
+
+    order_id may be given when it was reserved ahead with reserve_order_ids.
+    """
+    cursor.execute(
+        """
+        INSERT INTO orders (order_id, date_time, total_amount, items_json, status)
+        VALUES (?, ?, ?, ?, 'completed')
+        """,
+        (order_id, date_time, total, json.dumps(items_list))
+    )
+    order_id = cursor.lastrowid
+    _insert_order_lines(cursor, order_id, items_list)
+    _apply_rollups(cursor, date_time, total, items_list)
+    _deduct_stock(cursor, items_list)
+    return order_id
+
+def _deduct_stock(cursor, items):
+    """Deduct the cart's net quantities from stock (999 = unlimited is left alone)."""
+    quantities = {}
+    for item in items:
+        item_id = item.get('id')
+        if isinstance(item_id, int):
+            quantities[item_id] = quantities.get(item_id, 0) + int(item['qty'])
+    cursor.executemany(
+        "UPDATE items SET stock_quantity = stock_quantity - ? WHERE id = ? AND stock_quantity < 999",
+        [(qty, item_id) for item_id, qty in quantities.items()]
+    )
 
+def save_completed_order(items_list, total):
+    """Save a completed order, its lines and rollups in one transaction."""
+    from datetime import datetime
+
+    date_time = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    conn = get_db_connection()
+    cursor = conn.cursor()
+    order_id = write_completed_order(cursor, items_list, total, date_time)
     conn.commit()
     conn.close()
+    return order_id
+
+def reserve_order_ids(count):
+    """Reserve count order ids; returns the first one.
+
+    Bumps the AUTOINCREMENT counter so other inserts into orders never
+    reuse a reserved id, even before the reserved rows are written.
+    """
+    conn = get_db_connection()
+    cursor = conn.cursor()
+    cursor.execute("BEGIN IMMEDIATE")
+    try:
+        cursor.execute("SELECT seq FROM sqlite_sequence WHERE name = 'orders'")
+        row = cursor.fetchone()
+        cursor.execute("SELECT MAX(order_id) FROM orders")
+        max_id = cursor.fetchone()[0]
+        first = max(row[0] if row else 0, max_id or 0) + 1
+        last = first + count - 1
+        if row:
+            cursor.execute("UPDATE sqlite_sequence SET seq = ? WHERE name = 'orders'", (last,))
+        else:
+            cursor.execute("INSERT INTO sqlite_sequence (name, seq) VALUES ('orders', ?)", (last,))
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    return first
+
+def release_order_ids(first, last):
+    """Hand back reserved order ids first..last that were never used.
+
+    Only done while they are still the newest reservation and none of
+    them was written, so the next start carries on from first instead of
+    skipping the rest of the block. Returns True if they were released.
+    """
+    conn = get_db_connection()
+    cursor = conn.cursor()
+    cursor.execute("BEGIN IMMEDIATE")
+    try:
+        cursor.execute("SELECT seq FROM sqlite_sequence WHERE name = 'orders'")
+        row = cursor.fetchone()
+        cursor.execute("SELECT MAX(order_id) FROM orders")
+        max_id = cursor.fetchone()[0] or 0
+        released = row is not None and row[0] == last and max_id < first
+        if released:
+            cursor.execute("UPDATE sqlite_sequence SET seq = ? WHERE name = 'orders'", (first - 1,))
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    return released
 
-def save_held_order(cart_items):
-    """Save current cart as a held order."""
-    import json
+def save_held_order(cart_items, held_id=None):
+    """Save a cart as a held order (update held_id if given); returns its id."""
     from datetime import datetime
 
     # Calculate total
     subtotal = sum(item['price'] * item['qty'] for item in cart_items.values())
-    tax_percent = 5.0
+    tax_percent = get_tax_percent()
     tax = subtotal * (tax_percent / 100)
     total = subtotal + tax
 
+    now = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    items_json = json.dumps(list(cart_items.values()))
+
     # Save to DB
     conn = get_db_connection()
     cursor = conn.cursor()
-    cursor.execute(
-        """
-        INSERT INTO orders (date_time, total_amount, items_json, status)
-        VALUES (?, ?, ?, 'held')
-        """,
-        (datetime.now().strftime("%Y-%m-%d %H:%M:%S"), total, json.dumps(list(cart_items.values())))
-    )
-    order_id = cursor.lastrowid
+    if held_id is not None:
+        cursor.execute(
+            "UPDATE held_orders SET updated_at = ?, total_amount = ?, items_json = ? WHERE held_id = ?",
+            (now, total, items_json, held_id)
+        )
+    if held_id is None or cursor.rowcount == 0:
+        # New hold (or the old one expired meanwhile)
+        cursor.execute(
+            """
+            INSERT INTO held_orders (held_id, created_at, updated_at, total_amount, items_json)
+            VALUES (?, ?, ?, ?, ?)
+            """,
+            (held_id, now, now, total, items_json)
+        )
+        held_id = cursor.lastrowid
     conn.commit()
     conn.close()
-    return order_id
+    return held_id
 
-def get_held_orders():
-    """Get all held orders + auto-delete old ones."""
-    import json
-    from datetime import datetime, timedelta
+def _held_order_dict(row):
+    items = json.loads(row[3])
+    return {
+        'id': row[0],
+        'time': row[1],
+        'total': row[2],
+        # Generate summary: "Sandwich x1, Tea x2"
+        'summary': ", ".join([f"{item['name']} x{item['qty']}" for item in items]),
+        'items': items
+    }
 
+def get_held_orders():
+    """Get all held orders, oldest first (read-only; expiry is done by the sweeper)."""
     conn = get_db_connection()
     cursor = conn.cursor()
-    
-    # Auto-delete held orders older than 2 hours
-    cutoff_time = (datetime.now() - timedelta(hours=2)).strftime("%Y-%m-%d %H:%M:%S")
-    cursor.execute("DELETE FROM orders WHERE status = 'held' AND date_time < ?", (cutoff_time,))
-    deleted_count = cursor.rowcount
-    conn.commit()
-    
-    # Fetch remaining held orders
-    cursor.execute("SELECT order_id, date_time, items_json FROM orders WHERE status = 'held' ORDER BY date_time")
+    cursor.execute("""
+        SELECT held_id, updated_at, total_amount, items_json
+        FROM held_orders
+        ORDER BY updated_at
+    """)
     rows = cursor.fetchall()
     conn.close()
+    return [_held_order_dict(row) for row in rows]
 
-    held_orders = []
-    for row in rows:
-        items = json.loads(row[2])
-        # Generate summary: "Sandwich x1, Tea x2"
-        summary = ", ".join([f"{item['name']} x{item['qty']}" for item in items])
-        held_orders.append({
-            'id': row[0],
-            'time': row[1],
-            'summary': summary,
-            'items': items
-        })
-    
-    return held_orders, deleted_count
+def get_held_order(held_id):
+    """Get one held order by id, or None."""
+    conn = get_db_connection()
+    cursor = conn.cursor()
+    cursor.execute(
+        "SELECT held_id, updated_at, total_amount, items_json FROM held_orders WHERE held_id = ?",
+        (held_id,)
+    )
+    row = cursor.fetchone()
+    conn.close()
+    return _held_order_dict(row) if row else None
+
+def get_held_order_items():
+    """Get (held_id, items) for every held order."""
+    conn = get_db_connection()
+    cursor = conn.cursor()
+    cursor.execute("SELECT held_id, items_json FROM held_orders")
+    rows = cursor.fetchall()
+    conn.close()
+    return [(held_id, json.loads(items_json)) for held_id, items_json in rows]
 
-def delete_held_order(order_id):
+def delete_held_order(held_id):
     """Delete a held order (after resuming)."""
     conn = get_db_connection()
     cursor = conn.cursor()
-    cursor.execute("DELETE FROM orders WHERE order_id = ?", (order_id,))
+    cursor.execute("DELETE FROM held_orders WHERE held_id = ?", (held_id,))
+    conn.commit()
+    conn.close()
+
+def delete_all_held_orders():
+    """Delete every held order; returns how many were deleted."""
+    conn = get_db_connection()
+    cursor = conn.cursor()
+    cursor.execute("DELETE FROM held_orders")
+    deleted_count = cursor.rowcount
     conn.commit()
     conn.close()
+    return deleted_count
+
+def get_held_ttl_minutes():
+    """Minutes a held order is kept before the sweeper deletes it."""
+    try:
+        return max(1, int(float(get_setting("held_ttl_minutes", DEFAULT_SETTINGS["held_ttl_minutes"]))))
+    except ValueError:
+        return int(DEFAULT_SETTINGS["held_ttl_minutes"])
+
+def expire_held_orders(ttl_minutes=None):
+    """Delete held orders not touched for ttl_minutes; returns the deleted ids."""
+    from datetime import datetime, timedelta
+    if ttl_minutes is None:
+        ttl_minutes = get_held_ttl_minutes()
+    cutoff_time = (datetime.now() - timedelta(minutes=ttl_minutes)).strftime("%Y-%m-%d %H:%M:%S")
+
+    conn = get_db_connection()
+    cursor = conn.cursor()
+    # Cheap read first so an idle sweep doesn't take the write lock
+    cursor.execute("SELECT held_id FROM held_orders WHERE updated_at < ?", (cutoff_time,))
+    expired = [row[0] for row in cursor.fetchall()]
+    if expired:
+        cursor.executemany("DELETE FROM held_orders WHERE held_id = ?", [(held_id,) for held_id in expired])
+        conn.commit()
+    conn.close()
+    return expired
+
+def archive_path(month):
+    """Archive file holding the completed orders of month ("YYYY-MM")."""
+    name = os.path.splitext(os.path.basename(DB_PATH))[0]
+    return os.path.join(ARCHIVE_DIR, f"{name}_{month}.db")
+
+def month_bounds(month):
+    """Return [start, end) timestamp strings covering month ("YYYY-MM")."""
+    year, number = int(month[:4]), int(month[5:7])
+    next_month = f"{year + number // 12:04d}-{number % 12 + 1:02d}"
+    return f"{month}-01 00:00:00", f"{next_month}-01 00:00:00"
+
+def attach_archive(conn, month):
+    """Attach month's archive file to conn (if not already); returns its schema name.
+
+    At most ARCHIVE_MAX_ATTACHED files stay attached per connection; the
+    least recently used one is detached first. Not allowed in a transaction.
+    """
+    schema = conn.archives.get(month)
+    if schema is not None:
+        conn.archives.move_to_end(month)
+        return schema
+    while len(conn.archives) >= ARCHIVE_MAX_ATTACHED:
+        old_month, old_schema = next(iter(conn.archives.items()))
+        conn.execute(f"DETACH DATABASE {old_schema}")
+        del conn.archives[old_month]
+    schema = "archive_" + month.replace("-", "_")
+    conn.execute(f"ATTACH DATABASE ? AS {schema}", (archive_path(month),))
+    conn.archives[month] = schema
+    return schema
+
+def _archived_months(cursor):
+    """(month, first order id, last order id) of every archived month, newest first."""
+    cursor.execute("SELECT month, first_order_id, last_order_id FROM archived_months ORDER BY month DESC")
+    return cursor.fetchall()
+
+def _order_sources(cursor, start=None, end=None):
+    """Where the completed orders in [start, end) are, newest first.
+
+    Returns (month, start, end, first id, last id) tuples. Month None is
+    canteen.db itself, clipped to after the newest archived month (older
+    rows there are already archived and about to be deleted). Archived
+    months are only listed when the range reaches into them.
+    """
+    archived = _archived_months(cursor)
+    live_start = start
+    if archived:
+        _, archived_until = month_bounds(archived[0][0])
+        live_start = max(start or "", archived_until)
+    sources = [(None, live_start, end, None, None)]
+    for month, first_id, last_id in archived:
+        month_start, month_end = month_bounds(month)
+        if (start is not None and month_end <= start) or (end is not None and month_start >= end):
+            continue
+        if not os.path.exists(archive_path(month)):
+            print(f"⚠️ Archive file missing: {archive_path(month)}")
+            continue
+        sources.append((month, start, end, first_id, last_id))
+    return sources
+
+def _source_schema(conn, month):
+    return "main" if month is None else attach_archive(conn, month)
+
+def _orders_filter(start=None, end=None, before_id=None, order_id=None):
+    where = ["o.status = 'completed'"]
+    params = []
+    if before_id is not None:
+        where.append("o.order_id < ?")
+        params.append(before_id)
+    if order_id is not None:
+        where.append("o.order_id = ?")
+        params.append(order_id)
+    if start is not None:
+        where.append("o.date_time >= ?")
+        params.append(start)
+    if end is not None:
+        where.append("o.date_time < ?")
+        params.append(end)
+    return " AND ".join(where), params
 
 def get_all_orders():
-    """Get all completed orders."""
-    import json
+    """Get all completed orders, archived months included (items read from order_lines)."""
     conn = get_db_connection()
     cursor = conn.cursor()
-    cursor.execute("""
-        SELECT order_id, date_time, total_amount, items_json 
-        FROM orders 
-        WHERE status = 'completed' 
-        ORDER BY date_time DESC
-    """)
-    rows = cursor.fetchall()
+    rows = []
+    lines = []
+    for month, start, end, _, _ in _order_sources(cursor):
+        schema = _source_schema(conn, month)
+        where, params = _orders_filter(start, end)
+        cursor.execute(f"""
+            SELECT o.order_id, o.date_time, o.total_amount
+            FROM {schema}.orders o
+            WHERE {where}
+            ORDER BY o.date_time DESC
+        """, params)
+        rows.extend(cursor.fetchall())
+        cursor.execute(f"""
+            SELECT l.order_id, l.item_id, l.name, l.unit_price, l.qty, l.line_total
+            FROM {schema}.order_lines l
+            JOIN {schema}.orders o ON o.order_id = l.order_id
+            WHERE {where}
+            ORDER BY l.order_id, l.line_id
+        """, params)
+        lines.extend(cursor.fetchall())
     conn.close()
 
+    items_by_order = {}
+    for order_id, item_id, name, price, qty, line_total in lines:
+        items_by_order.setdefault(order_id, []).append({
+            'id': item_id,
+            'name': name,
+            'price': price,
+            'qty': qty,
+            'total': line_total
+        })
+
     orders = []
     for row in rows:
-        items = json.loads(row[3])
         orders.append({
             'id': row[0],
             'datetime': row[1],
             'total': row[2],
-            'items': items
+            'items': items_by_order.get(row[0], [])
         })
     return orders
 
-def get_daily_summary():
-    """Get today's sales summary."""
-    from datetime import datetime
-    today = datetime.now().strftime("%Y-%m-%d")
+def get_orders_page(before_id=None, limit=200, start=None, end=None, order_id=None):
+    """Get one page of completed orders, newest first (keyset pagination).
+
+    Pass the smallest order_id of the previous page as before_id to get the
+    next page. start/end are 'YYYY-MM-DD HH:MM:SS' bounds ([start, end)).
+    Archived months are attached only if the page can contain their orders.
+    Returns rows of (order_id, date_time, items_summary, total_amount).
+    """
+    conn = get_db_connection()
+    cursor = conn.cursor()
+    page = []
+    for month, start_at, end_at, first_id, last_id in _order_sources(cursor, start, end):
+        if month is not None:
+            # Skip archives holding no order this page could show
+            if before_id is not None and first_id >= before_id:
+                continue
+            if order_id is not None and not first_id <= order_id <= last_id:
+                continue
+            if len(page) >= limit and last_id < page[-1][0]:
+                continue
+        schema = _source_schema(conn, month)
+        where, params = _orders_filter(start_at, end_at, before_id, order_id)
+        cursor.execute(f"""
+            SELECT o.order_id, o.date_time,
+                   (SELECT group_concat(l.name || ' x' || l.qty, ', ')
+                    FROM {schema}.order_lines l WHERE l.order_id = o.order_id),
+                   o.total_amount
+            FROM {schema}.orders o
+            WHERE {where}
+            ORDER BY o.order_id DESC
+            LIMIT ?
+        """, params + [limit])
+        page.extend(cursor.fetchall())
+        # Order ids are only roughly in date order across files, so merge
+        page.sort(key=lambda row: row[0], reverse=True)
+        del page[limit:]
+    conn.close()
+    return [(oid, date_time, summary or "", total) for oid, date_time, summary, total in page]
+
+def count_sales_lines(start=None, end=None):
+    """Count line items of completed orders in [start, end) (for progress)."""
+    conn = get_db_connection()
+    cursor = conn.cursor()
+    count = 0
+    for month, start_at, end_at, _, _ in _order_sources(cursor, start, end):
+        schema = _source_schema(conn, month)
+        where, params = _orders_filter(start_at, end_at)
+        cursor.execute(f"""
+            SELECT COUNT(*)
+            FROM {schema}.orders o
+            JOIN {schema}.order_lines l ON l.order_id = o.order_id
+            WHERE {where}
+        """, params)
+        count += cursor.fetchone()[0]
+    conn.close()
+    return count
+
+def iter_sales_lines(start=None, end=None):
+    """Yield (order_id, date_time, name, qty, unit_price, order_total) rows.
+
+    Rows are streamed straight from the cursor, newest order first (live
+    orders, then archived months newest first), so memory use stays flat
+    however many orders there are.
+    """
+    conn = get_db_connection()
+    for month, start_at, end_at, _, _ in _order_sources(conn.cursor(), start, end):
+        schema = _source_schema(conn, month)
+        where, params = _orders_filter(start_at, end_at)
+        cursor = conn.cursor()
+        cursor.execute(f"""
+            SELECT o.order_id, o.date_time, l.name, l.qty, l.unit_price, o.total_amount
+            FROM {schema}.orders o
+            JOIN {schema}.order_lines l ON l.order_id = o.order_id
+            WHERE {where}
+            ORDER BY o.order_id DESC, l.line_id
+        """, params)
+        try:
+            for row in cursor:
+                yield tuple(row)
+        finally:
+            cursor.close()
+
+def day_bounds(day):
+    """Return [start, end) timestamp strings covering one calendar day."""
+    from datetime import datetime, timedelta
+    start = datetime.combine(day, datetime.min.time())
+    end = start + timedelta(days=1)
+    return start.strftime("%Y-%m-%d %H:%M:%S"), end.strftime("%Y-%m-%d %H:%M:%S")
+
+def get_daily_summary(day=None):
+    """Get sales summary for a day (default: today) from the daily rollup."""
+    from datetime import date
+    day = (day or date.today()).strftime("%Y-%m-%d")
+    conn = get_db_connection()
+    cursor = conn.cursor()
+    cursor.execute("SELECT order_count, revenue FROM sales_daily WHERE day = ?", (day,))
+    row = cursor.fetchone()
+    conn.close()
+    return (row[0], row[1]) if row else (0, 0.0)
+
+def get_range_summary(start_day, end_day):
+    """Get (order count, revenue) per day for start_day..end_day inclusive."""
     conn = get_db_connection()
     cursor = conn.cursor()
     cursor.execute("""
-        SELECT COUNT(*), SUM(total_amount) 
-        FROM orders 
-        WHERE status = 'completed' 
-        AND date_time LIKE ?
-    """, (f"{today}%",))
-    count, total = cursor.fetchone()
+        SELECT day, order_count, revenue
+        FROM sales_daily
+        WHERE day >= ? AND day <= ?
+        ORDER BY day
+    """, (start_day.strftime("%Y-%m-%d"), end_day.strftime("%Y-%m-%d")))
+    rows = cursor.fetchall()
     conn.close()
-    return count or 0, total or 0.0
+    return [(day, count, revenue) for day, count, revenue in rows]
 
-def get_most_sold_items(limit=5):
-    """Get top N most sold items by quantity."""
+def get_hourly_sales(start_day, end_day):
+    """Get (hour, order count, revenue) summed over start_day..end_day inclusive."""
     conn = get_db_connection()
     cursor = conn.cursor()
     cursor.execute("""
-        SELECT items_json 
-        FROM orders 
-        WHERE status = 'completed'
-    """)
+        SELECT hour, SUM(order_count), SUM(revenue)
+        FROM sales_hourly
+        WHERE day >= ? AND day <= ?
+        GROUP BY hour
+        ORDER BY hour
+    """, (start_day.strftime("%Y-%m-%d"), end_day.strftime("%Y-%m-%d")))
     rows = cursor.fetchall()
     conn.close()
+    return [(hour, count, revenue) for hour, count, revenue in rows]
 
-    from collections import defaultdict
-    item_sales = defaultdict(int)
-    import json
-    for row in rows:
-        items = json.loads(row[0])
-        for item in items:
-            key = (item['name'], item['price'])
-            item_sales[key] += item['qty']
+def _iso_day(day):
+    """"YYYY-MM-DD" for a date or an ISO date string (as sent by the order server's tills)."""
+    from datetime import date
+    if isinstance(day, str):
+        day = date.fromisoformat(day)
+    return day.strftime("%Y-%m-%d")
 
-    # Sort by quantity sold
-    sorted_items = sorted(item_sales.items(), key=lambda x: x[1], reverse=True)
-    return sorted_items[:limit]
+def get_hourly_rollup(start_day, end_day):
+    """Get (day, hour, order count, revenue, units) for start_day..end_day inclusive.
 
-def get_setting(name, default=None):
-    """Get a setting value from DB."""
+    The days may be dates or "YYYY-MM-DD" strings.
+    """
+    conn = get_db_connection()
+    cursor = conn.cursor()
+    cursor.execute("""
+        SELECT day, hour, order_count, revenue, units
+        FROM sales_hourly
+        WHERE day >= ? AND day <= ?
+        ORDER BY day, hour
+    """, (_iso_day(start_day), _iso_day(end_day)))
+    rows = [tuple(row) for row in cursor.fetchall()]
+    conn.close()
+    return rows
+
+def get_category_daily(start_day, end_day):
+    """Get (day, category, units, revenue) for start_day..end_day inclusive.
+
+    Items are matched to the menu by name; names no longer on it count
+    as "Other". The days may be dates or "YYYY-MM-DD" strings.
+    """
+    conn = get_db_connection()
+    cursor = conn.cursor()
+    cursor.execute("""
+        SELECT d.day, COALESCE(i.category, 'Other'), SUM(d.qty), SUM(d.revenue)
+        FROM sales_item_daily d
+        LEFT JOIN (SELECT name, MAX(category) AS category FROM items GROUP BY name) i
+            ON i.name = d.name
+        WHERE d.day >= ? AND d.day <= ?
+        GROUP BY 1, 2
+        ORDER BY 1, 2
+    """, (_iso_day(start_day), _iso_day(end_day)))
+    rows = [tuple(row) for row in cursor.fetchall()]
+    conn.close()
+    return rows
+
+def get_most_sold_items(limit=5, start_day=None, end_day=None):
+    """Get top N most sold items by quantity (optionally within a day range)."""
+    start = start_day.strftime("%Y-%m-%d") if start_day else "0000-00-00"
+    end = end_day.strftime("%Y-%m-%d") if end_day else "9999-99-99"
+    conn = get_db_connection()
+    cursor = conn.cursor()
+    cursor.execute("""
+        SELECT name, unit_price, SUM(qty) AS sold
+        FROM sales_item_daily
+        WHERE day >= ? AND day <= ?
+        GROUP BY name, unit_price
+        ORDER BY sold DESC
+        LIMIT ?
+    """, (start, end, limit))
+    rows = cursor.fetchall()
+    conn.close()
+
+    return [((name, price), sold) for name, price, sold in rows]
+
+def get_menu_items():
+    """Get (id, name, price, stock_quantity, category) of the items on sale."""
+    conn = get_db_connection()
+    cursor = conn.cursor()
+    cursor.execute("SELECT id, name, price, stock_quantity, category FROM items WHERE available = 1 ORDER BY name")
+    rows = [tuple(row) for row in cursor.fetchall()]
+    conn.close()
+    return rows
+
+def get_item_stock(item_ids=None):
+    """Get (id, stock_quantity) of the given items (all items if None)."""
+    conn = get_db_connection()
+    cursor = conn.cursor()
+    if item_ids is None:
+        cursor.execute("SELECT id, stock_quantity FROM items")
+    else:
+        cursor.execute(
+            f"SELECT id, stock_quantity FROM items WHERE id IN ({','.join('?' * len(item_ids))})",
+            list(item_ids)
+        )
+    rows = [tuple(row) for row in cursor.fetchall()]
+    conn.close()
+    return rows
+
+def get_all_items():
+    """Get (id, name, category, price) of every item, for the admin panel."""
+    conn = get_db_connection()
+    cursor = conn.cursor()
+    cursor.execute("SELECT id, name, category, price FROM items ORDER BY name")
+    rows = [tuple(row) for row in cursor.fetchall()]
+    conn.close()
+    return rows
+
+def add_menu_item(name, category, price):
+    """Add a menu item; returns its id."""
+    conn = get_db_connection()
+    cursor = conn.cursor()
+    cursor.execute(
+        "INSERT INTO items (name, category, price) VALUES (?, ?, ?)",
+        (name, category, price)
+    )
+    conn.commit()
+    conn.close()
+    return cursor.lastrowid
+
+def delete_menu_item(item_id):
+    """Delete a menu item."""
     conn = get_db_connection()
     cursor = conn.cursor()
-    cursor.execute("SELECT value FROM settings WHERE name = ?", (name,))
-    result = cursor.fetchone()
+    cursor.execute("DELETE FROM items WHERE id = ?", (item_id,))
+    conn.commit()
     conn.close()
-    return result[0] if result else default
+
+def get_setting(name, default=None):
+    """Get a setting value (from the in-process cache, no query)."""
+    cache = _settings_cache
+    if cache is None:
+        cache = reload_settings()
+    return cache.get(name, default)
+
+def get_tax_percent():
+    """Get the current tax percentage as a float."""
+    try:
+        return float(get_setting("tax_percent", DEFAULT_SETTINGS["tax_percent"]))
+    except ValueError:
+        return float(DEFAULT_SETTINGS["tax_percent"])
 
 def set_setting(name, value):
-    """Save a setting to DB."""
+    """Save a setting to DB and update the cache."""
+    global _settings_cache
     conn = get_db_connection()
     cursor = conn.cursor()
     cursor.execute(
@@ -226,4 +811,98 @@ def set_setting(name, value):
         (name, value)
     )
     conn.commit()
-    conn.close()
\ No newline at end of file
+    conn.close()
+
+    with _settings_lock:
+        if _settings_cache is not None:
+            old = _settings_cache.get(name)
+            _settings_cache = {**_settings_cache, name: value}
+        else:
+            old = None
+    if old != value:
+        _notify_settings_listeners(name, value)
+
+def reload_settings():
+    """(Re)load all settings into the cache; notify listeners of changes."""
+    global _settings_cache, _settings_seen_version, _settings_seen_revision
+    conn = get_db_connection()
+    with _settings_lock:
+        version = conn.execute("PRAGMA data_version").fetchone()[0]
+        # Revision first: a write landing in between just means one extra reload
+        revision = _settings_revision(conn)
+        new = {name: value for name, value in conn.execute("SELECT name, value FROM settings")}
+        old = _settings_cache
+        _settings_cache = new
+        _settings_seen_version = (id(conn), version)
+        _settings_seen_revision = revision
+    conn.close()
+
+    if old is not None:
+        for name, value in new.items():
+            if old.get(name) != value:
+                _notify_settings_listeners(name, value)
+    return new
+
+def get_all_settings():
+    """Get every setting as {name: value}."""
+    cache = _settings_cache
+    if cache is None:
+        cache = reload_settings()
+    return dict(cache)
+
+def apply_settings(values):
+    """Merge settings read elsewhere (the order server) into the cache; notify listeners."""
+    global _settings_cache
+    with _settings_lock:
+        old = _settings_cache or {}
+        _settings_cache = {**old, **values}
+    for name, value in values.items():
+        if old.get(name) != value:
+            _notify_settings_listeners(name, value)
+
+def set_settings(values):
+    """Save several settings ({name: value}) one after another."""
+    for name, value in values.items():
+        set_setting(name, value)
+
+def _settings_revision(conn):
+    row = conn.execute("SELECT revision FROM settings_revision WHERE id = 1").fetchone()
+    return row[0] if row else None
+
+def check_settings_changed():
+    """Reload settings if another connection/process has changed them.
+
+    Cheap enough to poll from a timer: PRAGMA data_version (which doesn't
+    touch any table) rules out most polls, and since every order batch
+    changes it too, settings_revision (bumped by a trigger on settings)
+    decides whether they need re-reading.
+    """
+    global _settings_seen_version
+    conn = get_db_connection()
+    version = conn.execute("PRAGMA data_version").fetchone()[0]
+    if _settings_seen_version == (id(conn), version):
+        return
+    if _settings_seen_version is not None and _settings_revision(conn) == _settings_seen_revision:
+        _settings_seen_version = (id(conn), version)
+        return
+    reload_settings()
+
+def add_settings_listener(callback):
+    """Call callback(name, value) whenever a setting changes."""
+    _settings_listeners.append(callback)
+
+def remove_settings_listener(callback):
+    if callback in _settings_listeners:
+        _settings_listeners.remove(callback)
+
+def _notify_settings_listeners(name, value):
+    for callback in list(_settings_listeners):
+        try:
+            callback(name, value)
+        except Exception as e:
+            print(f"⚠️ Settings listener failed: {e}")
+
+# Time every function above (Admin → Performance); connection and setting
+# lookups run inside nearly every call, so they are left out
+from .perf import instrument_module
+instrument_module(globals(), "database", skip=("get_db_connection", "get_setting"))
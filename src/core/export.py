@@ -0,0 +1,50 @@
+# src/core/export.py
+import csv
+import gzip
+import os
+from .config import BASE_DIR
+from .database import iter_sales_lines
+
+CSV_HEADER = ["Order ID", "Date & Time", "Item", "Qty", "Price", "Total"]
+DEFAULT_EXPORT_PATH = os.path.join(BASE_DIR, "sales_report.csv")
+
+class ExportCancelled(Exception):
+    """Raised when an export is cancelled before it finishes."""
+
+def export_sales_csv(path=DEFAULT_EXPORT_PATH, start=None, end=None, compress=False,
+                     progress=None, is_cancelled=None, chunk_rows=1000):
+    """Stream completed sales line items into a CSV (optionally gzip) file.
+
+    progress(rows_written) is called every chunk_rows rows and
+    is_cancelled() is polled at the same points. The file is written to
+    a temporary name and only moved into place once complete, so a
+    cancelled or failed export never leaves a half-written report.
+    Returns (line items written, final path).
+    """
+    if compress and not path.endswith(".gz"):
+        path += ".gz"
+    tmp_path = path + ".part"
+    opener = gzip.open if compress else open
+
+    rows = 0
+    try:
+        with opener(tmp_path, 'wt', newline='', encoding='utf-8') as f:
+            writer = csv.writer(f)
+            writer.writerow(CSV_HEADER)
+            for line in iter_sales_lines(start, end):
+                writer.writerow(line)
+                rows += 1
+                if rows % chunk_rows == 0:
+                    if is_cancelled and is_cancelled():
+                        raise ExportCancelled()
+                    if progress:
+                        progress(rows)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+    if progress:
+        progress(rows)
+    return rows, path
@@ -0,0 +1,68 @@
+# src/core/held_sweeper.py
+import atexit
+import threading
+from .config import HELD_SWEEP_INTERVAL
+from .database import expire_held_orders, close_db_connection
+
+class HeldOrderSweeper:
+    """Background thread that deletes expired held orders on a timer.
+
+    The TTL is the held_ttl_minutes setting. Listeners get the list of
+    deleted held ids after every sweep that removed something.
+    """
+
+    def __init__(self, interval=HELD_SWEEP_INTERVAL):
+        self.interval = interval
+        self.listeners = []
+        self._thread = None
+        self._stop = threading.Event()
+
+    def add_listener(self, callback):
+        self.listeners.append(callback)
+
+    def start(self):
+        if self._thread is None:
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="held-sweeper", daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        if self._thread is not None:
+            self._stop.set()
+            self._thread.join()
+            self._thread = None
+
+    def sweep(self):
+        """Expire held orders now; returns the deleted ids."""
+        try:
+            expired = expire_held_orders()
+        except Exception as e:
+            print(f"⚠️ Held order sweep failed: {e}")
+            return []
+        if expired:
+            print(f"🧹 {len(expired)} old held order(s) automatically deleted")
+            for callback in list(self.listeners):
+                try:
+                    callback(expired)
+                except Exception as e:
+                    print(f"⚠️ Sweeper listener failed: {e}")
+        return expired
+
+    def _run(self):
+        try:
+            self.sweep()
+            while not self._stop.wait(self.interval):
+                self.sweep()
+        finally:
+            close_db_connection()
+
+_sweeper = None
+
+def get_held_sweeper():
+    """Return the shared, started HeldOrderSweeper."""
+    global _sweeper
+    if _sweeper is None:
+        _sweeper = HeldOrderSweeper()
+        _sweeper.start()
+        atexit.register(_sweeper.stop)
+    return _sweeper
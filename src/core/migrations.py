@@ -0,0 +1,331 @@
+# src/core/migrations.py
+import json
+import os
+import sqlite3
+from .config import DEFAULT_SETTINGS, MIGRATION_BATCH_SIZE
+
+# Registry of (version, name, function, batched), applied in version order.
+# Never edit or renumber a released migration; add a new one instead.
+MIGRATIONS = []
+
+def migration(version, name, batched=False):
+    """Register a schema migration for PRAGMA user_version = version.
+
+    Plain migrations take a cursor and run inside the shared transaction.
+    Batched (data) migrations are generators taking (cursor, position):
+    they yield (position, done, total) after each batch, the runner
+    commits and saves position, and an interrupted run resumes from it.
+    """
+    def register(fn):
+        MIGRATIONS.append((version, name, fn, batched))
+        MIGRATIONS.sort(key=lambda m: m[0])
+        return fn
+    return register
+
+def latest_version():
+    return MIGRATIONS[-1][0] if MIGRATIONS else 0
+
+def print_progress(name, done, total):
+    if total:
+        print(f"⏳ {name}: {done:,}/{total:,} ({done * 100 // total}%)")
+    else:
+        print(f"⏳ {name}: {done:,}")
+
+def migrate(conn, progress=print_progress):
+    """Apply every migration newer than the database's user_version.
+
+    Returns the number of migrations applied. Consecutive plain
+    migrations share one transaction; each batch of a data migration is
+    its own transaction.
+    """
+    cursor = conn.cursor()
+    if cursor.execute("PRAGMA user_version").fetchone()[0] >= latest_version():
+        return 0
+
+    applied = 0
+    cursor.execute("BEGIN IMMEDIATE")
+    try:
+        # Re-read under the write lock: another till may have just migrated
+        current = cursor.execute("PRAGMA user_version").fetchone()[0]
+        _create_progress_table(cursor)
+        for version, name, fn, batched in MIGRATIONS:
+            if version <= current:
+                continue
+            if batched:
+                _run_batched(conn, cursor, version, name, fn, progress)
+            else:
+                fn(cursor)
+                _set_version(cursor, version)
+            applied += 1
+            print(f"✅ Migration {version}: {name}")
+        conn.commit()
+    except BaseException:
+        conn.rollback()
+        raise
+    return applied
+
+def _set_version(cursor, version):
+    # PRAGMA takes no parameters; version is always an int from the registry
+    cursor.execute(f"PRAGMA user_version = {int(version)}")
+
+def _create_progress_table(cursor):
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS migration_progress (
+            version INTEGER PRIMARY KEY,
+            position INTEGER NOT NULL
+        )
+    ''')
+
+def _run_batched(conn, cursor, version, name, fn, progress):
+    row = cursor.execute("SELECT position FROM migration_progress WHERE version = ?", (version,)).fetchone()
+    position = row[0] if row else 0
+    # Make the plain migrations before this one durable first
+    conn.commit()
+    cursor.execute("BEGIN IMMEDIATE")
+    for position, done, total in fn(cursor, position):
+        cursor.execute(
+            "INSERT OR REPLACE INTO migration_progress (version, position) VALUES (?, ?)",
+            (version, position)
+        )
+        conn.commit()
+        if progress:
+            progress(name, done, total)
+        cursor.execute("BEGIN IMMEDIATE")
+    cursor.execute("DELETE FROM migration_progress WHERE version = ?", (version,))
+    _set_version(cursor, version)
+
+# ---------------------------------------------------------------------------
+# Migrations. Databases from before user_version was used are at version 0
+# and may already have some of these, so every step is idempotent.
+
+@migration(1, "Base tables (items, settings, orders)")
+def _base_tables(cursor):
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS items (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            name TEXT NOT NULL,
+            category TEXT,
+            price REAL NOT NULL,
+            available INTEGER DEFAULT 1,
+            stock_quantity INTEGER DEFAULT 999
+        )
+    ''')
+    # Items tables from the first release had no stock column
+    cursor.execute("PRAGMA table_info(items)")
+    if "stock_quantity" not in [col[1] for col in cursor.fetchall()]:
+        cursor.execute("ALTER TABLE items ADD COLUMN stock_quantity INTEGER DEFAULT 999")
+
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS settings (
+            name TEXT PRIMARY KEY,
+            value TEXT NOT NULL
+        )
+    ''')
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS orders (
+            order_id INTEGER PRIMARY KEY AUTOINCREMENT,
+            date_time TEXT NOT NULL,
+            total_amount REAL NOT NULL,
+            items_json TEXT NOT NULL,
+            status TEXT NOT NULL DEFAULT 'completed'
+        )
+    ''')
+
+@migration(2, "Held orders table")
+def _held_orders(cursor):
+    # Held (parked) carts live apart from sales
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS held_orders (
+            held_id INTEGER PRIMARY KEY AUTOINCREMENT,
+            created_at TEXT NOT NULL,
+            updated_at TEXT NOT NULL,
+            total_amount REAL NOT NULL,
+            items_json TEXT NOT NULL
+        )
+    ''')
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_held_orders_updated ON held_orders (updated_at)")
+
+    # Move held rows left in orders by older versions
+    cursor.execute("""
+        INSERT OR IGNORE INTO held_orders (held_id, created_at, updated_at, total_amount, items_json)
+        SELECT order_id, date_time, date_time, total_amount, items_json
+        FROM orders WHERE status = 'held'
+    """)
+    cursor.execute("DELETE FROM orders WHERE status = 'held'")
+
+@migration(3, "Orders (status, date_time) index")
+def _orders_status_time_index(cursor):
+    # Status + timestamp index so date filters are range seeks, not scans
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_orders_status_time ON orders (status, date_time)")
+
+@migration(4, "Order lines table")
+def _order_lines(cursor):
+    # One row per item sold, replaces parsing items_json
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS order_lines (
+            line_id INTEGER PRIMARY KEY AUTOINCREMENT,
+            order_id INTEGER NOT NULL REFERENCES orders(order_id) ON DELETE CASCADE,
+            item_id INTEGER REFERENCES items(id) ON DELETE SET NULL,
+            name TEXT NOT NULL,
+            unit_price REAL NOT NULL,
+            qty INTEGER NOT NULL,
+            line_total REAL NOT NULL
+        )
+    ''')
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_order_lines_order ON order_lines (order_id)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_order_lines_item ON order_lines (name, unit_price, qty)")
+
+@migration(5, "Copy items_json of old orders into order lines", batched=True)
+def _backfill_order_lines(cursor, after):
+    from .database import _insert_order_lines
+    total = cursor.execute(
+        "SELECT COUNT(*) FROM orders WHERE status = 'completed' AND order_id > ?", (after,)
+    ).fetchone()[0]
+    cursor.execute("SELECT name, id FROM items")
+    item_ids_by_name = {name: item_id for name, item_id in cursor.fetchall()}
+
+    done = 0
+    while True:
+        rows = cursor.execute("""
+            SELECT o.order_id, o.items_json,
+                   EXISTS (SELECT 1 FROM order_lines l WHERE l.order_id = o.order_id)
+            FROM orders o
+            WHERE o.status = 'completed' AND o.order_id > ?
+            ORDER BY o.order_id
+            LIMIT ?
+        """, (after, MIGRATION_BATCH_SIZE)).fetchall()
+        if not rows:
+            return
+        for order_id, items_json, has_lines in rows:
+            if not has_lines:
+                _insert_order_lines(cursor, order_id, json.loads(items_json), item_ids_by_name)
+        after = rows[-1][0]
+        done += len(rows)
+        yield after, done, total
+
+@migration(6, "Sales rollup tables")
+def _sales_rollups(cursor):
+    from .database import rebuild_rollups
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS sales_daily (
+            day TEXT PRIMARY KEY,
+            order_count INTEGER NOT NULL DEFAULT 0,
+            revenue REAL NOT NULL DEFAULT 0
+        )
+    ''')
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS sales_hourly (
+            day TEXT NOT NULL,
+            hour INTEGER NOT NULL,
+            order_count INTEGER NOT NULL DEFAULT 0,
+            revenue REAL NOT NULL DEFAULT 0,
+            PRIMARY KEY (day, hour)
+        )
+    ''')
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS sales_item_daily (
+            day TEXT NOT NULL,
+            name TEXT NOT NULL,
+            unit_price REAL NOT NULL,
+            qty INTEGER NOT NULL DEFAULT 0,
+            revenue REAL NOT NULL DEFAULT 0,
+            PRIMARY KEY (day, name, unit_price)
+        )
+    ''')
+    # Backfill for databases created before the rollups existed
+    cursor.execute("SELECT EXISTS (SELECT 1 FROM sales_daily)")
+    if not cursor.fetchone()[0]:
+        rebuild_rollups(cursor)
+
+@migration(7, "Default settings and sample menu")
+def _defaults(cursor):
+    cursor.executemany(
+        "INSERT OR IGNORE INTO settings (name, value) VALUES (?, ?)",
+        list(DEFAULT_SETTINGS.items())
+    )
+    cursor.execute("SELECT COUNT(*) FROM items")
+    if cursor.fetchone()[0] == 0:
+        sample_items = [
+            ("Tea", "Drinks", 10.0, 50),
+            ("Coffee", "Drinks", 15.0, 30),
+            ("Sandwich", "Snacks", 30.0, 20),
+            ("Biscuit", "Snacks", 5.0, 100),
+        ]
+        cursor.executemany(
+            "INSERT INTO items (name, category, price, stock_quantity) VALUES (?, ?, ?, ?)",
+            sample_items
+        )
+
+@migration(8, "Archived months table and archive setting")
+def _archived_months(cursor):
+    # One row per month moved to an archive file (see archiver.py); the
+    # order id range lets history pages skip files they can't need
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS archived_months (
+            month TEXT PRIMARY KEY,
+            first_order_id INTEGER NOT NULL,
+            last_order_id INTEGER NOT NULL,
+            order_count INTEGER NOT NULL,
+            line_count INTEGER NOT NULL,
+            archived_at TEXT NOT NULL
+        )
+    ''')
+    cursor.execute(
+        "INSERT OR IGNORE INTO settings (name, value) VALUES ('archive_after_days', ?)",
+        (DEFAULT_SETTINGS["archive_after_days"],)
+    )
+
+@migration(9, "Backup settings")
+def _backup_settings(cursor):
+    cursor.executemany(
+        "INSERT OR IGNORE INTO settings (name, value) VALUES (?, ?)",
+        [(name, DEFAULT_SETTINGS[name]) for name in ("backup_interval_hours", "backup_keep")]
+    )
+
+@migration(10, "Units sold in the hourly rollup")
+def _hourly_units(cursor):
+    from .database import _has_column, archive_path
+    if not _has_column(cursor, "sales_hourly", "units"):
+        cursor.execute("ALTER TABLE sales_hourly ADD COLUMN units INTEGER NOT NULL DEFAULT 0")
+
+    units_sql = """
+        SELECT substr(o.date_time, 1, 10), CAST(substr(o.date_time, 12, 2) AS INTEGER), SUM(l.qty)
+        FROM orders o
+        JOIN order_lines l ON l.order_id = o.order_id
+        WHERE o.status = 'completed'
+        GROUP BY 1, 2
+    """
+    units = {(day, hour): qty for day, hour, qty in cursor.execute(units_sql).fetchall()}
+    # Archived months are read from their files (ATTACH isn't allowed in a transaction)
+    for (month,) in cursor.execute("SELECT month FROM archived_months").fetchall():
+        if not os.path.exists(archive_path(month)):
+            continue
+        archive = sqlite3.connect(archive_path(month))
+        try:
+            units.update({(day, hour): qty for day, hour, qty in archive.execute(units_sql).fetchall()})
+        finally:
+            archive.close()
+    cursor.executemany(
+        "UPDATE sales_hourly SET units = ? WHERE day = ? AND hour = ?",
+        [(qty, day, hour) for (day, hour), qty in units.items()]
+    )
+
+@migration(11, "Settings revision")
+def _settings_revision(cursor):
+    # Bumped by every write to settings, so watchers can tell settings
+    # edits apart from the orders that change data_version all day
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS settings_revision (
+            id INTEGER PRIMARY KEY CHECK (id = 1),
+            revision INTEGER NOT NULL
+        )
+    """)
+    cursor.execute("INSERT OR IGNORE INTO settings_revision (id, revision) VALUES (1, 0)")
+    for event in ("INSERT", "UPDATE", "DELETE"):
+        cursor.execute(f"""
+            CREATE TRIGGER IF NOT EXISTS settings_revision_{event.lower()}
+            AFTER {event} ON settings
+            BEGIN
+                UPDATE settings_revision SET revision = revision + 1 WHERE id = 1;
+            END
+        """)
@@ -0,0 +1,281 @@
+# src/core/order_client.py
+import functools
+import itertools
+import json
+import socket
+import threading
+from datetime import datetime
+from .config import ORDER_SERVER_TIMEOUT, ORDER_SERVER_SECRET, ORDER_ID_BLOCK
+from .order_protocol import REMOTE_CALLS, encode, parse_address
+from .order_writer import OrderTicket
+
+class RemoteError(Exception):
+    """The order server could not carry out a request."""
+
+class OrderClient:
+    """A till's connection to the order server (multi-counter mode).
+
+    Stands in for the database module wherever a till takes a store
+    (Cart, StockLedger, the windows): every name in REMOTE_CALLS is a
+    blocking method with the same signature, run on the server. Pushed
+    events reach listeners as callback(event, data) on the reader thread;
+    "disconnected" is sent when the connection drops.
+    """
+
+    def __init__(self, address, timeout=ORDER_SERVER_TIMEOUT, secret=ORDER_SERVER_SECRET):
+        self.address = address
+        self.timeout = timeout
+        self.secret = secret
+        self.admin = False   # Logged in with the admin password (see login_admin)
+        self.listeners = []
+        self._sock = None
+        self._send_lock = threading.Lock()
+        self._ids = itertools.count(1)
+        self._waiting = {}   # request id: callback(ok, result)
+        self._writer = None
+
+    def add_listener(self, callback):
+        self.listeners.append(callback)
+
+    def connect(self):
+        """Connect, present the shared secret and load the server's settings into the local cache.
+
+        Raises RemoteError if the server refuses the secret.
+        """
+        from .database import apply_settings
+        kind, target = parse_address(self.address)
+        if kind == "unix":
+            sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            sock.settimeout(self.timeout)
+            sock.connect(target)
+        else:
+            sock = socket.create_connection(target, timeout=self.timeout)
+            sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        sock.settimeout(None)
+        self._sock = sock
+        threading.Thread(target=self._read, args=(sock,), name="order-client", daemon=True).start()
+        self.call("hello", self.secret)
+        apply_settings(self.call("get_all_settings"))
+
+    def login_admin(self, password):
+        """Unlock the admin calls (menu, settings, delete all held) for this connection.
+
+        Raises RemoteError if the password is wrong.
+        """
+        self.call("admin_login", password)
+        self.admin = True
+
+    def close(self):
+        if self._writer is not None and self._sock is not None:
+            self._writer.release_ids()
+        sock, self._sock = self._sock, None
+        if sock is not None:
+            try:
+                sock.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+            sock.close()
+
+    @property
+    def writer(self):
+        """OrderWriter stand-in that checks out through the server."""
+        if self._writer is None:
+            self._writer = RemoteOrderWriter(self)
+        return self._writer
+
+    def request(self, op, *args, callback=None, **kwargs):
+        """Send a request without waiting; callback(ok, result or error text) runs on the reader thread."""
+        request_id = next(self._ids)
+        if callback is not None:
+            self._waiting[request_id] = callback
+        message = encode({"id": request_id, "op": op, "args": list(args), "kwargs": kwargs})
+        try:
+            with self._send_lock:
+                if self._sock is None:
+                    raise ConnectionError("Not connected to the order server")
+                self._sock.sendall(message)
+        except OSError as e:
+            self._waiting.pop(request_id, None)
+            raise ConnectionError(f"Order server unreachable: {e}") from e
+
+    def call(self, op, *args, **kwargs):
+        """Send a request and wait for its result; raises RemoteError on failure."""
+        done = threading.Event()
+        reply = []
+
+        def finished(ok, result):
+            reply.append((ok, result))
+            done.set()
+
+        self.request(op, *args, callback=finished, **kwargs)
+        if not done.wait(self.timeout):
+            raise TimeoutError(f"Order server did not answer {op} within {self.timeout:.0f}s")
+        ok, result = reply[0]
+        if not ok:
+            raise RemoteError(result)
+        return result
+
+    def save_held_order(self, cart_items, held_id=None):
+        # Cart keys are (name, price) tuples, which JSON can't carry; only the values are used
+        items = {str(i): item for i, item in enumerate(cart_items.values())}
+        return self.call("save_held_order", items, held_id)
+
+    def _read(self, sock):
+        try:
+            for line in sock.makefile("rb"):
+                message = json.loads(line)
+                if "event" in message:
+                    if message["event"] == "settings":
+                        from .database import apply_settings
+                        apply_settings(message["data"])
+                    self._notify(message["event"], message.get("data"))
+                    continue
+                callback = self._waiting.pop(message.get("id"), None)
+                if callback is not None:
+                    callback(message["ok"], message.get("result") if message["ok"] else message.get("error"))
+        except (OSError, ValueError) as e:
+            print(f"⚠️ Order server connection error: {e}")
+        # Nobody will answer the requests still waiting
+        waiting, self._waiting = self._waiting, {}
+        for callback in waiting.values():
+            callback(False, "Connection to the order server was lost")
+        if self._sock is sock:
+            self._sock = None
+            self._notify("disconnected", None)
+
+    def _notify(self, event, data):
+        for callback in list(self.listeners):
+            try:
+                callback(event, data)
+            except Exception as e:
+                print(f"⚠️ Order server listener failed: {e}")
+
+def _remote_call(name):
+    def call(self, *args, **kwargs):
+        return self.call(name, *args, **kwargs)
+    call.__name__ = name
+    return call
+
+for _name in REMOTE_CALLS:
+    if not hasattr(OrderClient, _name):
+        setattr(OrderClient, _name, _remote_call(_name))
+
+class RemoteOrderWriter:
+    """OrderWriter stand-in for a till on the order server.
+
+    Same submit/flush/add_listener API: order ids come from blocks
+    reserved on the server, so submit() still returns at once, and
+    listeners get (order_id, ok, error) when the server has committed
+    the order.
+    """
+
+    def __init__(self, client, id_block=ORDER_ID_BLOCK):
+        self.client = client
+        self.id_block = id_block
+        self.listeners = []
+        self.busy_retries = 0   # Stats, as OrderWriter (retries happen on the server)
+        self._ids = threading.Condition()
+        self._next_id = None
+        self._last_id = None
+        self._spare_block = None      # First id of a block reserved ahead
+        self._refill_requested = False
+        self._in_flight = {}   # order_id: OrderTicket
+        self._idle = threading.Condition()
+        with self._ids:
+            self._refill()
+
+    def add_listener(self, callback):
+        self.listeners.append(callback)
+
+    def _refill(self):
+        """Ask the server for the next id block (call with self._ids held)."""
+        def reserved(ok, first):
+            with self._ids:
+                self._refill_requested = False
+                if ok:
+                    self._spare_block = first
+                else:
+                    print(f"⚠️ Could not reserve order ids: {first}")
+                self._ids.notify_all()
+
+        self._refill_requested = True
+        try:
+            self.client.request("reserve_order_ids", self.id_block, callback=reserved)
+        except ConnectionError:
+            self._refill_requested = False
+            raise
+
+    def _allocate_id(self):
+        with self._ids:
+            if self._next_id is None or self._next_id > self._last_id:
+                if self._spare_block is None:
+                    # Only at start or if the last reservation failed; the
+                    # reply arrives on the reader thread, so wait, don't call
+                    if not self._refill_requested:
+                        self._refill()
+                    self._ids.wait_for(lambda: not self._refill_requested, self.client.timeout)
+                    if self._spare_block is None:
+                        raise RemoteError("Could not reserve order ids on the order server")
+                first, self._spare_block = self._spare_block, None
+                self._next_id, self._last_id = first, first + self.id_block - 1
+            order_id = self._next_id
+            self._next_id += 1
+            # Reserve the next block before this one runs out
+            if (self._last_id - order_id < self.id_block // 2
+                    and self._spare_block is None and not self._refill_requested):
+                try:
+                    self._refill()
+                except ConnectionError as e:
+                    print(f"⚠️ Could not reserve order ids: {e}")
+            return order_id
+
+    def release_ids(self):
+        """Give back the ids reserved but not used (on a clean shutdown)."""
+        with self._ids:
+            blocks = []
+            if self._spare_block is not None:
+                blocks.append((self._spare_block, self._spare_block + self.id_block - 1))
+            if self._next_id is not None and self._next_id <= self._last_id:
+                blocks.append((self._next_id, self._last_id))
+            self._next_id = self._last_id = self._spare_block = None
+        for first, last in blocks:
+            try:
+                self.client.call("release_order_ids", first, last)
+            except (ConnectionError, TimeoutError, RemoteError) as e:
+                print(f"⚠️ Could not release order ids {first}-{last}: {e}")
+
+    def submit(self, items_list, total):
+        """Send a completed order to the server; returns an OrderTicket with its order id."""
+        date_time = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        ticket = OrderTicket(self._allocate_id(), items_list, total, date_time)
+        with self._idle:
+            self._in_flight[ticket.order_id] = ticket
+        try:
+            self.client.request(
+                "checkout", items_list, total, order_id=ticket.order_id,
+                callback=functools.partial(self._finish, ticket)
+            )
+        except ConnectionError:
+            # Not sent: the caller keeps the cart
+            with self._idle:
+                self._in_flight.pop(ticket.order_id, None)
+                self._idle.notify_all()
+            raise
+        return ticket
+
+    def flush(self, timeout=None):
+        """Wait until the server has answered every order submitted so far."""
+        with self._idle:
+            return self._idle.wait_for(lambda: not self._in_flight, timeout)
+
+    def _finish(self, ticket, ok, result):
+        ticket.error = None if ok else RemoteError(result)
+        ticket._committed.set()
+        with self._idle:
+            self._in_flight.pop(ticket.order_id, None)
+            self._idle.notify_all()
+        for callback in list(self.listeners):
+            try:
+                callback(ticket.order_id, ok, ticket.error)
+            except Exception as e:
+                print(f"⚠️ Order listener failed: {e}")
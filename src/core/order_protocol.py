@@ -0,0 +1,61 @@
+# src/core/order_protocol.py
+import json
+
+# Wire format between tills and the order server: one JSON object per line.
+# A till's first request must be "hello" with the shared secret
+# (ORDER_SERVER_SECRET); the server hangs up on anything else.
+#   request:  {"id": 7, "op": "get_held_orders", "args": [], "kwargs": {}}
+#   reply:    {"id": 7, "ok": true, "result": ...} / {"id": 7, "ok": false, "error": "..."}
+#   push:     {"event": "stock", "data": [[item_id, stock], ...]}
+# Events: "stock" (DB stock after checkouts), "menu" (items edited),
+# "held" (held orders changed), "settings" ({name: value}).
+
+MAX_MESSAGE = 4 * 1024 * 1024   # Longest line either side accepts (bytes)
+
+# Database functions a till may call, and the event pushed to every till
+# after one succeeds (None = read only). Settings changes are pushed by
+# the server's settings listener instead.
+REMOTE_CALLS = {
+    "get_menu_items": None,
+    "get_item_stock": None,
+    "get_all_items": None,
+    "add_menu_item": "menu",
+    "delete_menu_item": "menu",
+    "save_held_order": "held",
+    "get_held_orders": None,
+    "get_held_order": None,
+    "get_held_order_items": None,
+    "delete_held_order": "held",
+    "delete_all_held_orders": "held",
+    "expire_held_orders": "held",
+    "get_daily_summary": None,
+    "get_most_sold_items": None,
+    "get_hourly_rollup": None,
+    "get_category_daily": None,
+    "get_orders_page": None,
+    "get_all_settings": None,
+    "set_settings": None,
+    "reserve_order_ids": None,
+    "release_order_ids": None,
+}
+
+# Calls that change the menu, settings or everyone's held orders: only run
+# for a till that sent "admin_login" with the admin password
+ADMIN_CALLS = {"add_menu_item", "delete_menu_item", "delete_all_held_orders", "set_settings"}
+
+# Settings that never cross the wire: not sent to tills, not settable by them
+PRIVATE_SETTINGS = ("admin_password",)
+
+MAX_ID_BLOCK = 1000   # Most order ids one reserve_order_ids call may take
+
+def encode(message):
+    return (json.dumps(message, separators=(",", ":")) + "\n").encode("utf-8")
+
+def parse_address(address):
+    """Split "host:port" into ("tcp", (host, port)), "unix:/path" into ("unix", path)."""
+    if address.startswith("unix:"):
+        return "unix", address[len("unix:"):]
+    host, _, port = address.rpartition(":")
+    if not host or not port.isdigit():
+        raise ValueError(f"Bad order server address {address!r} (want host:port or unix:/path)")
+    return "tcp", (host, int(port))
@@ -0,0 +1,281 @@
+# src/core/order_server.py
+import asyncio
+import functools
+import hmac
+import ipaddress
+import json
+from concurrent.futures import ThreadPoolExecutor
+from . import database
+from .config import ORDER_SERVER_ADDRESS, ORDER_SERVER_SECRET
+from .order_protocol import (
+    REMOTE_CALLS, ADMIN_CALLS, PRIVATE_SETTINGS, MAX_ID_BLOCK, MAX_MESSAGE, encode, parse_address
+)
+from .order_writer import OrderWriter
+
+def _same_secret(given, expected):
+    return isinstance(given, str) and hmac.compare_digest(given.encode("utf-8"), expected.encode("utf-8"))
+
+def _is_loopback(host):
+    try:
+        return ipaddress.ip_address(host).is_loopback
+    except ValueError:
+        return host == "localhost"
+
+class _Till:
+    """One connected till: its stream, what it may do and the order ids it reserved."""
+
+    def __init__(self, writer):
+        self.writer = writer
+        self.authenticated = False   # Sent the shared secret
+        self.admin = False           # Sent the admin password
+        self.id_blocks = []          # [(first, last)] from reserve_order_ids
+
+    def owns(self, first, last):
+        return isinstance(first, int) and isinstance(last, int) and any(
+            start <= first <= last <= end for start, end in self.id_blocks
+        )
+
+class OrderServer:
+    """Owns canteen.db for several tills (multi-counter mode).
+
+    Tills connect over TCP or a Unix socket (see order_protocol.py).
+    Checkouts go to one group-commit OrderWriter, so more counters mean
+    bigger batches rather than more fsyncs or lock fights; every other
+    call runs on a single database thread, in the order it arrived. After
+    a write, every connected till is told ("stock", "menu", "held",
+    "settings") so it can refresh.
+
+    Tills must open with the shared secret; menu, settings and
+    delete-all calls (ADMIN_CALLS) also need the admin password, and the
+    admin password itself is never sent or accepted over the wire.
+    """
+
+    def __init__(self, address=ORDER_SERVER_ADDRESS, secret=ORDER_SERVER_SECRET, services=False):
+        self.address = address
+        self.secret = secret
+        # Held-order sweeper, settings watcher, archiver and backups for
+        # DB_PATH: on for the real server (run_server), off for throwaway databases
+        self.services = services
+        self.clients = set()        # Tills that sent the shared secret
+        self.writer = OrderWriter(prefetch_ids=False)   # Tills reserve their own ids
+        self._db = ThreadPoolExecutor(max_workers=1, thread_name_prefix="order-server-db")
+        self._loop = None
+        self._server = None
+        self._checkouts = {}        # order_id: (future, item ids)
+        self._stock_dirty = set()   # Items sold since the last stock push
+        self._stock_push = None
+        self.requests = 0
+
+    async def start(self):
+        kind, target = parse_address(self.address)
+        if kind == "tcp" and not self.secret and not _is_loopback(target[0]):
+            raise ValueError(f"Set POS_SERVER_SECRET before listening on {self.address} "
+                             f"(without a secret the server only listens on 127.0.0.1)")
+        self._loop = asyncio.get_running_loop()
+        self.writer.add_listener(
+            lambda order_id, ok, error: self._loop.call_soon_threadsafe(self._written, order_id, error)
+        )
+        self.writer.start()
+        database.add_settings_listener(
+            lambda name, value: name not in PRIVATE_SETTINGS
+            and self._loop.call_soon_threadsafe(self.broadcast, "settings", {name: value})
+        )
+        if self.services:
+            from .archiver import get_order_archiver
+            from .backup import get_backup_service
+            from .held_sweeper import get_held_sweeper
+            from .settings_watcher import get_settings_watcher
+            get_held_sweeper().add_listener(
+                lambda held_ids: self._loop.call_soon_threadsafe(self.broadcast, "held", held_ids)
+            )
+            # Settings edited straight in the database reach the tills too
+            get_settings_watcher()
+            get_order_archiver()
+            get_backup_service()
+
+        if kind == "unix":
+            self._server = await asyncio.start_unix_server(self._serve_client, path=target, limit=MAX_MESSAGE)
+        else:
+            host, port = target
+            self._server = await asyncio.start_server(self._serve_client, host, port, limit=MAX_MESSAGE)
+        print(f"✅ Order server listening on {self.address}")
+
+    async def serve_forever(self):
+        await self.start()
+        try:
+            await self._server.serve_forever()
+        finally:
+            await self.close()
+
+    async def close(self):
+        if self._server is not None:
+            self._server.close()
+            self._server = None
+        for client in list(self.clients):
+            client.writer.close()
+        # Write everything queued before the database thread goes away
+        await self._loop.run_in_executor(None, self.writer.stop)
+        self._db.submit(database.close_db_connection)
+        self._db.shutdown(wait=True)
+
+    async def _serve_client(self, reader, writer):
+        till = _Till(writer)
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                try:
+                    request = json.loads(line)
+                    if not isinstance(request, dict):
+                        raise ValueError(request)
+                except ValueError:
+                    self._send(writer, {"id": None, "ok": False, "error": "Malformed request"})
+                    if not till.authenticated:
+                        break
+                    continue
+                if not till.authenticated:
+                    if not self._hello(till, request):
+                        break
+                    continue
+                # Handled concurrently so a slow report doesn't hold up
+                # this till's checkouts; DB calls still run in arrival order
+                asyncio.ensure_future(self._handle(request, till))
+        except (ConnectionError, asyncio.LimitOverrunError, ValueError) as e:
+            print(f"⚠️ Till disconnected: {e}")
+        finally:
+            self.clients.discard(till)
+            writer.close()
+
+    def _hello(self, till, request):
+        """Check a new till's shared secret; False (after saying why) if it is wrong."""
+        args = request.get("args") or [None]
+        if request.get("op") != "hello" or not _same_secret(args[0], self.secret):
+            print(f"⚠️ Refused a till at {till.writer.get_extra_info('peername')}: wrong or missing secret")
+            self._send(till.writer, {"id": request.get("id"), "ok": False,
+                                     "error": "PermissionError: Wrong or missing order server secret"})
+            return False
+        till.authenticated = True
+        self.clients.add(till)
+        self._send(till.writer, {"id": request.get("id"), "ok": True, "result": None})
+        return True
+
+    async def _handle(self, request, till):
+        self.requests += 1
+        op = request.get("op")
+        args = request.get("args") or []
+        kwargs = request.get("kwargs") or {}
+        try:
+            if op == "checkout":
+                result = await self._checkout(till, *args, **kwargs)
+            elif op == "admin_login":
+                result = await self._loop.run_in_executor(self._db, self._admin_login, till, *args)
+            elif op in REMOTE_CALLS:
+                if op in ADMIN_CALLS and not till.admin:
+                    raise PermissionError(f"{op} needs the admin password (Admin Panel)")
+                # A few calls are checked or filtered here; the rest go straight to the database
+                fn = getattr(self, f"_remote_{op}", None)
+                fn = functools.partial(fn, till) if fn is not None else getattr(database, op)
+                result = await self._loop.run_in_executor(self._db, lambda: fn(*args, **kwargs))
+                if REMOTE_CALLS[op]:
+                    self.broadcast(REMOTE_CALLS[op], None)
+            else:
+                raise ValueError(f"Unknown operation {op!r}")
+            reply = {"id": request.get("id"), "ok": True, "result": result}
+        except Exception as e:
+            reply = {"id": request.get("id"), "ok": False, "error": f"{type(e).__name__}: {e}"}
+        self._send(till.writer, reply)
+
+    def _admin_login(self, till, password):
+        expected = database.get_setting("admin_password", database.DEFAULT_SETTINGS["admin_password"])
+        if not _same_secret(password, expected):
+            raise PermissionError("Wrong admin password")
+        till.admin = True
+
+    def _remote_get_all_settings(self, till):
+        settings = database.get_all_settings()
+        return {name: value for name, value in settings.items() if name not in PRIVATE_SETTINGS}
+
+    def _remote_set_settings(self, till, values):
+        private = sorted(set(values) & set(PRIVATE_SETTINGS))
+        if private:
+            raise PermissionError(f"{', '.join(private)} can only be changed on the order server's computer")
+        database.set_settings(values)
+
+    def _remote_expire_held_orders(self, till, ttl_minutes=None):
+        # Always the stored TTL: expire_held_orders(0) would delete every held order
+        return database.expire_held_orders()
+
+    def _remote_reserve_order_ids(self, till, count):
+        if not isinstance(count, int) or not 0 < count <= MAX_ID_BLOCK:
+            raise ValueError(f"Can reserve 1 to {MAX_ID_BLOCK} order ids at a time, not {count!r}")
+        first = database.reserve_order_ids(count)
+        till.id_blocks.append((first, first + count - 1))
+        return first
+
+    def _remote_release_order_ids(self, till, first, last):
+        if not till.owns(first, last):
+            raise PermissionError(f"Order ids {first}-{last} were not reserved by this till")
+        blocks = []
+        for start, end in till.id_blocks:
+            if start <= first <= end:
+                end = first - 1   # The ids before first were used and stay this till's
+            if start <= end:
+                blocks.append((start, end))
+        till.id_blocks = blocks
+        return database.release_order_ids(first, last)
+
+    async def _checkout(self, till, items_list, total, order_id=None):
+        """Queue an order on the writer; answers once it is committed."""
+        if order_id is not None and not till.owns(order_id, order_id):
+            raise PermissionError(f"Order id {order_id} was not reserved by this till")
+        ticket = self.writer.submit(items_list, total, order_id=order_id)
+        future = self._loop.create_future()
+        item_ids = {item.get('id') for item in items_list if isinstance(item.get('id'), int)}
+        self._checkouts[ticket.order_id] = (future, item_ids)
+        await future
+        return ticket.order_id
+
+    def _written(self, order_id, error):
+        future, item_ids = self._checkouts.pop(order_id, (None, set()))
+        if future is None or future.done():
+            return
+        if error is not None:
+            future.set_exception(error)
+            return
+        future.set_result(order_id)
+        self._stock_dirty |= item_ids
+        if self._stock_push is None:
+            self._stock_push = asyncio.ensure_future(self._push_stock())
+
+    async def _push_stock(self):
+        # Let the rest of the batch arrive first: one push per batch
+        await asyncio.sleep(0)
+        item_ids, self._stock_dirty = sorted(self._stock_dirty), set()
+        self._stock_push = None
+        if item_ids:
+            rows = await self._loop.run_in_executor(self._db, database.get_item_stock, item_ids)
+            self.broadcast("stock", rows)
+
+    def broadcast(self, event, data):
+        message = encode({"event": event, "data": data})
+        for client in list(self.clients):
+            self._send(client.writer, message)
+
+    def _send(self, writer, message):
+        if writer.is_closing():
+            return
+        writer.write(message if isinstance(message, bytes) else encode(message))
+
+def run_server(address=ORDER_SERVER_ADDRESS):
+    """Run the order server until Ctrl+C."""
+    server = OrderServer(address, services=True)
+    try:
+        asyncio.run(server.serve_forever())
+    except KeyboardInterrupt:
+        pass
+    except ValueError as e:
+        print(f"❌ {e}")
+        return
+    print(f"🛑 Order server stopped: {server.writer.orders} orders in "
+          f"{server.writer.batches} batches, {server.requests} requests")
@@ -0,0 +1,271 @@
+# src/core/order_writer.py
+import atexit
+import queue
+import sqlite3
+import threading
+import time
+from datetime import datetime
+from .config import ORDER_WRITER_BATCH_MS, ORDER_WRITER_BATCH_SIZE, ORDER_ID_BLOCK, ORDER_ID_WAIT
+from .database import get_db_connection, close_db_connection, write_completed_order, reserve_order_ids, release_order_ids
+
+class OrderTicket:
+    """Ack for a submitted order: the id is known at once, the commit comes later."""
+
+    def __init__(self, order_id, items_list, total, date_time):
+        self.order_id = order_id
+        self.items_list = items_list
+        self.total = total
+        self.date_time = date_time
+        self.error = None
+        self._committed = threading.Event()
+
+    def wait(self, timeout=None):
+        """Block until the order is on disk; returns True if it was committed."""
+        self._committed.wait(timeout)
+        return self._committed.is_set() and self.error is None
+
+    @property
+    def committed(self):
+        return self._committed.is_set() and self.error is None
+
+    @property
+    def done(self):
+        """True once the writer has reported the order (saved or failed)."""
+        return self._committed.is_set()
+
+_REFILL_IDS = object()   # Queue marker: reserve the next block of order ids
+
+class OrderWriter:
+    """Writes completed orders on a background thread in small batches.
+
+    submit() reserves an order id and returns immediately. The writer
+    commits whatever has queued up every ORDER_WRITER_BATCH_MS (or every
+    ORDER_WRITER_BATCH_SIZE orders) in one transaction, so peak-hour
+    checkouts share one fsync instead of paying one each. Its connection
+    runs WAL with synchronous=FULL, so a committed batch survives power
+    loss. Listeners get (order_id, ok, error) once each order is written.
+    """
+
+    def __init__(self, batch_ms=ORDER_WRITER_BATCH_MS, batch_size=ORDER_WRITER_BATCH_SIZE,
+                 id_block=ORDER_ID_BLOCK, prefetch_ids=True):
+        self.batch_seconds = batch_ms / 1000.0
+        self.batch_size = batch_size
+        self.id_block = id_block
+        self.prefetch_ids = prefetch_ids   # Off when callers bring their own ids (order server)
+        self.jobs = queue.Queue()
+        self.listeners = []
+        self._thread = None
+        self._ids = threading.Condition()   # Guards the id fields; notified when a block arrives
+        self._next_id = None
+        self._last_id = None
+        self._spare_block = None      # First id of a block prefetched by the writer
+        self._refill_requested = False
+        self.batches = 0   # Stats for benchmarks
+        self.orders = 0
+        self.busy_retries = 0   # Batches retried because the DB was busy/locked
+
+    def add_listener(self, callback):
+        self.listeners.append(callback)
+
+    def start(self):
+        if self._thread is None:
+            # Reserve the first block on the writer thread, before the first sale
+            with self._ids:
+                if self.prefetch_ids and self._spare_block is None and not self._refill_requested:
+                    self._refill_requested = True
+                    self.jobs.put(_REFILL_IDS)
+            self._thread = threading.Thread(target=self._run, name="order-writer", daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        """Write everything still queued, then stop the thread."""
+        if self._thread is None:
+            return
+        self.jobs.put(None)
+        self._thread.join()
+        self._thread = None
+
+    def _allocate_id(self):
+        deadline = time.monotonic() + ORDER_ID_WAIT
+        with self._ids:
+            while self._next_id is None or self._next_id > self._last_id:
+                if self._spare_block is not None:
+                    first, self._spare_block = self._spare_block, None
+                    self._next_id, self._last_id = first, first + self.id_block - 1
+                    break
+                # Only at start or if the writer fell behind: ids are
+                # reserved on the writer thread, never on the caller's
+                if not self._refill_requested:
+                    self._refill_requested = True
+                    self.jobs.put(_REFILL_IDS)
+                remaining = deadline - time.monotonic()
+                if remaining <= 0 or not self._ids.wait(remaining):
+                    raise TimeoutError("Could not reserve order ids (database busy?)")
+            order_id = self._next_id
+            self._next_id += 1
+            # Let the writer reserve the next block before this one runs out
+            if (self._last_id - order_id < self.id_block // 2
+                    and self._spare_block is None and not self._refill_requested):
+                self._refill_requested = True
+                self.jobs.put(_REFILL_IDS)
+            return order_id
+
+    def _refill_ids(self):
+        try:
+            first = reserve_order_ids(self.id_block)
+        except Exception as e:
+            print(f"⚠️ Could not reserve order ids: {e}")
+            with self._ids:
+                self._refill_requested = False
+                self._ids.notify_all()
+            return
+        with self._ids:
+            self._spare_block = first
+            self._refill_requested = False
+            self._ids.notify_all()
+
+    def _release_ids(self):
+        """Give back the ids reserved but not used, so bill numbers carry on after a restart."""
+        with self._ids:
+            blocks = []
+            if self._spare_block is not None:
+                blocks.append((self._spare_block, self._spare_block + self.id_block - 1))
+            if self._next_id is not None and self._next_id <= self._last_id:
+                blocks.append((self._next_id, self._last_id))
+            self._next_id = self._last_id = self._spare_block = None
+        # Newest block first: each is only released while it is the last one reserved
+        for first, last in blocks:
+            try:
+                release_order_ids(first, last)
+            except Exception as e:
+                print(f"⚠️ Could not release order ids {first}-{last}: {e}")
+
+    def submit(self, items_list, total, order_id=None):
+        """Queue a completed order; returns an OrderTicket with its order id.
+
+        order_id may be given when it was reserved elsewhere (a till on
+        the order server reserves its own blocks).
+        """
+        date_time = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        if order_id is None:
+            order_id = self._allocate_id()
+        ticket = OrderTicket(order_id, items_list, total, date_time)
+        self.jobs.put(ticket)
+        return ticket
+
+    def flush(self, timeout=None):
+        """Wait until everything submitted so far is committed."""
+        marker = threading.Event()
+        self.jobs.put(marker)
+        return marker.wait(timeout)
+
+    def _run(self):
+        conn = get_db_connection()
+        conn.execute("PRAGMA synchronous = FULL")
+        try:
+            running = True
+            while running:
+                first = self.jobs.get()
+                batch, markers = [], []
+                deadline = time.monotonic() + self.batch_seconds
+                item = first
+                while True:
+                    if item is None:
+                        running = False
+                        # Drain anything queued before stop()
+                        try:
+                            while True:
+                                item = self.jobs.get_nowait()
+                                if isinstance(item, OrderTicket):
+                                    batch.append(item)
+                                elif item is not None and item is not _REFILL_IDS:
+                                    markers.append(item)
+                        except queue.Empty:
+                            pass
+                        break
+                    if isinstance(item, OrderTicket):
+                        batch.append(item)
+                    elif item is _REFILL_IDS:
+                        self._refill_ids()
+                    else:
+                        markers.append(item)
+                        break  # Flush now
+                    if len(batch) >= self.batch_size:
+                        break
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    try:
+                        item = self.jobs.get(timeout=remaining)
+                    except queue.Empty:
+                        break
+
+                if batch:
+                    self._write_batch(conn, batch)
+                for marker in markers:
+                    marker.set()
+            self._release_ids()
+        finally:
+            close_db_connection()
+
+    def _write_batch(self, conn, batch):
+        """Commit a batch in one transaction, isolating bad orders if it fails."""
+        for attempt in range(5):
+            try:
+                self._commit(conn, batch)
+                for ticket in batch:
+                    self._finish(ticket, None)
+                return
+            except sqlite3.OperationalError as e:
+                # Database busy/locked: back off and retry the whole batch
+                print(f"⚠️ Order batch retry ({e})")
+                self.busy_retries += 1
+                time.sleep(0.05 * (2 ** attempt))
+            except Exception:
+                break
+
+        # Write one by one so a single bad order can't lose the others
+        for ticket in batch:
+            try:
+                self._commit(conn, [ticket])
+                self._finish(ticket, None)
+            except Exception as e:
+                print(f"❌ Failed to save order {ticket.order_id}: {e}")
+                self._finish(ticket, e)
+
+    def _commit(self, conn, batch):
+        cursor = conn.cursor()
+        try:
+            for ticket in batch:
+                write_completed_order(cursor, ticket.items_list, ticket.total,
+                                      ticket.date_time, order_id=ticket.order_id)
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        self.batches += 1
+        self.orders += len(batch)
+
+    def _finish(self, ticket, error):
+        ticket.error = error
+        ticket._committed.set()
+        for callback in list(self.listeners):
+            try:
+                callback(ticket.order_id, error is None, error)
+            except Exception as e:
+                print(f"⚠️ Order listener failed: {e}")
+
+_writer = None
+
+def get_order_writer():
+    """Return the shared, started OrderWriter."""
+    global _writer
+    if _writer is None:
+        _writer = OrderWriter()
+        _writer.start()
+        atexit.register(shutdown_order_writer)
+    return _writer
+
+def shutdown_order_writer():
+    if _writer is not None:
+        _writer.stop()
@@ -0,0 +1,167 @@
+# src/core/perf.py
+import functools
+import os
+import threading
+import time
+import types
+from bisect import bisect_left
+from collections import deque
+from contextlib import contextmanager
+from .config import BASE_DIR, PERF_ENABLED, PERF_RING_SIZE
+
+CO_GENERATOR = 0x20   # code flag; avoids importing inspect at startup
+# Histogram bucket upper bounds in ms (the last bucket is everything slower)
+BUCKETS_MS = (0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 25, 50, 100, 250, 500, 1000, 2500)
+PROFILE_DIR = os.path.join(BASE_DIR, "profiles")
+
+_enabled = PERF_ENABLED
+_lock = threading.Lock()
+_recent = deque(maxlen=PERF_RING_SIZE)   # (wall time, name, ms, thread name)
+_stats = {}                              # {name: OpStats}
+_profiler = None
+
+class OpStats:
+    """Call count, total/max time and a latency histogram for one operation."""
+
+    __slots__ = ("calls", "total_ms", "max_ms", "histogram")
+
+    def __init__(self):
+        self.calls = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+        self.histogram = [0] * (len(BUCKETS_MS) + 1)
+
+    def add(self, ms):
+        self.calls += 1
+        self.total_ms += ms
+        if ms > self.max_ms:
+            self.max_ms = ms
+        self.histogram[bisect_left(BUCKETS_MS, ms)] += 1
+
+    def percentile(self, p):
+        """Upper bound of the bucket holding the p-th percentile (ms)."""
+        target = self.calls * p / 100.0
+        seen = 0
+        for i, count in enumerate(self.histogram):
+            seen += count
+            if count and seen >= target:
+                return min(BUCKETS_MS[i], self.max_ms) if i < len(BUCKETS_MS) else self.max_ms
+        return 0.0
+
+def is_enabled():
+    return _enabled
+
+def set_enabled(enabled):
+    """Turn timing on or off at runtime (off: one flag check per call)."""
+    global _enabled
+    _enabled = bool(enabled)
+
+def record(name, ms):
+    """Record one timed call (ignored while timing is off)."""
+    if not _enabled:
+        return
+    with _lock:
+        stats = _stats.get(name)
+        if stats is None:
+            stats = _stats[name] = OpStats()
+        stats.add(ms)
+        _recent.append((time.time(), name, ms, threading.current_thread().name))
+
+def reset():
+    with _lock:
+        _stats.clear()
+        _recent.clear()
+
+@contextmanager
+def span(name):
+    """Time a block: with span("menu.rebuild"): ..."""
+    if not _enabled:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        record(name, (time.perf_counter() - start) * 1000)
+
+def traced(name):
+    """Decorator that times every call of a function under name."""
+    def decorate(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            if not _enabled:
+                return fn(*args, **kwargs)
+            start = time.perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                record(name, (time.perf_counter() - start) * 1000)
+        wrapper.__traced__ = True
+        return wrapper
+    return decorate
+
+def instrument_module(namespace, prefix, skip=()):
+    """Wrap every plain function defined in a module's globals with traced().
+
+    Call at the bottom of the module so later `from module import fn`
+    imports (and calls inside the module) get the timed version.
+    Generators are left alone: timing them would only measure creation.
+    """
+    module_name = namespace["__name__"]
+    for attr, value in list(namespace.items()):
+        if (isinstance(value, types.FunctionType) and value.__module__ == module_name
+                and attr not in skip and not getattr(value, "__traced__", False)
+                and not value.__code__.co_flags & CO_GENERATOR):
+            namespace[attr] = traced(f"{prefix}.{attr}")(value)
+
+def summary():
+    """Per-operation stats, slowest total time first.
+
+    Percentiles are histogram bucket bounds (capped at the max), so p95
+    of "2.5" means the 95th percentile call took at most 2.5 ms.
+    """
+    with _lock:
+        items = [(name, stats.calls, stats.total_ms, stats.max_ms,
+                  stats.percentile(50), stats.percentile(95), stats.percentile(99))
+                 for name, stats in _stats.items()]
+    rows = [
+        {'name': name, 'calls': calls, 'total_ms': total, 'mean_ms': total / calls,
+         'p50_ms': p50, 'p95_ms': p95, 'p99_ms': p99, 'max_ms': max_ms}
+        for name, calls, total, max_ms, p50, p95, p99 in items
+    ]
+    rows.sort(key=lambda row: row['total_ms'], reverse=True)
+    return rows
+
+def slowest_recent(limit=20):
+    """The slowest calls still in the ring buffer: (wall time, name, ms, thread)."""
+    with _lock:
+        recent = list(_recent)
+    return sorted(recent, key=lambda event: event[2], reverse=True)[:limit]
+
+def is_profiling():
+    return _profiler is not None
+
+def start_profile():
+    """Start a cProfile capture of the calling (UI) thread."""
+    global _profiler
+    import cProfile
+    if _profiler is None:
+        _profiler = cProfile.Profile()
+        _profiler.enable()
+
+def stop_profile(lines=30):
+    """Stop the capture; saves a .prof file and returns (path, top functions text)."""
+    global _profiler
+    import io
+    import pstats
+    if _profiler is None:
+        return None, ""
+    profiler, _profiler = _profiler, None
+    profiler.disable()
+
+    os.makedirs(PROFILE_DIR, exist_ok=True)
+    path = os.path.join(PROFILE_DIR, time.strftime("profile-%Y%m%d-%H%M%S.prof"))
+    profiler.dump_stats(path)
+    out = io.StringIO()
+    pstats.Stats(profiler, stream=out).sort_stats("cumulative").print_stats(lines)
+    return path, out.getvalue()
@@ -1,80 +1,329 @@
 # src/core/printer.py
 import os
-import sys
+import atexit
+import queue
+import threading
+import time
+from collections import OrderedDict
 from datetime import datetime
 from escpos.printer import Dummy  # ← Always use Dummy for now
-from .config import DB_PATH
-from .database import get_db_connection
+from .config import SPOOL_DIR, PRINT_QUEUE_SIZE, PRINT_MAX_RETRIES, PRINT_RETRY_BASE_DELAY, PRINT_RETRY_MAX_DELAY
+from .perf import traced, instrument_module
+
+_printer = None
 
 def get_printer():
-    """Always return Dummy printer for testing (no USB required)."""
-    print("✅ Using Dummy printer (printing to console only)")
-    return Dummy()
+    """Return the shared printer (Dummy for testing, no USB required)."""
+    global _printer
+    if _printer is None:
+        print("✅ Using Dummy printer (printing to console only)")
+        _printer = Dummy()
+    return _printer
 
-def print_receipt(cart_items, subtotal, tax, total, cash_received=0.0):
-    """Print formatted receipt to console."""
+def send_to_printer(data):
+    """Send rendered ESC/POS bytes to the printer."""
     p = get_printer()
-    
-    try:
-        # Get canteen name and tax percent from settings
-        from .database import get_setting
-        import os
-        canteen_name = get_setting("canteen_name", "SVG FOOD COURT")
-        tax_percent = float(get_setting("tax_percent", "5.0"))
+    p._raw(data)
+    if isinstance(p, Dummy):
+        # Also print to console for visibility
+        print("\n" + "="*50)
+        print("🖨️  RECEIPT OUTPUT (Simulated)")
+        print("="*50)
+        print(p.output.decode('utf-8', errors='replace'))
+        print("="*50)
+        p.clear()
+
+# Characters per line for each paper_width setting
+PAPER_COLUMNS = {"58": 32, "80": 48}
+LOGO_PATH = os.path.join(os.path.dirname(__file__), "..", "resources", "logo.png")
+RECEIPT_CACHE_SIZE = 200
 
-        # Header
+class ReceiptTemplate:
+    """Pre-rendered static parts of a receipt for one name/paper/logo combination.
+
+    The header (name, separator, rasterized logo) and the footer are built
+    once as ESC/POS bytes; render() only formats item lines and totals.
+    """
+
+    def __init__(self, canteen_name, paper_width, logo_path=None):
+        self.columns = PAPER_COLUMNS.get(str(paper_width), PAPER_COLUMNS["58"])
+        self.rule = "-" * self.columns + "\n"
+
+        p = Dummy()
         p.set(align='center', bold=True)
         p.text(canteen_name + "\n")
         p.set(align='center', bold=False)
-        p.text("-" * 32 + "\n")
-
-        # Optional: Print logo (if file exists)
-        logo_path = os.path.join(os.path.dirname(__file__), "..", "resources", "logo.png")
-        if os.path.exists(logo_path):
+        p.text(self.rule)
+        if logo_path:
             try:
                 p.image(logo_path)
                 p.text("\n")
             except Exception as e:
                 print(f"⚠️ Logo print failed: {e}")
+        p.set(align='left')
+        self.header = p.output
+
+        p = Dummy()
+        p.text("\nThank you! Visit again\n")
+        p.text("\n")
+        p.cut()
+        self.footer = p.output
+
+    @traced("printer.ReceiptTemplate.render")
+    def render(self, cart_items, subtotal, tax, total, tax_percent, cash_received=0.0, order_id=None):
+        """Return the full receipt bytes for one order."""
+        name_width = self.columns - 16
+        label_width = self.columns - 13
+        p = Dummy()
+        p._raw(self.header)
 
         # Items
-        p.set(align='left')
         for key, data in cart_items.items():
-            name = data['name'][:16]
+            name = data['name'][:name_width]
             qty = data['qty']
             amt = data['price'] * qty
-            line = f"{name:<16}{qty:>4}  ₹{amt:>6.2f}\n"
-            p.text(line)
+            p.text(f"{name:<{name_width}}{qty:>4}  ₹{amt:>6.2f}\n")
 
-        p.text("-" * 32 + "\n")
+        p.text(self.rule)
 
         # Totals
-        p.text(f"Subtotal:          ₹{subtotal:>6.2f}\n")
-        p.text(f"Tax ({tax_percent:.0f}%):          ₹{tax:>6.2f}\n")
-        p.text(f"Total:             ₹{total:>6.2f}\n")
+        p.text(f"{'Subtotal:':<{label_width}}₹{subtotal:>6.2f}\n")
+        p.text(f"{f'Tax ({tax_percent:.0f}%):':<{label_width}}₹{tax:>6.2f}\n")
+        p.text(f"{'Total:':<{label_width}}₹{total:>6.2f}\n")
 
         # Cash handling section
         if cash_received > 0:
-            p.text("-" * 32 + "\n")
-            p.text(f"Cash:              ₹{cash_received:>6.2f}\n")
-            p.text(f"Change:            ₹{cash_received - total:>6.2f}\n")
+            p.text(self.rule)
+            p.text(f"{'Cash:':<{label_width}}₹{cash_received:>6.2f}\n")
+            p.text(f"{'Change:':<{label_width}}₹{cash_received - total:>6.2f}\n")
 
         # Footer
-        p.text("-" * 32 + "\n")
+        p.text(self.rule)
         p.set(align='center')
+        if order_id is not None:
+            p.text(f"Bill No: {order_id}\n")
         p.text(f"Date: {datetime.now().strftime('%Y-%m-%d %H:%M')}\n")
-        p.text("\nThank you! Visit again\n")
-        p.text("\n")
+        p._raw(self.footer)
+        return p.output
 
-        p.cut()
+_template = None
+_template_key = None
+_rendered = OrderedDict()   # {order_id: receipt bytes}, most recent last
+_render_lock = threading.Lock()
 
-        # Also print to console for visibility
-        print("\n" + "="*50)
-        print("🖨️  RECEIPT OUTPUT (Simulated)")
-        print("="*50)
-        print(p.output.decode('utf-8'))
-        print("="*50)
+def get_receipt_template():
+    """Return the cached template, rebuilt if name, paper width or logo changed."""
+    global _template, _template_key
+    from .database import get_setting
+    canteen_name = get_setting("canteen_name", "SVG FOOD COURT")
+    paper_width = get_setting("paper_width", "58")
+    try:
+        logo_mtime = os.stat(LOGO_PATH).st_mtime_ns
+    except OSError:
+        logo_mtime = None
+
+    key = (canteen_name, paper_width, logo_mtime)
+    with _render_lock:
+        if key != _template_key:
+            _template = ReceiptTemplate(canteen_name, paper_width, LOGO_PATH if logo_mtime else None)
+            _template_key = key
+        return _template
+
+def render_receipt(cart_items, subtotal, tax, total, cash_received=0.0, order_id=None):
+    """Render a receipt to ESC/POS bytes (nothing is sent to the printer).
+
+    With an order_id the bytes are also kept for instant reprints.
+    """
+    from .database import get_tax_percent
+    data = get_receipt_template().render(
+        cart_items, subtotal, tax, total, get_tax_percent(), cash_received, order_id
+    )
+    if order_id is not None:
+        with _render_lock:
+            _rendered[order_id] = data
+            _rendered.move_to_end(order_id)
+            while len(_rendered) > RECEIPT_CACHE_SIZE:
+                _rendered.popitem(last=False)
+    return data
+
+def get_rendered_receipt(order_id):
+    """Return the kept receipt bytes for an order, or None."""
+    with _render_lock:
+        return _rendered.get(order_id)
 
+class PrintSpooler:
+    """Background receipt printing with a bounded queue and on-disk spool.
+
+    Each job is written to SPOOL_DIR before it is queued and removed once
+    printed, so receipts queued when the app crashes are printed on the
+    next start. Failed sends are retried with exponential backoff.
+    Listeners get (job_id, status, detail) with status one of
+    'queued', 'printing', 'retrying', 'done', 'failed'.
+    """
+
+    def __init__(self, spool_dir=SPOOL_DIR, maxsize=PRINT_QUEUE_SIZE, send=send_to_printer):
+        self.spool_dir = spool_dir
+        self.send = send
+        self.jobs = queue.Queue(maxsize=maxsize)
+        self.listeners = []
+        self._thread = None
+        self._stop = threading.Event()
+        self._seq = 0
+        self._seq_lock = threading.Lock()
+
+    def add_listener(self, callback):
+        self.listeners.append(callback)
+
+    def _notify(self, job_id, status, detail=""):
+        for callback in list(self.listeners):
+            try:
+                callback(job_id, status, detail)
+            except Exception as e:
+                print(f"⚠️ Print status listener failed: {e}")
+
+    def _spool_path(self, job_id):
+        return os.path.join(self.spool_dir, f"{job_id}.prn")
+
+    def start(self):
+        """Start the worker and re-queue receipts left in the spool directory."""
+        if self._thread is not None:
+            return
+        os.makedirs(self.spool_dir, exist_ok=True)
+        for filename in sorted(os.listdir(self.spool_dir)):
+            if filename.endswith(".prn"):
+                job_id = filename[:-4]
+                try:
+                    self.jobs.put_nowait(job_id)
+                    self._notify(job_id, "queued", "recovered from spool")
+                except queue.Full:
+                    break  # The rest stay on disk for the next start
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="print-spooler", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout=5.0):
+        """Stop the worker; unprinted jobs stay in the spool directory."""
+        if self._thread is None:
+            return
+        self._stop.set()
+        try:
+            self.jobs.put_nowait(None)
+        except queue.Full:
+            pass
+        self._thread.join(timeout)
+        self._thread = None
+
+    @traced("printer.PrintSpooler.submit")
+    def submit(self, data):
+        """Spool and queue rendered bytes; returns the job id.
+
+        Raises queue.Full if the printer has fallen too far behind.
+        """
+        with self._seq_lock:
+            self._seq += 1
+            job_id = f"{time.time_ns()}-{self._seq:04}"
+        path = self._spool_path(job_id)
+        tmp_path = path + ".tmp"
+        with open(tmp_path, 'wb') as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+
+        try:
+            self.jobs.put_nowait(job_id)
+        except queue.Full:
+            os.remove(path)
+            raise
+        self._notify(job_id, "queued")
+        return job_id
+
+    def pending(self):
+        """Number of jobs waiting to print."""
+        return self.jobs.qsize()
+
+    def _run(self):
+        while not self._stop.is_set():
+            job_id = self.jobs.get()
+            if job_id is None:
+                break
+            self._print_job(job_id)
+
+    @traced("printer.PrintSpooler.print_job")
+    def _print_job(self, job_id):
+        path = self._spool_path(job_id)
+        try:
+            with open(path, 'rb') as f:
+                data = f.read()
+        except OSError as e:
+            self._notify(job_id, "failed", str(e))
+            return
+
+        for attempt in range(PRINT_MAX_RETRIES + 1):
+            self._notify(job_id, "printing")
+            try:
+                self.send(data)
+            except Exception as e:
+                if attempt == PRINT_MAX_RETRIES:
+                    # Keep the spool file so the receipt is retried next start
+                    print(f"❌ Print error: {e}")
+                    self._notify(job_id, "failed", str(e))
+                    return
+                delay = min(PRINT_RETRY_BASE_DELAY * (2 ** attempt), PRINT_RETRY_MAX_DELAY)
+                self._notify(job_id, "retrying", f"{e} (retry in {delay:.1f}s)")
+                if self._stop.wait(delay):
+                    return
+                continue
+
+            os.remove(path)
+            self._notify(job_id, "done")
+            return
+
+_spooler = None
+
+def get_spooler():
+    """Return the shared, started PrintSpooler."""
+    global _spooler
+    if _spooler is None:
+        _spooler = PrintSpooler()
+        _spooler.start()
+        atexit.register(shutdown_spooler)
+    return _spooler
+
+def shutdown_spooler():
+    if _spooler is not None:
+        _spooler.stop()
+
+def has_spooled_jobs(spool_dir=SPOOL_DIR):
+    """True if receipts are waiting in the spool directory (e.g. after a crash)."""
+    try:
+        return any(name.endswith(".prn") for name in os.listdir(spool_dir))
+    except OSError:
+        return False
+
+def print_receipt(cart_items, subtotal, tax, total, cash_received=0.0, order_id=None):
+    """Render a receipt and queue it for printing; returns the job id (None on error)."""
+    try:
+        data = render_receipt(cart_items, subtotal, tax, total, cash_received, order_id)
+        return get_spooler().submit(data)
+    except queue.Full:
+        print("❌ Print error: printer queue is full")
     except Exception as e:
         print(f"❌ Print error: {e}")
-        pass
\ No newline at end of file
+    return None
+
+def reprint_receipt(order_id):
+    """Queue a kept receipt again; returns the job id (None if not kept or on error)."""
+    data = get_rendered_receipt(order_id)
+    if data is None:
+        return None
+    try:
+        return get_spooler().submit(data)
+    except queue.Full:
+        print("❌ Print error: printer queue is full")
+    except Exception as e:
+        print(f"❌ Print error: {e}")
+    return None
+
+# Time every function above (Admin → Performance)
+instrument_module(globals(), "printer")
@@ -0,0 +1,88 @@
+# src/core/search.py
+import re
+from bisect import bisect_right
+from itertools import accumulate
+
+FUZZY_MIN_LENGTH = 3
+
+def _fuzzy_pattern(query):
+    """Regex for query's characters in order within one line ("sndwch" ~ "sandwich")."""
+    return re.compile("[^\n]*?".join(re.escape(ch) for ch in query))
+
+class _Candidates:
+    """A subset of the menu with its names joined into one searchable string."""
+
+    def __init__(self, ids, names):
+        self.ids = ids
+        self.names = names
+        self._text = None
+
+    def joined(self):
+        """Return (text, line start offsets), built on first fuzzy search."""
+        if self._text is None:
+            self._text = "\n".join(self.names)
+            self._starts = [0, *accumulate(len(name) + 1 for name in self.names)]
+        return self._text, self._starts
+
+class MenuSearchIndex:
+    """In-memory menu search: prefix, substring, category and fuzzy matching.
+
+    Built once from (item_id, name, category) rows and rebuilt when the menu
+    changes. Typing more characters only re-checks the previous matches
+    (within the same match mode).
+    """
+
+    def __init__(self, rows=()):
+        self.build(rows)
+
+    def build(self, rows):
+        ids = []
+        names = []
+        self.by_category = {}
+        for item_id, name, category in rows:
+            ids.append(item_id)
+            # Newlines would split a name across lines of the joined text
+            names.append((name or "").lower().replace("\n", " "))
+            self.by_category.setdefault((category or "").lower(), set()).add(item_id)
+        self.all = _Candidates(ids, names)
+        self._last_query = ""
+        self._last = self.all
+
+    def search(self, query):
+        """Return the set of item ids matching query ('' matches everything)."""
+        query = " ".join(query.lower().split())
+        if not query:
+            self._last_query, self._last = "", self.all
+            return set(self.all.ids)
+
+        # A longer query only narrows the matches while the match mode stays
+        # the same: substring matches below FUZZY_MIN_LENGTH aren't a superset
+        # of fuzzy matches ("dri" fuzzily matches "dark rice", "dr" doesn't)
+        cand = self.all
+        same_mode = (len(query) < FUZZY_MIN_LENGTH) == (len(self._last_query) < FUZZY_MIN_LENGTH)
+        if self._last_query and same_mode and query.startswith(self._last_query):
+            cand = self._last
+
+        if len(query) < FUZZY_MIN_LENGTH:
+            # Prefix / substring
+            matches = {item_id for item_id, name in zip(cand.ids, cand.names) if query in name}
+        else:
+            # Fuzzy (in-order characters), which also covers substrings
+            text, starts = cand.joined()
+            matches = {
+                cand.ids[bisect_right(starts, m.start()) - 1]
+                for m in _fuzzy_pattern(query).finditer(text)
+            }
+
+        # Category
+        for category, category_ids in self.by_category.items():
+            if category.startswith(query):
+                matches |= category_ids if cand is self.all else category_ids.intersection(cand.ids)
+
+        if len(matches) == len(cand.ids):
+            self._last = cand
+        else:
+            pairs = [(item_id, name) for item_id, name in zip(cand.ids, cand.names) if item_id in matches]
+            self._last = _Candidates([p[0] for p in pairs], [p[1] for p in pairs])
+        self._last_query = query
+        return matches
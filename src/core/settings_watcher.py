@@ -0,0 +1,51 @@
+# src/core/settings_watcher.py
+import atexit
+import threading
+from .config import SETTINGS_POLL_INTERVAL
+from .database import check_settings_changed, close_db_connection
+
+class SettingsWatcher:
+    """Background thread that picks up settings edited by other processes.
+
+    Polls PRAGMA data_version on its own long-lived connection (the
+    version is per connection, so it must be the same one every time);
+    changes reach the settings listeners.
+    """
+
+    def __init__(self, interval=SETTINGS_POLL_INTERVAL):
+        self.interval = interval
+        self._thread = None
+        self._stop = threading.Event()
+
+    def start(self):
+        if self._thread is None:
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="settings-watcher", daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        if self._thread is not None:
+            self._stop.set()
+            self._thread.join()
+            self._thread = None
+
+    def _run(self):
+        try:
+            while not self._stop.wait(self.interval):
+                try:
+                    check_settings_changed()
+                except Exception as e:
+                    print(f"⚠️ Settings check failed: {e}")
+        finally:
+            close_db_connection()
+
+_watcher = None
+
+def get_settings_watcher():
+    """Return the shared, started SettingsWatcher."""
+    global _watcher
+    if _watcher is None:
+        _watcher = SettingsWatcher()
+        _watcher.start()
+        atexit.register(_watcher.stop)
+    return _watcher
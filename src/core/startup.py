@@ -0,0 +1,106 @@
+# src/core/startup.py
+import builtins
+import importlib.util
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from .config import STARTUP_BUDGET_MS
+
+_start = time.perf_counter()   # As early as main.py imports this module
+_phases = []                   # (name, start ms, duration ms)
+_marks = {}                    # {name: ms since start}
+_import_timer = None
+
+class ImportTimer:
+    """Times first-time imports on the main thread (like python -X importtime).
+
+    Records {module: [self ms, cumulative ms]}; self time excludes the
+    modules it imported in turn.
+    """
+
+    def __init__(self):
+        self.times = {}
+        self._stack = []
+        self._main = threading.get_ident()
+        self._original = None
+
+    def install(self):
+        self._original = builtins.__import__
+        builtins.__import__ = self._import
+
+    def uninstall(self):
+        if self._original is not None:
+            builtins.__import__ = self._original
+            self._original = None
+
+    def _import(self, name, globals=None, locals=None, fromlist=(), level=0):
+        original = self._original or builtins.__import__
+        try:
+            absolute = importlib.util.resolve_name("." * level + name, (globals or {}).get("__package__")) \
+                if level else name
+        except (ImportError, ValueError):
+            absolute = name
+        if absolute in sys.modules or threading.get_ident() != self._main:
+            return original(name, globals, locals, fromlist, level)
+
+        self._stack.append(0.0)
+        start = time.perf_counter()
+        try:
+            return original(name, globals, locals, fromlist, level)
+        finally:
+            elapsed = (time.perf_counter() - start) * 1000
+            children = self._stack.pop()
+            if self._stack:
+                self._stack[-1] += elapsed
+            if absolute in sys.modules and absolute not in self.times:
+                self.times[absolute] = [elapsed - children, elapsed]
+
+def elapsed_ms():
+    return (time.perf_counter() - _start) * 1000
+
+def enable_import_timing():
+    """Start recording import times (for --profile-startup)."""
+    global _import_timer
+    if _import_timer is None:
+        _import_timer = ImportTimer()
+        _import_timer.install()
+
+@contextmanager
+def phase(name):
+    """Time one startup step."""
+    start = elapsed_ms()
+    try:
+        yield
+    finally:
+        _phases.append((name, start, elapsed_ms() - start))
+
+def mark(name):
+    """Record that a startup milestone (e.g. "first paint") was reached."""
+    _marks.setdefault(name, elapsed_ms())
+
+def finish(report=False):
+    """End startup: warn if first paint missed the budget, optionally print the breakdown."""
+    if _import_timer is not None:
+        _import_timer.uninstall()
+    first_paint = _marks.get("first paint")
+    if first_paint is not None and first_paint > STARTUP_BUDGET_MS:
+        print(f"⚠️ Slow start: first paint after {first_paint:.0f} ms (budget {STARTUP_BUDGET_MS} ms)")
+    if report:
+        print_report()
+
+def print_report(top=15):
+    print("\n" + "=" * 60)
+    print("🚀 STARTUP TIMING (ms since start)")
+    print("=" * 60)
+    for name, start, duration in _phases:
+        print(f"  {name:<32} {start:8.1f}  +{duration:7.1f}")
+    for name, at in sorted(_marks.items(), key=lambda mark: mark[1]):
+        print(f"  ● {name:<30} {at:8.1f}")
+
+    if _import_timer is not None and _import_timer.times:
+        times = _import_timer.times
+        print(f"\n  Slowest imports (cumulative / self), {len(times)} modules:")
+        for module, (self_ms, total_ms) in sorted(times.items(), key=lambda t: t[1][1], reverse=True)[:top]:
+            print(f"  {module:<40} {total_ms:8.1f} {self_ms:8.1f}")
+    print("=" * 60)
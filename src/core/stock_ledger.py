@@ -0,0 +1,222 @@
+# src/core/stock_ledger.py
+import threading
+
+UNLIMITED_STOCK = 999
+
+class StockLedger:
+    """In-memory stock reservations for open and held carts.
+
+    Adding to a cart only reserves stock here; nothing is written until
+    checkout, when the order writer deducts the whole cart from
+    items.stock_quantity in the order's own transaction (see
+    write_completed_order). Removing items, clearing the cart or letting a
+    held order expire just drops the reservation.
+
+    A checked-out cart stays held back under its order id until the
+    writer reports it (settle): a failed order gives its stock back, a
+    written one stays held back until the next refresh reads the
+    deducted stock from the DB. self.stock itself only ever holds DB values.
+
+    Carts are identified by any hashable id ("current" for a till's open
+    cart, ("held", held_id) for held carts).
+
+    store is where stock and held orders are read from: the database
+    module, or an OrderClient for a till on the order server.
+    """
+
+    def __init__(self, store=None):
+        if store is None:
+            from . import database as store
+        self.store = store
+        self._lock = threading.Lock()
+        self.stock = {}      # {item_id: stock_quantity in DB}
+        self.carts = {}      # {cart_id: {item_id: qty}}
+        self._reserved = {}  # {item_id: qty reserved across all carts}
+        self._claimed = {}   # {cart_id: held_id resumed into that cart}
+        self._orders = {}    # {order_id: {item_id: qty}} checked out, not yet written
+        self._in_flight = {} # {item_id: qty} summed over self._orders
+        self._written = {}   # {item_id: qty} written since self.stock was read
+
+    def refresh(self, rows=None):
+        """Load DB stock from (item_id, stock) rows, or from the items table."""
+        if rows is None:
+            rows = self.store.get_item_stock()
+        with self._lock:
+            self.stock = {item_id: stock for item_id, stock in rows}
+            # Orders still in flight aren't in these rows yet; written ones are
+            self._written = {}
+
+    def update_stock(self, rows):
+        """Apply (item_id, stock) rows for some items (pushed by the order server).
+
+        Returns the item ids whose DB stock changed.
+        """
+        with self._lock:
+            changed = {item_id for item_id, stock in rows
+                       if self.stock.get(item_id) != stock or item_id in self._written}
+            for item_id, stock in rows:
+                self.stock[item_id] = stock
+                self._written.pop(item_id, None)
+            return changed
+
+    def available(self, item_id):
+        """Stock left for new reservations (UNLIMITED_STOCK stays unlimited)."""
+        with self._lock:
+            return self._available(item_id)
+
+    def _available(self, item_id):
+        stock = self.stock.get(item_id, 0)
+        if stock is None or stock >= UNLIMITED_STOCK:
+            return UNLIMITED_STOCK
+        return (stock - self._reserved.get(item_id, 0) - self._in_flight.get(item_id, 0)
+                - self._written.get(item_id, 0))
+
+    def can_set(self, cart_id, item_id, qty):
+        """True if cart_id may hold qty of item_id."""
+        with self._lock:
+            current = self.carts.get(cart_id, {}).get(item_id, 0)
+            return qty <= current or self._available(item_id) >= qty - current
+
+    def set_qty(self, cart_id, item_id, qty):
+        """Set a cart's reservation for one item; False if not enough stock."""
+        with self._lock:
+            cart = self.carts.setdefault(cart_id, {})
+            current = cart.get(item_id, 0)
+            if qty > current and self._available(item_id) < qty - current:
+                return False
+            self._change(cart, item_id, qty - current)
+            return True
+
+    def reserve(self, cart_id, item_id, qty=1):
+        """Reserve qty more of an item; False if not enough stock."""
+        with self._lock:
+            cart = self.carts.setdefault(cart_id, {})
+            if self._available(item_id) < qty:
+                return False
+            self._change(cart, item_id, qty)
+            return True
+
+    def set_cart(self, cart_id, quantities):
+        """Replace a cart's reservations with {item_id: qty} (resume / rebuild).
+
+        Returns the item ids whose availability changed.
+        """
+        with self._lock:
+            return self._set_cart(cart_id, quantities)
+
+    def _set_cart(self, cart_id, quantities):
+        cart = self.carts.setdefault(cart_id, {})
+        changed = set(cart) | set(quantities)
+        for item_id in changed:
+            self._change(cart, item_id, quantities.get(item_id, 0) - cart.get(item_id, 0))
+        if not cart:
+            del self.carts[cart_id]
+        return changed
+
+    def release(self, cart_id):
+        """Drop all reservations of a cart; returns the affected item ids."""
+        return self.set_cart(cart_id, {})
+
+    def commit(self, cart_id, order_id):
+        """Hold a checked-out cart's stock back under order_id until settle().
+
+        Call when the order (with its stock UPDATE) has been handed to the
+        writer. Returns the affected item ids.
+        """
+        with self._lock:
+            cart = self.carts.pop(cart_id, {})
+            for item_id, qty in cart.items():
+                self._add(self._reserved, item_id, -qty)
+                self._add(self._in_flight, item_id, qty)
+            if cart:
+                self._orders[order_id] = cart
+            return set(cart)
+
+    def settle(self, order_id, ok):
+        """The writer reported order_id: written (ok) or failed.
+
+        A failed order's stock is available again. Unknown or already
+        settled ids are ignored. Returns the item ids whose availability
+        changed.
+        """
+        with self._lock:
+            quantities = self._orders.pop(order_id, None)
+            if quantities is None:
+                return set()
+            for item_id, qty in quantities.items():
+                self._add(self._in_flight, item_id, -qty)
+                if ok:
+                    self._add(self._written, item_id, qty)
+            return set() if ok else set(quantities)
+
+    def claim_held(self, cart_id, held_id):
+        """Record that held_id was resumed into cart_id (None clears the claim).
+
+        Claimed held orders are reserved under the cart that resumed them,
+        so sync_held leaves them out.
+        """
+        with self._lock:
+            if held_id is None:
+                self._claimed.pop(cart_id, None)
+            else:
+                self._claimed[cart_id] = held_id
+
+    def sync_held(self, exclude=()):
+        """Rebuild held-cart reservations from the held orders in the DB.
+
+        Held orders that expired or were deleted lose their reservation.
+        exclude: extra held ids already reserved under another cart id, on
+        top of the claimed ones.
+        Returns the affected item ids.
+        """
+        rows = self.store.get_held_order_items()
+        with self._lock:
+            skip = set(exclude) | set(self._claimed.values())
+            held = {
+                ("held", held_id): self._quantities(items)
+                for held_id, items in rows
+                if held_id not in skip
+            }
+            changed = set()
+            for cart_id in [c for c in self.carts if isinstance(c, tuple) and c[0] == "held"]:
+                if cart_id not in held:
+                    changed |= self._set_cart(cart_id, {})
+            for cart_id, quantities in held.items():
+                changed |= self._set_cart(cart_id, quantities)
+            return changed
+
+    @staticmethod
+    def _quantities(items):
+        quantities = {}
+        for item in items:
+            item_id = item.get('id')
+            if isinstance(item_id, int):
+                quantities[item_id] = quantities.get(item_id, 0) + int(item['qty'])
+        return quantities
+
+    def _change(self, cart, item_id, delta):
+        if not delta:
+            return
+        qty = cart.get(item_id, 0) + delta
+        if qty > 0:
+            cart[item_id] = qty
+        else:
+            cart.pop(item_id, None)
+        self._add(self._reserved, item_id, delta)
+
+    @staticmethod
+    def _add(counts, item_id, delta):
+        counts[item_id] = counts.get(item_id, 0) + delta
+        if not counts[item_id]:
+            del counts[item_id]
+
+_ledger = None
+
+def get_stock_ledger():
+    """Return the shared StockLedger (loaded from the DB on first use)."""
+    global _ledger
+    if _ledger is None:
+        _ledger = StockLedger()
+        _ledger.refresh()
+        _ledger.sync_held()
+    return _ledger
@@ -1,18 +1,83 @@
 # src/main.py
 import sys
 import traceback
-from PyQt6.QtWidgets import QApplication
+
+def _option(name):
+    """Value given after a command-line flag: None if absent, "" if it has no value."""
+    if name not in sys.argv:
+        return None
+    i = sys.argv.index(name)
+    if i + 1 < len(sys.argv) and not sys.argv[i + 1].startswith("--"):
+        return sys.argv[i + 1]
+    return ""
 
 def main():
     try:
         # ✅ Relative import: .core = src.core
-        from .core.database import init_db
-        init_db()
-        
-        from .views.main_window import MainWindow
-        app = QApplication(sys.argv)
-        window = MainWindow()
-        window.show()
+        from .core import startup
+        profile_startup = "--profile-startup" in sys.argv
+        if profile_startup:
+            startup.enable_import_timing()
+
+        from .core.config import ORDER_SERVER_ADDRESS
+        server_address = _option("--server")
+        store = None
+        if server_address is not None:
+            # Multi-counter till: the order server owns the database
+            from .core.database import close_db_connection
+            from .core.order_client import OrderClient, RemoteError
+            with startup.phase("connect to order server"):
+                store = OrderClient(server_address or ORDER_SERVER_ADDRESS)
+                try:
+                    store.connect()
+                except (OSError, RemoteError) as e:
+                    print(f"❌ Cannot reach the order server at {store.address}: {e}")
+                    sys.exit(1)
+        else:
+            with startup.phase("init_db"):
+                from .core.database import init_db, close_db_connection
+                init_db()
+
+        listen_address = _option("--serve")
+        if listen_address is not None:
+            from .core.order_server import run_server
+            run_server(listen_address or ORDER_SERVER_ADDRESS)
+            return
+
+        if "--archive" in sys.argv:
+            from .core.archiver import archive_old_orders
+            keep_days = _option("--archive")
+            months = archive_old_orders(int(keep_days) if keep_days else None)
+            print(f"✅ Archived {len(months)} month(s) of orders")
+            return
+
+        if "--backup" in sys.argv:
+            from .core.backup import backup_now
+            path, size = backup_now()
+            print(f"✅ Backup saved to {path} ({size / 1e6:.1f} MB)")
+            return
+
+        if "--rebuild-rollups" in sys.argv:
+            from .core.database import rebuild_rollups
+            days = rebuild_rollups()
+            print(f"✅ Rebuilt sales rollups for {days} day(s)")
+            return
+
+        # Only what the first paint needs is imported here; admin panel,
+        # printer (escpos) and reports load on first use
+        with startup.phase("import PyQt6"):
+            from PyQt6.QtWidgets import QApplication
+        with startup.phase("import main window"):
+            from .views.main_window import MainWindow
+        with startup.phase("QApplication"):
+            app = QApplication(sys.argv)
+            app.aboutToQuit.connect(close_db_connection)
+            if store is not None:
+                app.aboutToQuit.connect(store.close)
+        with startup.phase("build window"):
+            # The menu is filled in after the first paint
+            window = MainWindow(profile_startup=profile_startup, store=store)
+            window.show()
         sys.exit(app.exec())
     except Exception as e:
         print("❌ CRITICAL ERROR:")
@@ -20,4 +85,4 @@ def main():
         sys.exit(1)
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
@@ -0,0 +1,217 @@
+# src/models/cart.py
+from ..core import database
+from ..core.database import get_tax_percent
+from ..core.stock_ledger import get_stock_ledger
+
+class Cart:
+    """One till's cart: items, stock reservations, hold/resume and checkout.
+
+    Holds no Qt state, so MainWindow and the headless simulator share the
+    same checkout path. Items are kept as {(name, price): {id, name,
+    price, qty}}. Listeners get the set of item ids whose available stock
+    changed. Held orders go to store: the database module, or an
+    OrderClient for a till on the order server.
+    """
+
+    def __init__(self, cart_id="current", ledger=None, writer=None, store=None):
+        self.cart_id = cart_id
+        self.items = {}
+        self.held_id = None   # Set when the cart was resumed from a held order
+        self.ledger = ledger or get_stock_ledger()
+        self.store = store or database
+        self._writer = writer
+        self.listeners = []
+
+    def add_listener(self, callback):
+        self.listeners.append(callback)
+
+    def _stock_changed(self, item_ids):
+        if not item_ids:
+            return
+        for callback in list(self.listeners):
+            try:
+                callback(item_ids)
+            except Exception as e:
+                print(f"⚠️ Cart listener failed: {e}")
+
+    @property
+    def writer(self):
+        if self._writer is None:
+            from ..core.order_writer import get_order_writer
+            self._writer = get_order_writer()
+        return self._writer
+
+    def add(self, item_id, name, price):
+        """Add one unit, reserving stock; returns the cart key (None if out of stock)."""
+        if not self.ledger.reserve(self.cart_id, item_id):
+            return None
+        key = (name, price)
+        if key in self.items:
+            self.items[key]['qty'] += 1
+        else:
+            self.items[key] = {'id': item_id, 'name': name, 'price': price, 'qty': 1}
+        self._stock_changed({item_id})
+        return key
+
+    def quantities(self):
+        """Return {item_id: qty} for the cart."""
+        quantities = {}
+        for data in self.items.values():
+            if data.get('id') is not None:
+                quantities[data['id']] = quantities.get(data['id'], 0) + data['qty']
+        return quantities
+
+    def reserve_qty(self, key, new_qty):
+        """Reserve stock for a new quantity of one line (the line itself is unchanged)."""
+        item_id = self.items[key].get('id')
+        if item_id is None:
+            return True
+        other = self.quantities().get(item_id, 0) - self.items[key]['qty']
+        if not self.ledger.set_qty(self.cart_id, item_id, other + max(new_qty, 0)):
+            return False
+        self._stock_changed({item_id})
+        return True
+
+    def set_qty(self, key, new_qty):
+        """Change a line's quantity (0 removes it); False if not enough stock."""
+        if key not in self.items:
+            return False
+        if not self.reserve_qty(key, new_qty):
+            return False
+        if new_qty <= 0:
+            del self.items[key]
+        else:
+            self.items[key]['qty'] = new_qty
+        return True
+
+    def remove(self, key):
+        """Remove a line from the cart."""
+        if key in self.items:
+            del self.items[key]
+            self.sync_stock()
+
+    def sync_stock(self):
+        """Make the reservations match the items (after edits made directly to them)."""
+        self._stock_changed(self.ledger.set_cart(self.cart_id, self.quantities()))
+
+    def sync_held(self):
+        """Re-read held orders so expired/deleted ones release their stock."""
+        self._stock_changed(self.ledger.sync_held())
+
+    def totals(self):
+        """Return (subtotal, tax_percent, tax, total)."""
+        subtotal = sum(data['price'] * data['qty'] for data in self.items.values())
+        tax_percent = get_tax_percent()
+        tax = subtotal * (tax_percent / 100)
+        return subtotal, tax_percent, tax, subtotal + tax
+
+    def snapshot(self):
+        """Copy of the items (for the receipt after the cart is cleared)."""
+        return {key: dict(data) for key, data in self.items.items()}
+
+    def items_list(self):
+        """Items as saved with an order."""
+        return [
+            {
+                'id': data.get('id'),
+                'name': data['name'],
+                'price': data['price'],
+                'qty': data['qty'],
+                'total': data['price'] * data['qty']
+            }
+            for data in self.items.values()
+        ]
+
+    def clear(self, delete_held=False):
+        """Empty the cart; a resumed held order is kept unless delete_held."""
+        if self.held_id is not None and delete_held:
+            self.store.delete_held_order(self.held_id)
+        self._reset()
+
+    def _reset(self):
+        self.detach()
+        # A kept held order gets its own reservation back
+        self.sync_held()
+
+    def detach(self):
+        """Empty the cart without touching the database; returns the old held id.
+
+        Releases this cart's reservation and its claim on a resumed held
+        order. The caller then does the blocking part (saving or deleting
+        the held order, sync_held), e.g. on a worker thread.
+        """
+        held_id = self.held_id
+        self.items.clear()
+        self.held_id = None
+        self.ledger.claim_held(self.cart_id, None)
+        self._stock_changed(self.ledger.release(self.cart_id))
+        return held_id
+
+    def hold(self):
+        """Park the cart as a held order (updating the one it came from); returns its id."""
+        held_id = self.store.save_held_order(self.items, self.held_id)
+        self._reset()
+        return held_id
+
+    def resume(self, held_id):
+        """Replace the cart with a held order; returns it, or None if it is gone."""
+        order = self.store.get_held_order(held_id)
+        if order is None:
+            self.sync_held()
+            return None
+        self.load_held(order)
+        self.sync_held()
+        return order
+
+    def load_held(self, order):
+        """Fill the cart from an already fetched held order (no database access).
+
+        Follow with sync_held() so the held order's own reservation is dropped.
+        """
+        self.items.clear()
+        for item in order['items']:
+            key = (item['name'], item['price'])
+            self.items[key] = {
+                'id': item.get('id'),
+                'name': item['name'],
+                'price': item['price'],
+                'qty': item['qty']
+            }
+        self.held_id = order['id']
+        # Its stock moves from the held reservation to this cart
+        self.ledger.claim_held(self.cart_id, self.held_id)
+        self._stock_changed(self.ledger.set_cart(self.cart_id, self.quantities()))
+
+    def checkout(self, delete_held=True):
+        """Queue the cart as a completed order and clear it; returns the OrderTicket.
+
+        The writer deducts the stock in the order's transaction, so the
+        reservation is committed rather than released. A resumed held
+        order is deleted; with delete_held=False that is left to the
+        caller (read held_id first).
+        """
+        _, _, _, total = self.totals()
+        # Returns at once with the order id; the commit happens in the next batch
+        ticket = self.writer.submit(self.items_list(), total)
+        changed = self.ledger.commit(self.cart_id, ticket.order_id)
+        if ticket.done:
+            # Reported before the ledger knew the order: settle it here
+            changed |= self.ledger.settle(ticket.order_id, ticket.committed)
+        self.items.clear()
+        if self.held_id is not None:
+            held_id, self.held_id = self.held_id, None
+            self.ledger.claim_held(self.cart_id, None)
+            if delete_held:
+                self.store.delete_held_order(held_id)
+                changed |= self.ledger.sync_held()
+        self._stock_changed(changed)
+        return ticket
+
+    def order_written(self, order_id, ok):
+        """Call when the writer reports an order (its listener's order_id, ok).
+
+        An order that failed to save gives its stock back to the ledger.
+        Orders the ledger doesn't know (other ledgers, already settled)
+        are ignored.
+        """
+        self._stock_changed(self.ledger.settle(order_id, ok))
@@ -1,20 +1,68 @@
 # src/views/admin_window.py
+from datetime import datetime
 from PyQt6.QtWidgets import (
     QDialog, QVBoxLayout, QHBoxLayout, QLabel, QLineEdit,
     QPushButton, QTableWidget, QTableWidgetItem, QMessageBox,
-    QComboBox, QTabWidget, QHeaderView, QWidget
+    QComboBox, QTabWidget, QHeaderView, QWidget, QTableView, QDateEdit,
+    QCheckBox, QProgressBar, QTextEdit
 )
-from PyQt6.QtCore import Qt
-from PyQt6.QtGui import QIntValidator
-import csv
-import os
-from ..core.database import get_db_connection, get_all_orders, get_daily_summary, get_most_sold_items, get_setting, set_setting
+from PyQt6.QtCore import Qt, QDate, QThread, QTimer, QObject, pyqtSignal
+from PyQt6.QtGui import QIntValidator, QFont, QColor
+from ..core import database
+from ..core.database import get_setting, day_bounds
+from ..core.export import export_sales_csv, ExportCancelled, DEFAULT_EXPORT_PATH
+from ..core import perf
+from .db_executor import run_db
+from .history_model import SalesHistoryModel
+
+def _report_summary(store):
+    """Today's (count, total) and the top 5 items, for the Reports tab."""
+    return store.get_daily_summary(), store.get_most_sold_items(5)
+
+class BackupSignals(QObject):
+    """Carries backup status from the backup thread to the UI."""
+    status = pyqtSignal(object)   # status dict or None
+
+class CsvExportWorker(QThread):
+    """Runs export_sales_csv off the UI thread."""
+    progress = pyqtSignal(int)
+    succeeded = pyqtSignal(int, str)
+    failed = pyqtSignal(str)
+    cancelled = pyqtSignal()
+
+    def __init__(self, start=None, end=None, compress=False, parent=None):
+        super().__init__(parent)
+        self.start_time = start
+        self.end_time = end
+        self.compress = compress
+
+    def run(self):
+        try:
+            rows, path = export_sales_csv(
+                DEFAULT_EXPORT_PATH,
+                start=self.start_time,
+                end=self.end_time,
+                compress=self.compress,
+                progress=self.progress.emit,
+                is_cancelled=self.isInterruptionRequested
+            )
+            self.succeeded.emit(rows, path)
+        except ExportCancelled:
+            self.cancelled.emit()
+        except Exception as e:
+            self.failed.emit(str(e))
+        finally:
+            from ..core.database import close_db_connection
+            close_db_connection()
 
 class AdminWindow(QDialog):
-    def __init__(self):
+    def __init__(self, store=None):
         super().__init__()
         self.setWindowTitle("Admin Panel")
         self.resize(800, 600)
+        # The database module, or an OrderClient on a multi-counter till
+        self.store = store or database
+        self.export_worker = None
         self.setup_ui()
 
     def setup_ui(self):
@@ -27,9 +75,16 @@ class AdminWindow(QDialog):
         self.setup_menu_tab(menu_tab)
         tabs.addTab(menu_tab, "Menu Management")
 
-        # Tab 2: Reports
+        # Tab 2: Reports (sales and history, analytics)
         report_tab = QWidget()
-        self.setup_report_tab(report_tab)
+        report_tabs = QTabWidget()
+        QVBoxLayout(report_tab).addWidget(report_tabs)
+        sales_tab = QWidget()
+        self.setup_report_tab(sales_tab)
+        report_tabs.addTab(sales_tab, "Sales")
+        analytics_tab = QWidget()
+        self.setup_analytics_tab(analytics_tab)
+        report_tabs.addTab(analytics_tab, "Analytics")
         tabs.addTab(report_tab, "Reports")
 
         # Tab 3: Settings
@@ -37,6 +92,11 @@ class AdminWindow(QDialog):
         self.setup_settings_tab(settings_tab)
         tabs.addTab(settings_tab, "Settings")
 
+        # Tab 4: Performance
+        self.perf_tab = QWidget()
+        self.setup_performance_tab(self.perf_tab)
+        tabs.addTab(self.perf_tab, "Performance")
+
     def setup_menu_tab(self, parent):
         layout = QVBoxLayout(parent)
 
@@ -76,74 +136,350 @@ class AdminWindow(QDialog):
     def setup_report_tab(self, parent):
         layout = QVBoxLayout(parent)
 
-        # Daily Summary
-        count, total = get_daily_summary()
-        summary_label = QLabel(f"📅 Today's Sales: {count} orders • ₹{total:.2f}")
-        summary_label.setStyleSheet("font-size: 16px; font-weight: bold;")
-        layout.addWidget(summary_label)
+        # Daily Summary (filled in when the background query finishes)
+        self.summary_label = QLabel("📅 Today's Sales: loading...")
+        self.summary_label.setStyleSheet("font-size: 16px; font-weight: bold;")
+        layout.addWidget(self.summary_label)
 
         # Most Sold Items
         layout.addWidget(QLabel("🏆 Top 5 Most Sold Items:"))
-        top_items = get_most_sold_items(5)
-        top_list = ""
-        for i, ((name, price), qty) in enumerate(top_items, 1):
-            top_list += f"{i}. {name} — {qty} sold\n"
-        if not top_list:
-            top_list = "No sales yet."
-        top_label = QLabel(top_list)
-        layout.addWidget(top_label)
-
-        # Export Button
-        export_btn = QPushButton("📤 Export All Sales to CSV")
-        export_btn.clicked.connect(self.export_to_csv)
-        layout.addWidget(export_btn)
+        self.top_label = QLabel("")
+        layout.addWidget(self.top_label)
+        run_db(_report_summary, self.store).then(self.show_report_summary)
+
+        # Export (uses the history date range below, runs in background)
+        export_layout = QHBoxLayout()
+        self.export_btn = QPushButton("📤 Export Sales to CSV")
+        self.export_btn.clicked.connect(self.export_to_csv)
+        self.export_gzip_check = QCheckBox("gzip")
+        self.export_progress = QProgressBar()
+        self.export_progress.setVisible(False)
+        self.export_cancel_btn = QPushButton("Cancel")
+        self.export_cancel_btn.setVisible(False)
+        self.export_cancel_btn.clicked.connect(self.cancel_export)
+        export_layout.addWidget(self.export_btn)
+        if self.store is not database:
+            # The export streams straight from canteen.db
+            self.export_btn.setEnabled(False)
+            self.export_btn.setToolTip("Export sales on the order server's computer.")
+        export_layout.addWidget(self.export_gzip_check)
+        export_layout.addWidget(self.export_progress)
+        export_layout.addWidget(self.export_cancel_btn)
+        layout.addLayout(export_layout)
 
         # Sales History Table
         layout.addWidget(QLabel("📋 Sales History (Completed Orders):"))
-        self.history_table = QTableWidget(0, 4)
-        self.history_table.setHorizontalHeaderLabels(["Order ID", "Date & Time", "Items", "Total"])
+
+        # History filters (applied in SQL by the model)
+        filter_layout = QHBoxLayout()
+        self.history_range_check = QCheckBox("From")
+        self.history_from = QDateEdit(QDate.currentDate())
+        self.history_from.setCalendarPopup(True)
+        self.history_to = QDateEdit(QDate.currentDate())
+        self.history_to.setCalendarPopup(True)
+        self.history_order_input = QLineEdit()
+        self.history_order_input.setPlaceholderText("Order ID")
+        self.history_order_input.setValidator(QIntValidator(1, 2**31 - 1))
+        filter_btn = QPushButton("🔍 Filter")
+        filter_btn.clicked.connect(self.load_sales_history)
+        filter_layout.addWidget(self.history_range_check)
+        filter_layout.addWidget(self.history_from)
+        filter_layout.addWidget(QLabel("To"))
+        filter_layout.addWidget(self.history_to)
+        filter_layout.addWidget(self.history_order_input)
+        filter_layout.addWidget(filter_btn)
+        layout.addLayout(filter_layout)
+
+        # Rows are fetched page by page as the user scrolls
+        self.history_model = SalesHistoryModel(store=self.store, parent=self)
+        self.history_table = QTableView()
+        self.history_table.setModel(self.history_model)
         self.history_table.horizontalHeader().setStretchLastSection(True)
+        self.history_table.setSelectionBehavior(QTableView.SelectionBehavior.SelectRows)
         layout.addWidget(self.history_table)
 
         self.load_sales_history()
 
+    def show_report_summary(self, summary):
+        (count, total), top_items = summary
+        self.summary_label.setText(f"📅 Today's Sales: {count} orders • ₹{total:.2f}")
+        top_list = ""
+        for i, ((name, price), qty) in enumerate(top_items, 1):
+            top_list += f"{i}. {name} — {qty} sold\n"
+        if not top_list:
+            top_list = "No sales yet."
+        self.top_label.setText(top_list)
+
     def load_sales_history(self):
-        orders = get_all_orders()
-        self.history_table.setRowCount(len(orders))
-        for row, order in enumerate(orders):
-            self.history_table.setItem(row, 0, QTableWidgetItem(str(order['id'])))
-            self.history_table.setItem(row, 1, QTableWidgetItem(order['datetime']))
-            items_summary = ", ".join([f"{item['name']} x{item['qty']}" for item in order['items']])
-            self.history_table.setItem(row, 2, QTableWidgetItem(items_summary))
-            self.history_table.setItem(row, 3, QTableWidgetItem(f"₹{order['total']:.2f}"))
+        """(Re)load sales history with the current filters."""
+        start, end = self.history_date_range()
+        order_text = self.history_order_input.text().strip()
+        order_id = int(order_text) if order_text else None
+        self.history_model.set_filters(start=start, end=end, order_id=order_id)
+
+    def history_date_range(self):
+        """Return the [start, end) timestamps picked in the history filter."""
+        if not self.history_range_check.isChecked():
+            return None, None
+        start, _ = day_bounds(self.history_from.date().toPyDate())
+        _, end = day_bounds(self.history_to.date().toPyDate())
+        return start, end
 
     def export_to_csv(self):
-        """Export all completed orders to CSV."""
+        """Export completed orders (in the selected date range) to CSV."""
+        if self.export_worker is not None:
+            return
+
+        # Counting may attach archived months, so not on the UI thread
+        from ..core.database import count_sales_lines
+        start, end = self.history_date_range()
+        self.export_btn.setEnabled(False)
+        run_db(count_sales_lines, start, end).then(
+            lambda total_rows: self.start_export(start, end, total_rows),
+            self.on_export_count_failed
+        )
+
+    def on_export_count_failed(self, error):
+        self.export_btn.setEnabled(True)
+        self.on_export_failed(str(error))
+
+    def start_export(self, start, end, total_rows):
+        if not total_rows:
+            self.export_btn.setEnabled(True)
+            QMessageBox.warning(self, "No Data", "No completed orders to export.")
+            return
+
+        self.export_progress.setRange(0, total_rows)
+        self.export_progress.setValue(0)
+        self.export_progress.setVisible(True)
+        self.export_cancel_btn.setVisible(True)
+        self.export_btn.setEnabled(False)
+
+        self.export_worker = CsvExportWorker(start, end, self.export_gzip_check.isChecked(), self)
+        self.export_worker.progress.connect(self.export_progress.setValue)
+        self.export_worker.succeeded.connect(self.on_export_succeeded)
+        self.export_worker.failed.connect(self.on_export_failed)
+        self.export_worker.cancelled.connect(
+            lambda: QMessageBox.information(self, "Export Cancelled", "Export was cancelled.")
+        )
+        self.export_worker.finished.connect(self.on_export_finished)
+        self.export_worker.start()
+
+    def cancel_export(self):
+        if self.export_worker is not None:
+            self.export_worker.requestInterruption()
+
+    def on_export_succeeded(self, rows, path):
+        QMessageBox.information(self, "Export Success", f"{rows} line(s) saved to:\n{path}")
+
+    def on_export_failed(self, error):
+        QMessageBox.critical(self, "Export Failed", f"Error: {error}")
+
+    def on_export_finished(self):
+        self.export_worker.deleteLater()
+        self.export_worker = None
+        self.export_progress.setVisible(False)
+        self.export_cancel_btn.setVisible(False)
+        self.export_btn.setEnabled(True)
+
+    def setup_analytics_tab(self, parent):
+        layout = QVBoxLayout(parent)
+
+        range_layout = QHBoxLayout()
+        self.analytics_from = QDateEdit(QDate.currentDate().addDays(-89))
+        self.analytics_from.setCalendarPopup(True)
+        self.analytics_to = QDateEdit(QDate.currentDate())
+        self.analytics_to.setCalendarPopup(True)
+        self.analytics_btn = QPushButton("📊 Analyze")
+        self.analytics_btn.clicked.connect(self.load_analytics)
+        range_layout.addWidget(QLabel("From"))
+        range_layout.addWidget(self.analytics_from)
+        range_layout.addWidget(QLabel("To"))
+        range_layout.addWidget(self.analytics_to)
+        range_layout.addWidget(self.analytics_btn)
+        range_layout.addStretch()
+        layout.addLayout(range_layout)
+
+        self.analytics_summary = QLabel("Pick a date range and press Analyze.")
+        self.analytics_summary.setStyleSheet("font-size: 14px; font-weight: bold;")
+        layout.addWidget(self.analytics_summary)
+
+        # Weekday x hour of day, shaded by the chosen measure
+        heat_layout = QHBoxLayout()
+        heat_layout.addWidget(QLabel("🔥 By weekday and hour:"))
+        self.heat_measure = QComboBox()
+        self.heat_measure.addItems(["Revenue", "Units", "Orders"])
+        self.heat_measure.currentIndexChanged.connect(self.show_heatmap)
+        heat_layout.addWidget(self.heat_measure)
+        heat_layout.addStretch()
+        layout.addLayout(heat_layout)
+        self.heat_table = QTableWidget(7, 24)
+        self.heat_table.setVerticalHeaderLabels(["Mon", "Tue", "Wed", "Thu", "Fri", "Sat", "Sun"])
+        self.heat_table.setHorizontalHeaderLabels([str(hour) for hour in range(24)])
+        self.heat_table.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeMode.Stretch)
+        self.heat_table.setEditTriggers(QTableWidget.EditTrigger.NoEditTriggers)
+        layout.addWidget(self.heat_table)
+
+        layout.addWidget(QLabel("📈 Revenue by category, and basket size:"))
+        self.trend_table = QTableWidget(0, 0)
+        self.trend_table.setEditTriggers(QTableWidget.EditTrigger.NoEditTriggers)
+        layout.addWidget(self.trend_table)
+        self.analytics = None
+
+    def load_analytics(self):
+        """Compute analytics for the picked range (in the background)."""
         try:
-            orders = get_all_orders()
-            if not orders:
-                QMessageBox.warning(self, "No Data", "No completed orders to export.")
-                return
-
-            # Save to project root as 'sales_report.csv'
-            csv_path = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..", "sales_report.csv"))
-            with open(csv_path, 'w', newline='', encoding='utf-8') as f:
-                writer = csv.writer(f)
-                writer.writerow(["Order ID", "Date & Time", "Item", "Qty", "Price", "Total"])
-                for order in orders:
-                    for item in order['items']:
-                        writer.writerow([
-                            order['id'],
-                            order['datetime'],
-                            item['name'],
-                            item['qty'],
-                            item['price'],
-                            order['total']
-                        ])
-
-            QMessageBox.information(self, "Export Success", f"Sales report saved to:\n{csv_path}")
-        except Exception as e:
-            QMessageBox.critical(self, "Export Failed", f"Error: {str(e)}")
+            from ..core.analytics import sales_analytics
+        except ImportError:
+            self.analytics_summary.setText("Analytics need NumPy: pip install numpy")
+            return
+        start = self.analytics_from.date().toPyDate()
+        end = self.analytics_to.date().toPyDate()
+        if end < start:
+            QMessageBox.warning(self, "Date Range", "The end date is before the start date.")
+            return
+        self.analytics_btn.setEnabled(False)
+        self.analytics_summary.setText("⏳ Analyzing...")
+        run_db(sales_analytics, start, end, self.store).then(self.show_analytics, self.on_analytics_failed)
+
+    def on_analytics_failed(self, error):
+        self.analytics_btn.setEnabled(True)
+        self.analytics_summary.setText(f"❌ Analytics failed: {error}")
+
+    def show_analytics(self, analytics):
+        self.analytics_btn.setEnabled(True)
+        self.analytics = analytics
+        self.analytics_summary.setText(
+            f"{analytics['orders']:,} orders • ₹{analytics['revenue']:,.2f} • {analytics['units']:,} items • "
+            f"{analytics['avg_basket_units']:.2f} items / order • ₹{analytics['avg_order_value']:.2f} / order"
+        )
+        self.show_heatmap()
+
+        labels = analytics['period_labels']
+        categories = analytics['categories']
+        rows = [(name, values, "₹{:,.0f}") for name, values in zip(categories, analytics['category_revenue'])]
+        rows.append(("Items / order", analytics['period_basket_units'], "{:.2f}"))
+        rows.append(("₹ / order", analytics['period_order_value'], "₹{:.2f}"))
+        self.trend_table.clear()
+        self.trend_table.setRowCount(len(rows))
+        self.trend_table.setColumnCount(len(labels))
+        self.trend_table.setHorizontalHeaderLabels(labels)
+        self.trend_table.setVerticalHeaderLabels([name for name, _, _ in rows])
+        for row, (_, values, fmt) in enumerate(rows):
+            for col, value in enumerate(values):
+                self.trend_table.setItem(row, col, QTableWidgetItem(fmt.format(value)))
+
+    def show_heatmap(self):
+        if self.analytics is None:
+            return
+        measure = self.heat_measure.currentText().lower()
+        values = self.analytics[f'heat_{measure}']
+        peak = values.max() or 1
+        for weekday in range(7):
+            for hour in range(24):
+                value = values[weekday, hour]
+                cell = QTableWidgetItem(f"{value:,.0f}" if value else "")
+                shade = value / peak
+                cell.setBackground(QColor(255, int(255 - 120 * shade), int(255 - 220 * shade)))
+                self.heat_table.setItem(weekday, hour, cell)
+
+    def setup_performance_tab(self, parent):
+        layout = QVBoxLayout(parent)
+
+        controls = QHBoxLayout()
+        self.perf_enabled_check = QCheckBox("Record timings")
+        self.perf_enabled_check.setChecked(perf.is_enabled())
+        self.perf_enabled_check.toggled.connect(perf.set_enabled)
+        reset_btn = QPushButton("Reset")
+        reset_btn.clicked.connect(self.reset_performance)
+        self.profile_btn = QPushButton()
+        self.profile_btn.clicked.connect(self.toggle_profile)
+        controls.addWidget(self.perf_enabled_check)
+        controls.addWidget(reset_btn)
+        controls.addStretch()
+        controls.addWidget(self.profile_btn)
+        layout.addLayout(controls)
+
+        # Percentiles are histogram bucket bounds ("at most")
+        layout.addWidget(QLabel("⏱️ Operations (ms, slowest total first):"))
+        self.perf_table = QTableWidget(0, 7)
+        self.perf_table.setHorizontalHeaderLabels(["Operation", "Calls", "Mean", "p50", "p95", "p99", "Max"])
+        self.perf_table.horizontalHeader().setSectionResizeMode(0, QHeaderView.ResizeMode.Stretch)
+        self.perf_table.setEditTriggers(QTableWidget.EditTrigger.NoEditTriggers)
+        layout.addWidget(self.perf_table)
+
+        layout.addWidget(QLabel("🐢 Slowest recent calls:"))
+        self.perf_slow_table = QTableWidget(0, 4)
+        self.perf_slow_table.setHorizontalHeaderLabels(["Time", "Operation", "ms", "Thread"])
+        self.perf_slow_table.horizontalHeader().setSectionResizeMode(1, QHeaderView.ResizeMode.Stretch)
+        self.perf_slow_table.setEditTriggers(QTableWidget.EditTrigger.NoEditTriggers)
+        layout.addWidget(self.perf_slow_table)
+
+        self.profile_output = QTextEdit()
+        self.profile_output.setReadOnly(True)
+        self.profile_output.setFont(QFont("Courier New", 9))
+        self.profile_output.setVisible(False)
+        layout.addWidget(self.profile_output)
+
+        self.update_profile_button()
+        # Live view, only refreshed while the tab is showing
+        self.perf_timer = QTimer(self)
+        self.perf_timer.timeout.connect(self.refresh_performance)
+        self.perf_timer.start(1000)
+
+    def refresh_performance(self):
+        if not self.perf_tab.isVisible():
+            return
+        rows = perf.summary()
+        self.perf_table.setRowCount(len(rows))
+        for i, row in enumerate(rows):
+            values = [row['name'], str(row['calls'])] + [
+                f"{row[key]:.2f}" for key in ('mean_ms', 'p50_ms', 'p95_ms', 'p99_ms', 'max_ms')
+            ]
+            for col, value in enumerate(values):
+                self.perf_table.setItem(i, col, QTableWidgetItem(value))
+
+        slowest = perf.slowest_recent(20)
+        self.perf_slow_table.setRowCount(len(slowest))
+        for i, (when, name, ms, thread) in enumerate(slowest):
+            values = [datetime.fromtimestamp(when).strftime("%H:%M:%S"), name, f"{ms:.2f}", thread]
+            for col, value in enumerate(values):
+                self.perf_slow_table.setItem(i, col, QTableWidgetItem(value))
+
+    def reset_performance(self):
+        perf.reset()
+        self.refresh_performance()
+
+    def update_profile_button(self):
+        if perf.is_profiling():
+            self.profile_btn.setText("⏹️ Stop cProfile")
+        else:
+            self.profile_btn.setText("▶️ Start cProfile")
+
+    def toggle_profile(self):
+        """Start a cProfile capture of the till, or stop it and show the top functions."""
+        if perf.is_profiling():
+            path, text = perf.stop_profile()
+            self.profile_output.setPlainText(f"Saved to {path}\n\n{text}")
+            self.profile_output.setVisible(True)
+        else:
+            perf.start_profile()
+            QMessageBox.information(
+                self, "Profiling",
+                "Profiling the till (UI thread).\n"
+                "Close the admin panel, ring up some orders, then come back here to stop."
+            )
+        self.update_profile_button()
+
+    def done(self, result):
+        # Don't leave an export thread running after the dialog closes
+        if self.export_worker is not None:
+            self.export_worker.requestInterruption()
+            self.export_worker.wait()
+        if self.backup_signals is not None:
+            from ..core.backup import get_backup_service
+            get_backup_service().remove_listener(self.backup_listener)
+        super().done(result)
 
     def add_item(self):
         name = self.name_input.text().strip()
@@ -160,31 +496,24 @@ class AdminWindow(QDialog):
             QMessageBox.warning(self, "Input Error", "Price must be a number.")
             return
 
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        cursor.execute(
-            "INSERT INTO items (name, category, price) VALUES (?, ?, ?)",
-            (name, category, price)
-        )
-        conn.commit()
-        conn.close()
+        run_db(self.store.add_menu_item, name, category, price).then(self.on_item_added)
 
+    def on_item_added(self, item_id):
         self.name_input.clear()
         self.price_input.clear()
+        self.on_items_changed()
+
+    def on_items_changed(self, _=None):
         self.load_items()
         # Refresh main window menu (if exists)
         if hasattr(self.parent(), 'load_menu_items'):
             self.parent().load_menu_items()
-        if hasattr(self.parent(), 'refresh_menu'):
-            self.parent().refresh_menu()
 
     def load_items(self):
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        cursor.execute("SELECT id, name, category, price FROM items ORDER BY name")
-        items = cursor.fetchall()
-        conn.close()
+        """Reload the item table (queried in the background)."""
+        run_db(self.store.get_all_items).then(self.show_items)
 
+    def show_items(self, items):
         self.table.setRowCount(len(items))
         for row, (id, name, category, price) in enumerate(items):
             self.table.setItem(row, 0, QTableWidgetItem(str(id)))
@@ -206,16 +535,7 @@ class AdminWindow(QDialog):
             QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No
         )
         if reply == QMessageBox.StandardButton.Yes:
-            conn = get_db_connection()
-            cursor = conn.cursor()
-            cursor.execute("DELETE FROM items WHERE id = ?", (item_id,))
-            conn.commit()
-            conn.close()
-            self.load_items()
-            if hasattr(self.parent(), 'load_menu_items'):
-                self.parent().load_menu_items()
-            if hasattr(self.parent(), 'refresh_menu'):
-                self.parent().refresh_menu()
+            run_db(self.store.delete_menu_item, item_id).then(self.on_items_changed)
 
     def setup_settings_tab(self, parent):
         layout = QVBoxLayout(parent)
@@ -246,12 +566,72 @@ class AdminWindow(QDialog):
         paper_layout.addWidget(self.paper_combo)
         layout.addLayout(paper_layout)
 
+        # Held order expiry
+        ttl_layout = QHBoxLayout()
+        ttl_layout.addWidget(QLabel("Delete Held Orders After (minutes):"))
+        self.held_ttl_input = QLineEdit()
+        self.held_ttl_input.setValidator(QIntValidator(1, 7 * 24 * 60))
+        self.held_ttl_input.setText(get_setting("held_ttl_minutes", "120"))
+        ttl_layout.addWidget(self.held_ttl_input)
+        layout.addLayout(ttl_layout)
+
+        # Order archive horizon
+        archive_layout = QHBoxLayout()
+        archive_layout.addWidget(QLabel("Archive Orders Older Than (days, 0 = never):"))
+        self.archive_days_input = QLineEdit()
+        self.archive_days_input.setValidator(QIntValidator(0, 100 * 365))
+        self.archive_days_input.setText(get_setting("archive_after_days", "180"))
+        archive_layout.addWidget(self.archive_days_input)
+        layout.addLayout(archive_layout)
+
+        # Backups
+        backup_layout = QHBoxLayout()
+        backup_layout.addWidget(QLabel("Back Up Every (hours, 0 = never):"))
+        self.backup_interval_input = QLineEdit()
+        self.backup_interval_input.setValidator(QIntValidator(0, 30 * 24))
+        self.backup_interval_input.setText(get_setting("backup_interval_hours", "24"))
+        backup_layout.addWidget(self.backup_interval_input)
+        backup_layout.addWidget(QLabel("Keep:"))
+        self.backup_keep_input = QLineEdit()
+        self.backup_keep_input.setValidator(QIntValidator(1, 1000))
+        self.backup_keep_input.setText(get_setting("backup_keep", "7"))
+        backup_layout.addWidget(self.backup_keep_input)
+        layout.addLayout(backup_layout)
+
+        backup_status_layout = QHBoxLayout()
+        self.backup_status_label = QLabel()
+        self.backup_status_label.setWordWrap(True)
+        self.backup_now_btn = QPushButton("🗄️ Back Up Now")
+        backup_status_layout.addWidget(self.backup_status_label, 1)
+        backup_status_layout.addWidget(self.backup_now_btn)
+        layout.addLayout(backup_status_layout)
+        self.backup_signals = None
+        if self.store is database:
+            from ..core.backup import get_backup_service
+            service = get_backup_service()
+            self.backup_signals = BackupSignals(self)
+            self.backup_signals.status.connect(self.show_backup_status)
+            # Kept so done() can remove the same callable
+            self.backup_listener = self.backup_signals.status.emit
+            service.add_listener(self.backup_listener)
+            self.backup_now_btn.clicked.connect(service.request_backup)
+            self.show_backup_status(service.status())
+        else:
+            # Snapshots are taken where canteen.db is
+            self.backup_status_label.setText("Backups are made on the order server's computer.")
+            self.backup_now_btn.setEnabled(False)
+
         # Admin Password
         pwd_layout = QHBoxLayout()
         pwd_layout.addWidget(QLabel("Admin Password:"))
         self.pwd_input = QLineEdit()
         self.pwd_input.setEchoMode(QLineEdit.EchoMode.Password)
-        self.pwd_input.setText(get_setting("admin_password", "1234"))
+        if self.store is database:
+            self.pwd_input.setText(get_setting("admin_password", "1234"))
+        else:
+            # The order server never sends it or takes it from a till
+            self.pwd_input.setPlaceholderText("Change it on the order server's computer")
+            self.pwd_input.setEnabled(False)
         pwd_layout.addWidget(self.pwd_input)
         layout.addLayout(pwd_layout)
 
@@ -262,6 +642,21 @@ class AdminWindow(QDialog):
 
         layout.addStretch()
 
+    def show_backup_status(self, status):
+        from ..core.backup import get_backup_service
+        running = get_backup_service().running
+        self.backup_now_btn.setEnabled(not running)
+        if running:
+            text = "⏳ Backing up..."
+        elif status is None:
+            text = "No backup yet."
+        elif status['ok']:
+            text = (f"✅ Last backup: {status['time']:%Y-%m-%d %H:%M} "
+                    f"({status['size'] / 1e6:.1f} MB, integrity OK)\n{status['path']}")
+        else:
+            text = f"❌ Last backup failed at {status['time']:%Y-%m-%d %H:%M}: {status['error']}"
+        self.backup_status_label.setText(text)
+
     def save_settings(self):
         """Save all settings to database."""
         try:
@@ -269,15 +664,23 @@ class AdminWindow(QDialog):
             tax = float(self.tax_input.text())
             if tax < 0:
                 raise ValueError("Tax cannot be negative")
-
-            # Save settings
-            set_setting("canteen_name", self.canteen_name_input.text().strip() or "College Canteen")
-            set_setting("tax_percent", str(tax))
-            set_setting("paper_width", self.paper_combo.currentText().replace("mm", ""))
-            set_setting("admin_password", self.pwd_input.text().strip() or "1234")
-
-            QMessageBox.information(self, "Success", "Settings saved successfully!")
         except ValueError as e:
             QMessageBox.warning(self, "Input Error", f"Invalid tax value: {e}")
-        except Exception as e:
-            QMessageBox.critical(self, "Error", f"Failed to save settings: {e}")
+            return
+
+        settings = {
+            "canteen_name": self.canteen_name_input.text().strip() or "College Canteen",
+            "tax_percent": str(tax),
+            "paper_width": self.paper_combo.currentText().replace("mm", ""),
+            "held_ttl_minutes": self.held_ttl_input.text().strip() or "120",
+            "archive_after_days": self.archive_days_input.text().strip() or "180",
+            "backup_interval_hours": self.backup_interval_input.text().strip() or "24",
+            "backup_keep": self.backup_keep_input.text().strip() or "7",
+        }
+        if self.store is database:
+            settings["admin_password"] = self.pwd_input.text().strip() or "1234"
+        # Save settings (in the background)
+        run_db(self.store.set_settings, settings).then(
+            lambda _: QMessageBox.information(self, "Success", "Settings saved successfully!"),
+            lambda e: QMessageBox.critical(self, "Error", f"Failed to save settings: {e}")
+        )
@@ -0,0 +1,147 @@
+# src/views/cart_model.py
+from PyQt6.QtWidgets import QStyledItemDelegate, QSpinBox
+from PyQt6.QtCore import Qt, QAbstractTableModel, QModelIndex, QEvent, pyqtSignal
+from PyQt6.QtGui import QColor
+
+COL_NAME, COL_QTY, COL_PRICE, COL_TOTAL, COL_ACTION = range(5)
+
+class CartModel(QAbstractTableModel):
+    """Table model over the cart dict {key: {name, price, qty}}.
+
+    Only the rows that change are inserted, removed or repainted.
+    """
+
+    HEADERS = ["Item", "Qty", "Price", "Total", "Action"]
+
+    # Emitted whenever a quantity/line changes, so totals can be refreshed
+    cart_changed = pyqtSignal()
+
+    def __init__(self, cart_items, parent=None):
+        super().__init__(parent)
+        self.cart_items = cart_items
+        self.keys = list(cart_items.keys())
+        # Optional callable(key, new_qty) -> bool that can refuse a qty increase
+        self.qty_validator = None
+
+    def set_cart(self, cart_items):
+        """Replace the whole cart (clear / resume)."""
+        self.beginResetModel()
+        self.cart_items = cart_items
+        self.keys = list(cart_items.keys())
+        self.endResetModel()
+        self.cart_changed.emit()
+
+    def refresh_key(self, key):
+        """Show a line that was added to or changed in the cart dict."""
+        if key in self.keys:
+            row = self.keys.index(key)
+            self.dataChanged.emit(self.index(row, COL_QTY), self.index(row, COL_TOTAL))
+        else:
+            row = len(self.keys)
+            self.beginInsertRows(QModelIndex(), row, row)
+            self.keys.append(key)
+            self.endInsertRows()
+        self.cart_changed.emit()
+
+    def remove_key(self, key):
+        """Remove a line from both the cart dict and the table."""
+        if key not in self.keys:
+            return
+        row = self.keys.index(key)
+        self.beginRemoveRows(QModelIndex(), row, row)
+        del self.keys[row]
+        self.cart_items.pop(key, None)
+        self.endRemoveRows()
+        self.cart_changed.emit()
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.keys)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.HEADERS)
+
+    def flags(self, index):
+        flags = Qt.ItemFlag.ItemIsEnabled | Qt.ItemFlag.ItemIsSelectable
+        if index.column() == COL_QTY:
+            flags |= Qt.ItemFlag.ItemIsEditable
+        return flags
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid():
+            return None
+        data = self.cart_items[self.keys[index.row()]]
+        column = index.column()
+        if role == Qt.ItemDataRole.EditRole and column == COL_QTY:
+            return data['qty']
+        if role != Qt.ItemDataRole.DisplayRole:
+            return None
+        if column == COL_NAME:
+            return data['name']
+        if column == COL_QTY:
+            return data['qty']
+        if column == COL_PRICE:
+            return f"₹{data['price']:.2f}"
+        if column == COL_TOTAL:
+            return f"₹{data['price'] * data['qty']:.2f}"
+        return "🗑️"
+
+    def setData(self, index, value, role=Qt.ItemDataRole.EditRole):
+        if role != Qt.ItemDataRole.EditRole or index.column() != COL_QTY:
+            return False
+        key = self.keys[index.row()]
+        data = self.cart_items[key]
+        if data['qty'] == value:
+            return False
+        if self.qty_validator is not None and not self.qty_validator(key, value):
+            return False
+        data['qty'] = value
+        self.dataChanged.emit(self.index(index.row(), COL_QTY), self.index(index.row(), COL_TOTAL))
+        self.cart_changed.emit()
+        return True
+
+    def headerData(self, section, orientation, role=Qt.ItemDataRole.DisplayRole):
+        if role == Qt.ItemDataRole.DisplayRole and orientation == Qt.Orientation.Horizontal:
+            return self.HEADERS[section]
+        return None
+
+class CartDelegate(QStyledItemDelegate):
+    """Spin box editor for Qty and a painted delete button for Action."""
+
+    delete_requested = pyqtSignal(int)  # row
+
+    DELETE_COLOR = QColor("#f44336")
+
+    def createEditor(self, parent, option, index):
+        if index.column() != COL_QTY:
+            return None
+        editor = QSpinBox(parent)
+        editor.setRange(1, 99)  # Keep min=1 since we have delete button
+        # Commit on every tick so the row total and labels follow the spin box
+        editor.valueChanged.connect(lambda _: self.commitData.emit(editor))
+        return editor
+
+    def setEditorData(self, editor, index):
+        editor.blockSignals(True)
+        editor.setValue(index.data(Qt.ItemDataRole.EditRole))
+        editor.blockSignals(False)
+
+    def setModelData(self, editor, model, index):
+        if not model.setData(index, editor.value(), Qt.ItemDataRole.EditRole):
+            # Refused (e.g. not enough stock): snap the spin box back
+            self.setEditorData(editor, index)
+
+    def paint(self, painter, option, index):
+        if index.column() != COL_ACTION:
+            super().paint(painter, option, index)
+            return
+        painter.save()
+        painter.fillRect(option.rect.adjusted(2, 2, -2, -2), self.DELETE_COLOR)
+        painter.setPen(QColor("white"))
+        painter.drawText(option.rect, Qt.AlignmentFlag.AlignCenter, index.data())
+        painter.restore()
+
+    def editorEvent(self, event, model, option, index):
+        if index.column() == COL_ACTION and event.type() == QEvent.Type.MouseButtonRelease:
+            self.delete_requested.emit(index.row())
+            return True
+        return super().editorEvent(event, model, option, index)
@@ -0,0 +1,126 @@
+# src/views/db_executor.py
+import atexit
+import queue
+import threading
+import time
+import traceback
+from PyQt6.QtCore import QObject, Qt, pyqtSignal
+from ..core.database import close_db_connection
+from ..core import perf
+
+class DbFuture(QObject):
+    """Result of one queued call; callbacks always run on the UI thread."""
+    _done = pyqtSignal(object, object)  # result, exception (emitted by the worker)
+
+    def __init__(self, name, executor):
+        super().__init__()
+        self.name = name
+        self.result = None
+        self.error = None
+        self.finished = False
+        self._executor = executor
+        self._callbacks = []
+        # Queued: the worker only hands over finished data
+        self._done.connect(self._deliver, Qt.ConnectionType.QueuedConnection)
+
+    def then(self, on_result=None, on_error=None):
+        """Call on_result(result) or on_error(exception) when done; returns self."""
+        if self.finished:
+            self._call(on_result, on_error)
+        else:
+            self._callbacks.append((on_result, on_error))
+        return self
+
+    def _deliver(self, result, error):
+        self.result, self.error, self.finished = result, error, True
+        self._executor._pending.discard(self)
+        callbacks, self._callbacks = self._callbacks, []
+        if error is not None and not any(on_error for _, on_error in callbacks):
+            print(f"❌ {self.name} failed:")
+            print("".join(traceback.format_exception(type(error), error, error.__traceback__)))
+        for on_result, on_error in callbacks:
+            self._call(on_result, on_error)
+
+    def _call(self, on_result, on_error):
+        # An exception escaping a slot would take the whole till down
+        try:
+            if self.error is None:
+                if on_result is not None:
+                    on_result(self.result)
+            elif on_error is not None:
+                on_error(self.error)
+        except Exception:
+            print(f"❌ Callback for {self.name} failed:")
+            print(traceback.format_exc())
+
+class DbExecutor:
+    """Runs blocking database work on one long-lived thread, off the UI thread.
+
+    submit(fn, *args) returns a DbFuture; chain .then(on_result, on_error)
+    to get the finished data back on the UI thread. Calls run in the order
+    they were submitted, all on the thread's own pooled connection, which
+    is only closed at shutdown.
+    """
+
+    def __init__(self):
+        self.jobs = queue.Queue()
+        self._pending = set()  # Keeps futures alive until delivered
+        self._thread = threading.Thread(target=self._run, name="db-executor", daemon=True)
+        self._thread.start()
+
+    def submit(self, fn, *args, **kwargs):
+        future = DbFuture(getattr(fn, "__qualname__", repr(fn)), self)
+        self._pending.add(future)
+        self.jobs.put((future, fn, args, kwargs, time.perf_counter()))
+        return future
+
+    def pending(self):
+        return len(self._pending)
+
+    def wait(self, timeout=None):
+        """Block until queued work is done (shutdown only); False on timeout."""
+        done = threading.Event()
+        self.jobs.put(done)
+        return done.wait(timeout)
+
+    def stop(self):
+        """Finish the queued work, then close the connection and the thread."""
+        if self._thread is not None:
+            self.jobs.put(None)
+            self._thread.join()
+            self._thread = None
+
+    def _run(self):
+        try:
+            while True:
+                job = self.jobs.get()
+                if job is None:
+                    break
+                if isinstance(job, threading.Event):
+                    job.set()
+                    continue
+                future, fn, args, kwargs, queued_at = job
+                perf.record("db_executor.queue_wait", (time.perf_counter() - queued_at) * 1000)
+                result = error = None
+                try:
+                    result = fn(*args, **kwargs)
+                except Exception as e:
+                    error = e
+                future._done.emit(result, error)
+        finally:
+            close_db_connection()
+
+_executor = None
+
+def get_db_executor():
+    """Return the shared DbExecutor."""
+    global _executor
+    if _executor is None:
+        _executor = DbExecutor()
+        # Let a hold or delete still in the queue reach the database
+        atexit.register(_executor.stop)
+    return _executor
+
+def run_db(fn, *args, **kwargs):
+    """Queue fn(*args, **kwargs) on the shared executor; returns its DbFuture."""
+    return get_db_executor().submit(fn, *args, **kwargs)
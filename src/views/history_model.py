@@ -0,0 +1,92 @@
+# src/views/history_model.py
+from PyQt6.QtCore import Qt, QAbstractTableModel, QModelIndex
+from ..core import database
+from .db_executor import run_db
+
+class SalesHistoryModel(QAbstractTableModel):
+    """Completed orders, fetched page by page (in the background) as the view scrolls."""
+
+    HEADERS = ["Order ID", "Date & Time", "Items", "Total"]
+
+    def __init__(self, page_size=200, store=None, parent=None):
+        super().__init__(parent)
+        self.page_size = page_size
+        self.store = store or database
+        self._rows = []
+        self._last_id = None      # Smallest order_id loaded so far (keyset cursor)
+        self._exhausted = False
+        self._loading = False     # A page query is on the DB executor
+        self._generation = 0      # Bumped on reload so stale pages are dropped
+        self._filters = {}
+
+    def set_filters(self, start=None, end=None, order_id=None):
+        """Apply date range / order id filters (done in SQL) and reload."""
+        self.beginResetModel()
+        self._filters = {'start': start, 'end': end, 'order_id': order_id}
+        self._rows = []
+        self._last_id = None
+        self._exhausted = False
+        self._loading = False
+        self._generation += 1
+        self.endResetModel()
+
+    def refresh(self):
+        """Drop loaded rows and start again from the newest order."""
+        self.set_filters(**self._filters)
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self._rows)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.HEADERS)
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid() or role != Qt.ItemDataRole.DisplayRole:
+            return None
+        order_id, date_time, summary, total = self._rows[index.row()]
+        column = index.column()
+        if column == 0:
+            return str(order_id)
+        if column == 1:
+            return date_time
+        if column == 2:
+            return summary
+        return f"₹{total:.2f}"
+
+    def headerData(self, section, orientation, role=Qt.ItemDataRole.DisplayRole):
+        if role == Qt.ItemDataRole.DisplayRole and orientation == Qt.Orientation.Horizontal:
+            return self.HEADERS[section]
+        return None
+
+    def canFetchMore(self, parent=QModelIndex()):
+        return not parent.isValid() and not self._exhausted and not self._loading
+
+    def fetchMore(self, parent=QModelIndex()):
+        if parent.isValid() or self._exhausted or self._loading:
+            return
+        self._loading = True
+        generation = self._generation
+        run_db(self.store.get_orders_page, before_id=self._last_id, limit=self.page_size, **self._filters).then(
+            lambda rows: self._append_page(generation, rows),
+            lambda error: self._page_failed(generation, error)
+        )
+
+    def _append_page(self, generation, rows):
+        if generation != self._generation:
+            return
+        self._loading = False
+        if len(rows) < self.page_size:
+            self._exhausted = True
+        if not rows:
+            return
+        first = len(self._rows)
+        self.beginInsertRows(QModelIndex(), first, first + len(rows) - 1)
+        self._rows.extend(rows)
+        self._last_id = rows[-1][0]
+        self.endInsertRows()
+
+    def _page_failed(self, generation, error):
+        if generation == self._generation:
+            print(f"❌ Loading sales history failed: {error}")
+            self._loading = False
+            self._exhausted = True
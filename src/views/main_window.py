@@ -1,19 +1,91 @@
 # src/views/main_window.py
 import sys
+import threading
 from PyQt6.QtWidgets import (
     QMainWindow, QWidget, QVBoxLayout, QHBoxLayout,
-    QPushButton, QLabel, QScrollArea, QTableWidget,
-    QTableWidgetItem, QSpinBox, QMessageBox,
-    QAbstractItemView, QLineEdit  # 👈 Add QLineEdit if not present
+    QPushButton, QLabel, QScrollArea, QTableView,
+    QMessageBox, QAbstractItemView, QLineEdit  # 👈 Add QLineEdit if not present
 )
 from PyQt6.QtGui import QShortcut, QFont,QKeySequence  # 👈 QShortcut is here!
-from PyQt6.QtCore import Qt
-from .resume_dialog import ResumeDialog
-from ..core.database import get_db_connection, save_held_order, get_held_orders, delete_held_order
+from PyQt6.QtCore import Qt, QTimer, QObject, pyqtSignal
+from .menu_grid import MenuGrid
+from ..core.search import MenuSearchIndex
+from ..models.cart import Cart
+from .cart_model import CartModel, CartDelegate, COL_QTY, COL_ACTION
+from ..core import database
+from ..core.database import close_db_connection, get_tax_percent
+from ..core.stock_ledger import StockLedger
+from ..core.order_client import RemoteError
+from ..core.held_sweeper import get_held_sweeper
+from ..core.settings_watcher import get_settings_watcher
+from ..core.archiver import get_order_archiver
+from ..core.backup import get_backup_service
+from ..core.perf import traced
+from ..core import startup
+from .db_executor import run_db
+from .settings_signals import settings_signals
+from .ui_watchdog import UiWatchdog
+
+class PrintStatusSignals(QObject):
+    """Carries print spooler status from its worker thread to the UI."""
+    job_status = pyqtSignal(str, str, str)  # job_id, status, detail
+
+class OrderWriterSignals(QObject):
+    """Carries order writer results from its worker thread to the UI."""
+    order_written = pyqtSignal(int, bool, str)  # order_id, ok, error
+
+CART_ID = "current"  # This till's open cart in the stock ledger
+
+class HeldSweepSignals(QObject):
+    """Carries held-order expiry from the sweeper thread to the UI."""
+    expired = pyqtSignal(list)  # deleted held ids
+
+class ServerEventSignals(QObject):
+    """Carries order server pushes from the client's reader thread to the UI."""
+    event = pyqtSignal(str, object)  # event, data
+
+def _warm_up_printer():
+    """Import the printer (escpos) and build the receipt template off the UI thread."""
+    try:
+        from ..core import printer
+        printer.get_receipt_template()
+        # Receipts spooled before a crash or power cut print without waiting for the next bill
+        if printer.has_spooled_jobs():
+            printer.get_spooler()
+    except Exception as e:
+        print(f"⚠️ Printer warm-up failed: {e}")
+    finally:
+        close_db_connection()
+
+# Blocking halves of the cart actions, run on the DB executor
+
+def _save_held(store, ledger, items, held_id):
+    """Save a held order and give it back its stock reservation; returns (held_id, changed ids)."""
+    held_id = store.save_held_order(items, held_id)
+    return held_id, ledger.sync_held()
+
+def _delete_held(store, ledger, held_id):
+    """Delete a held order and release its stock; returns the changed item ids."""
+    store.delete_held_order(held_id)
+    return ledger.sync_held()
+
+def _queue_receipt(*args, **kwargs):
+    """Render and spool a receipt; returns the job id (None on error)."""
+    from ..core.printer import print_receipt
+    return print_receipt(*args, **kwargs)
+
+def _queue_reprint(order_id):
+    from ..core.printer import reprint_receipt
+    return reprint_receipt(order_id)
 
 class MainWindow(QMainWindow):
-    def __init__(self):
+    def __init__(self, profile_startup=False, store=None):
         super().__init__()
+        self.profile_startup = profile_startup
+        # Where data lives: the database module, or an OrderClient when
+        # this till is one counter of several on an order server
+        self.store = store or database
+        self.remote = store is not None
         self.setWindowTitle("College Canteen POS")
         self.setGeometry(100, 100, 1200, 800)
 
@@ -33,25 +105,74 @@ class MainWindow(QMainWindow):
         # Search bar
         self.search_bar = QLineEdit()
         self.search_bar.setPlaceholderText("🔍 Search items...")
-        self.search_bar.textChanged.connect(self.filter_menu_items)
-        self.menu_layout.insertWidget(0, self.search_bar)
+        self.menu_layout.addWidget(self.search_bar)
+
+        # Search is debounced: filter once typing pauses
+        self.search_index = MenuSearchIndex()
+        self.search_timer = QTimer(self)
+        self.search_timer.setSingleShot(True)
+        self.search_timer.setInterval(150)
+        self.search_timer.timeout.connect(lambda: self.filter_menu_items(self.search_bar.text()))
+        self.search_bar.textChanged.connect(self.search_timer.start)
+
+        # Menu buttons (patched in place when stock/price changes)
+        self.menu_grid = MenuGrid()
+        self.menu_grid.item_clicked.connect(self.add_to_cart)
+        self.menu_layout.addWidget(self.menu_grid)
+
+        # Admin button at bottom
+        admin_btn = QPushButton("⚙️ Admin Panel")
+        admin_btn.setFixedSize(220, 50)
+        admin_btn.setStyleSheet("""
+            QPushButton {
+                font-size: 14px;
+                background-color: #2196F3;
+                color: white;
+                border: none;
+                border-radius: 6px;
+            }
+        """)
+        admin_btn.clicked.connect(self.open_admin_panel)
+        self.menu_layout.addWidget(admin_btn)
 
         # Right: Cart panel
         self.cart_panel = QWidget()
         self.cart_layout = QVBoxLayout(self.cart_panel)
         self.cart_layout.addWidget(QLabel("🛒 Cart"))
 
-        # Cart table
-        self.cart_table = QTableWidget(0, 5)
-        self.cart_table.setHorizontalHeaderLabels(["Item", "Qty", "Price", "Total", "Action"])
-        self.cart_table.setColumnWidth(4, 60)  # Make Delete column narrow
+        # Cart table (model/delegate: only changed rows are repainted)
+        # Cart logic (stock reservations, hold/resume, checkout) lives in Cart
+        # The ledger starts empty: the menu load and sync_held fill it after the first paint
+        self.cart = Cart(CART_ID, ledger=StockLedger(store=self.store),
+                         writer=store.writer if self.remote else None, store=self.store)
+        self.cart_items = self.cart.items  # {(name, price): {id, name, price, qty}}
+        self.cart_model = CartModel(self.cart_items)
+        self.cart_model.cart_changed.connect(self.update_totals)
+        # Stock is only reserved in memory while items sit in the cart
+        self.stock_ledger = self.cart.ledger
+        self.cart.add_listener(self.refresh_stock_buttons)
+        self.cart_model.cart_changed.connect(self.sync_stock)
+        self.cart_model.qty_validator = self.reserve_qty
+        self.cart_delegate = CartDelegate()
+        self.cart_delegate.delete_requested.connect(
+            lambda row: self.delete_item_from_cart(self.cart_model.keys[row])
+        )
+        self.cart_table = QTableView()
+        self.cart_table.setModel(self.cart_model)
+        self.cart_table.setItemDelegate(self.cart_delegate)
+        self.cart_table.setColumnWidth(COL_ACTION, 60)  # Make Delete column narrow
         self.cart_table.horizontalHeader().setStretchLastSection(True)
         self.cart_table.setSelectionBehavior(QAbstractItemView.SelectionBehavior.SelectRows)
+        self.cart_table.setEditTriggers(
+            QAbstractItemView.EditTrigger.CurrentChanged
+            | QAbstractItemView.EditTrigger.SelectedClicked
+            | QAbstractItemView.EditTrigger.DoubleClicked
+        )
         self.cart_layout.addWidget(self.cart_table)
 
         # Summary labels
         self.subtotal_label = QLabel("Subtotal: ₹0.00")
-        self.tax_label = QLabel("Tax (5%): ₹0.00")
+        self.tax_label = QLabel("Tax: ₹0.00")   # The rate is shown once settings are loaded
         self.total_label = QLabel("Total: ₹0.00")
         for label in [self.subtotal_label, self.tax_label, self.total_label]:
             label.setStyleSheet("font-weight: bold; font-size: 16px;")
@@ -95,15 +216,15 @@ class MainWindow(QMainWindow):
         main_layout.addWidget(self.menu_area, 70)
         main_layout.addWidget(self.cart_panel, 30)
 
-        self.cart_items = {}  # {item_id: {name, price, qty}}
-        self.current_held_id = None  # Tracks if current cart came from a held order
-        self.load_menu_items()
+        self.print_status = None  # Connected to the spooler on first print
+        self.last_order_id = None  # For F4 reprint
+        self.order_signals = None  # Connected to the order writer on first save
 
         # Connect buttons
         hold_btn.clicked.connect(self.hold_order)
         resume_btn.clicked.connect(self.resume_order)
         cancel_btn.clicked.connect(self.clear_cart)  # Cancel = clear cart
-        print_btn.clicked.connect(self.print_bill)
+        print_btn.clicked.connect(lambda: self.print_bill())  # Drop clicked's bool for the traced slot
         clear_btn.clicked.connect(self.clear_cart)
 
         # Keyboard shortcuts
@@ -116,153 +237,114 @@ class MainWindow(QMainWindow):
         self.print_shortcut = QShortcut(QKeySequence("F3"), self)
         self.print_shortcut.activated.connect(self.print_bill)
 
+        self.reprint_shortcut = QShortcut(QKeySequence("F4"), self)
+        self.reprint_shortcut.activated.connect(self.reprint_last_bill)
+
+        # Live settings: tax changes refresh the totals straight away, and a
+        # cheap data_version poll (on a background thread) picks up edits
+        # made by other processes
+        settings_signals().setting_changed.connect(self.on_setting_changed)
+
+        self.sweep_signals = HeldSweepSignals(self)
+        self.sweep_signals.expired.connect(self.on_held_orders_expired)
+
+        # Paint the empty window first; the menu and background work follow
+        QTimer.singleShot(0, self.finish_startup)
+
+    def finish_startup(self):
+        """Runs once the event loop is up (after the first paint)."""
+        startup.mark("first paint")
+        # Settings (for the tax rate), the menu and the held orders' stock
+        # reservations load on the DB thread, in that order
+        run_db(get_tax_percent).then(lambda tax_percent: self.update_totals())
+        self.load_menu_items().then(self.on_first_menu)
+        self.sync_held_stock()
+
+        # Database work runs off the UI thread; log anything that still blocks it
+        self.watchdog = UiWatchdog(parent=self)
+        self.watchdog.start()
+
+        if self.remote:
+            # The server expires held orders and pushes everyone's changes
+            self.server_signals = ServerEventSignals(self)
+            self.server_signals.event.connect(self.on_server_event)
+            self.store.add_listener(self.server_signals.event.emit)
+        else:
+            # Expired held orders are deleted in the background, off the F2 path
+            get_held_sweeper().add_listener(self.sweep_signals.expired.emit)
+            get_settings_watcher()
+            # Months past archive_after_days move out of canteen.db
+            get_order_archiver()
+            get_backup_service()
+        threading.Thread(target=_warm_up_printer, name="printer-warm-up", daemon=True).start()
+
+    def on_first_menu(self, rows):
+        startup.mark("menu ready")
+        startup.finish(report=self.profile_startup)
+
+    @property
+    def current_held_id(self):
+        """Held order id the cart was resumed from (None for a new cart)."""
+        return self.cart.held_id
+
     def load_menu_items(self):
-        """Load items from DB and create buttons (unlimited stock)."""
-        while self.menu_layout.count():
-            child = self.menu_layout.takeAt(0)
-            if child.widget():
-                child.widget().deleteLater()
-
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        cursor.execute("SELECT id, name, price FROM items WHERE available = 1 ORDER BY name")  # ← 3 columns only
-        items = cursor.fetchall()
-        conn.close()
-
-        if not items:
-            self.menu_layout.addWidget(QLabel("No items available"))
+        """Load items from DB in the background; returns the DbFuture."""
+        return run_db(self.store.get_menu_items).then(self.apply_menu_items)
+
+    @traced("MainWindow.apply_menu_items")
+    def apply_menu_items(self, rows):
+        """Update only the menu buttons that changed."""
+        # Menu colours show stock left after reservations, not raw DB stock
+        self.stock_ledger.refresh([(row[0], row[3]) for row in rows])
+        self.menu_grid.set_items([(row[0], row[1], row[2], self.stock_ledger.available(row[0])) for row in rows])
+        # Rebuild the search index and re-apply the current search
+        self.search_index.build([(row[0], row[1], row[4]) for row in rows])
+        self.filter_menu_items(self.search_bar.text())
+
+    @traced("MainWindow.add_to_cart")
+    def add_to_cart(self, item_id, name, price, current_stock):
+        """Add item to cart, reserving one unit in the stock ledger."""
+        key = self.cart.add(item_id, name, price)
+        if key is None:
+            self.statusBar().showMessage(f"❌ {name} is out of stock", 3000)
             return
+        self.cart_model.refresh_key(key)
 
-        row_widget = None
-        for i, (item_id, name, price) in enumerate(items):  # ← 3 values only
-            if i % 2 == 0:
-                row_widget = QWidget()
-                row_layout = QHBoxLayout(row_widget)
-                self.menu_layout.addWidget(row_widget)
-            btn = QPushButton(f"{name}\n₹{price:.2f}")
-            btn.setFixedSize(220, 90)
-            btn.setStyleSheet("""
-                QPushButton {
-                    font-size: 16px;
-                    background-color: #4CAF50;
-                    color: white;
-                    border: none;
-                    border-radius: 8px;
-                }
-                QPushButton:hover {
-                    background-color: #45a049;
-                }
-            """)
-            btn.clicked.connect(lambda iid=item_id, n=name, p=price: self.add_to_cart(iid, n, p))
-            row_layout.addWidget(btn)
-
-        # Add Admin button at bottom
-        admin_btn = QPushButton("⚙️ Admin Panel")
-        admin_btn.setFixedSize(220, 50)
-        admin_btn.setStyleSheet("""
-            QPushButton {
-                font-size: 14px;
-                background-color: #2196F3;
-                color: white;
-                border: none;
-                border-radius: 6px;
-            }
-        """)
-        admin_btn.clicked.connect(self.open_admin_panel)
-        self.menu_layout.addWidget(admin_btn)
+    def reserve_qty(self, key, new_qty):
+        """Qty validator for the cart table: reserve stock for a new quantity."""
+        if not self.cart.reserve_qty(key, new_qty):
+            self.statusBar().showMessage(f"❌ Not enough {self.cart_items[key]['name']} in stock", 3000)
+            return False
+        return True
 
-    def add_to_cart(self, item_id, name, price, current_stock):
-        """Add item to cart and reduce stock."""
+    def sync_stock(self):
+        """Make this till's reservations match the cart (after remove/clear/resume)."""
+        self.cart.sync_stock()
 
-        key = (name, price)
-        if key in self.cart_items:
-            self.cart_items[key]['qty'] += 1
-        else:
-            self.cart_items[key] = {'name': name, 'price': price, 'qty': 1}
-        
-        # Reduce stock in DB (if not unlimited)
-        if current_stock < 999:  # 999 = unlimited
-            from ..core.database import get_db_connection
-            conn = get_db_connection()
-            cursor = conn.cursor()
-            cursor.execute("UPDATE items SET stock_quantity = stock_quantity - 1 WHERE id = ?", (item_id,))
-            conn.commit()
-            conn.close()
-        
-        self.update_cart_display()
-        # Refresh menu to update stock colors
-        self.load_menu_items()
+    def sync_held_stock(self):
+        """Re-read held orders (in the background) so expired/deleted ones release their stock."""
+        run_db(self.stock_ledger.sync_held).then(self.refresh_stock_buttons)
 
+    def refresh_stock_buttons(self, item_ids):
+        for item_id in item_ids:
+            self.menu_grid.set_stock(item_id, self.stock_ledger.available(item_id))
+
+    @traced("MainWindow.update_cart_display")
     def update_cart_display(self):
-        """Refresh cart table and totals."""
-        self.cart_table.setRowCount(0)
-
-        subtotal = 0.0
-        for key, data in self.cart_items.items():
-            row = self.cart_table.rowCount()
-            self.cart_table.insertRow(row)
-
-            # Item name
-            name_item = QTableWidgetItem(data['name'])
-            name_item.setFlags(name_item.flags() & ~Qt.ItemFlag.ItemIsEditable)
-            self.cart_table.setItem(row, 0, name_item)
-
-            # Qty (with spin box)
-            qty_spin = QSpinBox()
-            qty_spin.setRange(1, 99)  # Keep min=1 since we have delete button
-            qty_spin.setValue(data['qty'])
-            qty_spin.valueChanged.connect(lambda q, k=key: self.update_qty(k, q))
-            self.cart_table.setCellWidget(row, 1, qty_spin)
-
-            # Price
-            price_item = QTableWidgetItem(f"₹{data['price']:.2f}")
-            price_item.setFlags(price_item.flags() & ~Qt.ItemFlag.ItemIsEditable)
-            self.cart_table.setItem(row, 2, price_item)
-
-            # Total
-            total = data['price'] * data['qty']
-            total_item = QTableWidgetItem(f"₹{total:.2f}")
-            total_item.setFlags(total_item.flags() & ~Qt.ItemFlag.ItemIsEditable)
-            self.cart_table.setItem(row, 3, total_item)
-
-            # Delete button
-            del_btn = QPushButton("🗑️")
-            del_btn.setStyleSheet("""
-                QPushButton {
-                    background-color: #f44336;
-                    color: white;
-                    border: none;
-                    padding: 2px;
-                    font-size: 12px;
-                }
-                QPushButton:hover {
-                    background-color: #d32f2f;
-                }
-            """)
-            del_btn.clicked.connect(lambda _, k=key: self.delete_item_from_cart(k))
-            self.cart_table.setCellWidget(row, 4, del_btn)
-
-            subtotal += total
-
-        # Update totals
-        tax_percent = 5.0
-        tax = subtotal * (tax_percent / 100)
-        total = subtotal + tax
+        """Resync the whole cart table (after clear/resume) and totals."""
+        self.cart_model.set_cart(self.cart_items)
+
+    def update_totals(self):
+        """Recompute subtotal/tax/total labels from the cart."""
+        subtotal, tax_percent, tax, total = self.cart.totals()
 
         self.subtotal_label.setText(f"Subtotal: ₹{subtotal:.2f}")
         self.tax_label.setText(f"Tax ({tax_percent}%): ₹{tax:.2f}")
         self.total_label.setText(f"Total: ₹{total:.2f}")
 
-    def update_qty(self, key, new_qty):
-        """Update or remove item from cart based on quantity."""
-        if new_qty <= 0:
-            # Remove item if qty is 0 or less
-            if key in self.cart_items:
-                del self.cart_items[key]
-        else:
-            # Update quantity
-            self.cart_items[key]['qty'] = new_qty
-        self.update_cart_display()
+    def on_setting_changed(self, name, value):
+        if name == "tax_percent":
+            self.update_totals()
 
     def clear_cart(self):
         """Empty the cart. If it's a resumed held order, ask whether to delete it."""
@@ -281,19 +363,18 @@ class MainWindow(QMainWindow):
 
             msg.exec()
 
-            clicked_btn = msg.clickedButton()
-            if clicked_btn == delete_btn:
-                # Delete the held order
-                from ..core.database import delete_held_order
-                delete_held_order(self.current_held_id)
-
-            # Always clear cart and reset
-            self.cart_items.clear()
-            self.current_held_id = None
+            # Always clear cart and reset (deleting the held order if asked)
+            delete = msg.clickedButton() == delete_btn
+            held_id = self.cart.detach()
             self.update_cart_display()
+            if delete:
+                run_db(_delete_held, self.store, self.stock_ledger, held_id).then(self.refresh_stock_buttons)
+            else:
+                # A kept held order gets its own reservation back
+                self.sync_held_stock()
         else:
             # Normal clear (not a resumed order)
-            self.cart_items.clear()
+            self.cart.detach()
             self.update_cart_display()
 
     def update_change_due(self):
@@ -328,6 +409,7 @@ class MainWindow(QMainWindow):
             self.change_label.setText("🔄 Change Due: ₹0.00")
             self.change_label.setStyleSheet("font-weight: bold; font-size: 16px; color: #4CAF50;")
 
+    @traced("MainWindow.print_bill")
     def print_bill(self):
         """Print receipt with cash handling."""
         if not self.cart_items:
@@ -359,75 +441,118 @@ class MainWindow(QMainWindow):
             return
 
         # Calculate totals
-        subtotal = sum(data['price'] * data['qty'] for data in self.cart_items.values())
-        from ..core.database import get_setting
-        tax_percent = float(get_setting("tax_percent", "5.0"))
-        tax = subtotal * (tax_percent / 100)
-        total = subtotal + tax
-
-        # Print receipt (pass cash amount)
-        from ..core.printer import print_receipt
-        print_receipt(self.cart_items, subtotal, tax, total, cash_received=cash)
-
-        # Save order
-        self.save_order()
+        subtotal, tax_percent, tax, total = self.cart.totals()
+
+        # Save order first so the receipt carries its bill number
+        # (a resumed held order is deleted by the checkout)
+        cart = self.cart.snapshot()
+        order_id = self.save_order()
+        if order_id is None:
+            return   # Not saved: the cart stays for another try
+        self.last_order_id = order_id
+
+        # Queue receipt (pass cash amount); printing happens in the background
+        self.connect_print_status()
+        run_db(_queue_receipt, cart, subtotal, tax, total, cash_received=cash, order_id=order_id).then(
+            self.on_receipt_queued
+        )
 
         # Reset cash fields
         self.cash_input.clear()
         self.change_label.setText("🔄 Change Due: ₹0.00")
 
-        # Delete held order if this was a resumed one
-        if self.current_held_id is not None:
-            from ..core.database import delete_held_order
-            delete_held_order(self.current_held_id)
-            self.current_held_id = None
+    def on_receipt_queued(self, job_id):
+        if job_id is None:
+            QMessageBox.warning(self, "Print Failed", "Receipt could not be queued for printing.\nThe order has been saved.")
+
+    def connect_print_status(self):
+        """Route spooler status to the status bar (on first print)."""
+        if self.print_status is None:
+            from ..core.printer import get_spooler
+            self.print_status = PrintStatusSignals(self)
+            self.print_status.job_status.connect(self.on_print_status)
+            get_spooler().add_listener(self.print_status.job_status.emit)
+
+    def reprint_last_bill(self):
+        """Reprint the last bill from the kept receipt (no re-rendering)."""
+        if self.last_order_id is None:
+            QMessageBox.information(self, "Reprint", "No bill printed yet.")
+            return
+        self.connect_print_status()
+        order_id = self.last_order_id
+        run_db(_queue_reprint, order_id).then(lambda job_id: self.on_reprint_queued(job_id, order_id))
+
+    def on_reprint_queued(self, job_id, order_id):
+        if job_id is None:
+            QMessageBox.warning(self, "Reprint Failed", f"Bill {order_id} could not be reprinted.")
+
+    def on_print_status(self, job_id, status, detail):
+        """Show receipt printing progress in the status bar."""
+        messages = {
+            "queued": "🖨️ Receipt queued",
+            "printing": "🖨️ Printing receipt...",
+            "retrying": "⚠️ Printer not responding, retrying",
+            "done": "✅ Receipt printed",
+            "failed": "❌ Receipt failed to print (kept in spool)",
+        }
+        text = messages.get(status, status)
+        if detail:
+            text += f": {detail}"
+        self.statusBar().showMessage(text, 5000)
 
     def save_order(self):
-        """Save completed order to database."""
-        import json
-        from datetime import datetime
-
-        conn = get_db_connection()
-        cursor = conn.cursor()
-
-        items_list = []
-        for item_id, data in self.cart_items.items():
-            items_list.append({
-                'id': item_id,
-                'name': data['name'],
-                'price': data['price'],
-                'qty': data['qty'],
-                'total': data['price'] * data['qty']
-            })
-
-        subtotal = sum(item['total'] for item in items_list)
-        tax_percent = 5.0
-        tax = subtotal * (tax_percent / 100)
-        total = subtotal + tax
-
-        cursor.execute(
-            """
-            INSERT INTO orders (date_time, total_amount, items_json, status)
-            VALUES (?, ?, ?, ?)
-            """,
-            (datetime.now().strftime("%Y-%m-%d %H:%M:%S"), total, json.dumps(items_list), "completed")
-        )
-        conn.commit()
-        conn.close()
+        """Queue completed order for the group-commit writer; returns its order id.
+
+        Returns None (cart kept) if the order could not be handed over,
+        e.g. the order server is unreachable.
+        """
+        if self.order_signals is None:
+            self.order_signals = OrderWriterSignals(self)
+            self.order_signals.order_written.connect(self.on_order_written)
+            self.cart.writer.add_listener(
+                lambda order_id, ok, error: self.order_signals.order_written.emit(order_id, ok, str(error or ""))
+            )
+        # Returns at once with the order id; the commit happens in the next batch
+        # (and deducts the cart's stock in the same transaction)
+        held_id = self.cart.held_id
+        try:
+            ticket = self.cart.checkout(delete_held=False)
+        except (ConnectionError, TimeoutError, RemoteError) as e:
+            QMessageBox.critical(self, "Save Failed", f"The order was not saved; the cart is kept.\n{e}")
+            return None
 
-        # Clear cart after saving
-        self.clear_cart()
+        # Cart is cleared after saving; a resumed held order is deleted in the background
+        self.update_cart_display()
+        if held_id is not None:
+            run_db(_delete_held, self.store, self.stock_ledger, held_id).then(self.refresh_stock_buttons)
+        return ticket.order_id
+
+    def on_order_written(self, order_id, ok, error):
+        # A failed order's stock goes back on the menu buttons
+        self.cart.order_written(order_id, ok)
+        if not ok:
+            QMessageBox.critical(self, "Save Failed", f"Order {order_id} could not be saved:\n{error}")
 
     def open_admin_panel(self):
+        if self.remote and not self.store.admin:
+            # The order server only takes menu and settings edits after the admin password
+            from PyQt6.QtWidgets import QInputDialog
+            password, ok = QInputDialog.getText(self, "Admin Panel", "Admin password:", QLineEdit.EchoMode.Password)
+            if ok:
+                run_db(self.store.login_admin, password).then(
+                    lambda _: self.open_admin_panel(),
+                    lambda error: QMessageBox.warning(self, "Admin Panel", f"Could not unlock the admin panel:\n{error}")
+                )
+            return
         from .admin_window import AdminWindow
-        self.admin_window = AdminWindow()
+        self.admin_window = AdminWindow(store=self.store)
         self.admin_window.exec()
+        # Pick up menu edits (only changed buttons are touched)
+        self.load_menu_items()
 
     def delete_item_from_cart(self, key):
         """Remove item from cart by key."""
-        if key in self.cart_items:
-            del self.cart_items[key]
-            self.update_cart_display()
+        self.cart_model.remove_key(key)
 
     def hold_order(self):
         """Save current cart as held order (create new or update existing)."""
@@ -436,97 +561,85 @@ class MainWindow(QMainWindow):
             QMessageBox.warning(self, "Empty Cart", "Cart is empty. Add items first.")
             return
 
-        try:
-            import json
-            from datetime import datetime
-            from ..core.database import get_db_connection
-
-            subtotal = sum(item['price'] * item['qty'] for item in self.cart_items.values())
-            tax_percent = 5.0
-            tax = subtotal * (tax_percent / 100)
-            total = subtotal + tax
-
-            conn = get_db_connection()
-            cursor = conn.cursor()
-
-            if self.current_held_id is not None:
-                # Update existing held order
-                cursor.execute(
-                    """
-                    UPDATE orders 
-                    SET date_time = ?, total_amount = ?, items_json = ?
-                    WHERE order_id = ? AND status = 'held'
-                    """,
-                    (datetime.now().strftime("%Y-%m-%d %H:%M:%S"), total, json.dumps(list(self.cart_items.values())), self.current_held_id)
-                )
-                order_id = self.current_held_id
-            else:
-                # Create new held order
-                cursor.execute(
-                    """
-                    INSERT INTO orders (date_time, total_amount, items_json, status)
-                    VALUES (?, ?, ?, 'held')
-                    """,
-                    (datetime.now().strftime("%Y-%m-%d %H:%M:%S"), total, json.dumps(list(self.cart_items.values())))
-                )
-                order_id = cursor.lastrowid
+        # The cart is cleared straight away; the held order is saved in the
+        # background and keeps its stock reserved
+        items = self.cart.snapshot()
+        held_id = self.cart.detach()
+        self.update_cart_display()
+        run_db(_save_held, self.store, self.stock_ledger, items, held_id).then(
+            self.on_order_held,
+            lambda error: self.on_hold_failed(error, items, held_id)
+        )
 
-            conn.commit()
-            conn.close()
+    def on_order_held(self, result):
+        held_id, changed = result
+        self.refresh_stock_buttons(changed)
+        QMessageBox.information(self, "Order Held", f"Order H{held_id:03} has been held.\nCart cleared for new customer.")
 
-            self.clear_cart()
-            self.current_held_id = None  # Reset after holding
-            from PyQt6.QtWidgets import QMessageBox
-            QMessageBox.information(self, "Order Held", f"Order H{order_id:03} has been held.\nCart cleared for new customer.")
-        except Exception as e:
-            print(f"❌ Hold error: {e}")
-            from PyQt6.QtWidgets import QMessageBox
-            QMessageBox.critical(self, "Hold Failed", "Failed to hold order.")
+    def on_hold_failed(self, error, items, held_id):
+        print(f"❌ Hold error: {error}")
+        # Put the order back unless the next customer's cart was started meanwhile
+        if not self.cart_items:
+            self.cart.load_held({'id': held_id, 'items': list(items.values())})
+            self.update_cart_display()
+        self.sync_held_stock()
+        QMessageBox.critical(self, "Hold Failed", "Failed to hold order.")
+
+    def on_held_orders_expired(self, held_ids):
+        """Release stock of held orders the sweeper deleted."""
+        # A resumed cart that expired stays on screen; holding it again re-creates it
+        self.sync_held_stock()
+        self.statusBar().showMessage(f"🧹 {len(held_ids)} old held order(s) automatically deleted.", 5000)
+
+    def on_server_event(self, event, data):
+        """Apply what other counters did (pushed by the order server)."""
+        if event == "stock":
+            self.refresh_stock_buttons(self.stock_ledger.update_stock(data))
+        elif event == "menu":
+            self.load_menu_items()
+        elif event == "held":
+            self.sync_held_stock()
+        elif event == "disconnected":
+            self.statusBar().showMessage("❌ Lost connection to the order server")
+            QMessageBox.critical(
+                self, "Order Server",
+                "Lost connection to the order server.\nRestart the till once the server is back."
+            )
 
     def resume_order(self):
-        """Show dialog to resume a held order."""
-        from PyQt6.QtWidgets import QMessageBox
-        held_orders, deleted_count = get_held_orders()  # ← Now returns count
-        
-        # Show notification if old orders were cleaned
-        if deleted_count > 0:
-            from PyQt6.QtWidgets import QMessageBox
-            QMessageBox.information(
-                self, 
-                "Held Orders Cleaned", 
-                f"{deleted_count} old held order(s) (>2 hours) automatically deleted."
-            )
-        
+        """Show dialog to resume a held order (the list is read in the background)."""
+        run_db(self.store.get_held_orders).then(self.show_resume_dialog)
+
+    def show_resume_dialog(self, held_orders):
         if not held_orders:
+            self.sync_held_stock()
             QMessageBox.information(self, "No Held Orders", "No orders are currently held.")
             return
 
-        dialog = ResumeDialog(held_orders)
-        if dialog.exec():
-            selected_order = held_orders[dialog.selected_order]
-            self.current_held_id = selected_order['id']
-            # Rebuild cart
-            self.cart_items = {}
-            for item in selected_order['items']:
-                key = (item['name'], item['price'])
-                self.cart_items[key] = {
-                    'name': item['name'],
-                    'price': item['price'],
-                    'qty': item['qty']
-                }
-            self.update_cart_display()
+        from .resume_dialog import ResumeDialog
+        dialog = ResumeDialog(held_orders, store=self.store)
+        if not dialog.exec():
+            # Held orders may have been deleted in the dialog
+            self.sync_held_stock()
+            return
+
+        # Primary-key lookup; it may have expired while the dialog was open
+        run_db(self.store.get_held_order, dialog.held_orders[dialog.selected_order]['id']).then(self.on_held_order_loaded)
+
+    def on_held_order_loaded(self, order):
+        if order is None:
+            self.sync_held_stock()
+            QMessageBox.warning(self, "Held Order Expired", "That held order no longer exists.")
+            return
+        # Its stock moves from the held reservation to this cart
+        self.cart.load_held(order)
+        self.update_cart_display()
+        self.sync_held_stock()
 
     def filter_menu_items(self, text):
-        """Filter menu buttons by search text."""
-        text = text.lower()
-        for i in range(self.menu_widget.layout().count()):
-            widget = self.menu_widget.layout().itemAt(i).widget()
-            if widget and isinstance(widget, QWidget):
-                # Check if it's a row widget
-                for child in widget.findChildren(QPushButton):
-                    visible = text in child.text().lower()
-                    widget.setVisible(visible)
-                    break
+        """Filter menu buttons by search text (prefix, substring, category, fuzzy)."""
+        visible = self.search_index.search(text) if text.strip() else None
+        self.menu_grid.set_filter(visible)
 
     def refresh_menu(self):
         """Refresh menu buttons from DB."""
@@ -0,0 +1,135 @@
+# src/views/menu_grid.py
+from PyQt6.QtWidgets import QWidget, QGridLayout, QPushButton, QLabel
+from PyQt6.QtCore import pyqtSignal
+from ..core.stock_ledger import UNLIMITED_STOCK
+
+LOW_STOCK_THRESHOLD = 10
+COLUMNS = 2
+
+# One stylesheet for the whole grid; buttons pick a colour via the "stock" property
+MENU_GRID_STYLE = """
+    QPushButton {
+        font-size: 16px;
+        color: white;
+        border: none;
+        border-radius: 8px;
+        background-color: #4CAF50;
+    }
+    QPushButton:hover { background-color: #45a049; }
+    QPushButton[stock="low"] { background-color: #FF9800; }
+    QPushButton[stock="low"]:hover { background-color: #F57C00; }
+    QPushButton[stock="out"] { background-color: #9E9E9E; }
+"""
+
+def stock_state(stock):
+    """Return 'out', 'low' or 'ok' for a stock quantity."""
+    if stock >= UNLIMITED_STOCK:
+        return "ok"
+    if stock <= 0:
+        return "out"
+    if stock < LOW_STOCK_THRESHOLD:
+        return "low"
+    return "ok"
+
+class MenuGrid(QWidget):
+    """Grid of menu buttons that patches changed buttons in place."""
+
+    # item_id, name, price, current stock
+    item_clicked = pyqtSignal(int, str, float, int)
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.setStyleSheet(MENU_GRID_STYLE)
+        self.grid = QGridLayout(self)
+        self.items = {}      # {item_id: (name, price, stock)}
+        self.buttons = {}    # {item_id: QPushButton}
+        self.order = None    # item ids in display order (None until the first set_items)
+        self.visible_ids = None  # None = no search filter
+        self.empty_label = None
+
+    def set_items(self, rows):
+        """Show (id, name, price, stock) rows, rebuilding only if the item set changed."""
+        new_items = {item_id: (name, price, stock) for item_id, name, price, stock in rows}
+        new_order = [row[0] for row in rows]
+        # Also on the first load, so an empty menu gets its "No items" label
+        if self.order is None or new_order != self.order:
+            self.items = new_items
+            self.order = new_order
+            self.rebuild()
+            return
+
+        for item_id, data in new_items.items():
+            if data != self.items[item_id]:
+                self.items[item_id] = data
+                self.patch_button(item_id)
+
+    def set_stock(self, item_id, stock):
+        """Update one item's stock and recolour its button."""
+        if item_id not in self.items:
+            return
+        name, price, old_stock = self.items[item_id]
+        if stock != old_stock:
+            self.items[item_id] = (name, price, stock)
+            self.patch_button(item_id)
+
+    def stock_of(self, item_id):
+        return self.items[item_id][2]
+
+    def rebuild(self):
+        """Recreate all buttons (only when items are added/removed/reordered)."""
+        for btn in self.buttons.values():
+            btn.deleteLater()
+        self.buttons.clear()
+        if self.empty_label is not None:
+            self.empty_label.deleteLater()
+            self.empty_label = None
+
+        if not self.order:
+            self.empty_label = QLabel("No items available")
+            self.grid.addWidget(self.empty_label, 0, 0)
+            return
+
+        for item_id in self.order:
+            btn = QPushButton()
+            btn.setFixedSize(220, 90)
+            btn.clicked.connect(lambda _, iid=item_id: self.on_button_clicked(iid))
+            self.buttons[item_id] = btn
+            self.patch_button(item_id)
+        self.layout_buttons()
+
+    def set_filter(self, visible_ids):
+        """Show only the given item ids (None shows everything)."""
+        if visible_ids != self.visible_ids:
+            self.visible_ids = visible_ids
+            self.layout_buttons()
+
+    def layout_buttons(self):
+        """Place visible buttons in grid order so filtered results have no gaps."""
+        shown = [iid for iid in self.order or () if self.visible_ids is None or iid in self.visible_ids]
+        for btn in self.buttons.values():
+            self.grid.removeWidget(btn)
+            btn.hide()
+        for i, item_id in enumerate(shown):
+            btn = self.buttons[item_id]
+            self.grid.addWidget(btn, i // COLUMNS, i % COLUMNS)
+            btn.show()
+
+    def patch_button(self, item_id):
+        """Refresh label, stock colour and enabled state of one button."""
+        name, price, stock = self.items[item_id]
+        btn = self.buttons[item_id]
+        label = f"{name}\n₹{price:.2f}"
+        if stock < UNLIMITED_STOCK:
+            label += f"  ({max(stock, 0)} left)"
+        btn.setText(label)
+        state = stock_state(stock)
+        btn.setEnabled(state != "out")
+        if btn.property("stock") != state:
+            btn.setProperty("stock", state)
+            # Re-evaluate the [stock=...] selectors for this button only
+            btn.style().unpolish(btn)
+            btn.style().polish(btn)
+
+    def on_button_clicked(self, item_id):
+        name, price, stock = self.items[item_id]
+        self.item_clicked.emit(item_id, name, price, stock)
@@ -4,13 +4,26 @@ from PyQt6.QtWidgets import (
     QPushButton, QLabel, QCheckBox, QMessageBox
 )
 from PyQt6.QtCore import Qt
+from ..core import database
+from .db_executor import run_db
+
+def _delete_held_orders(store, held_ids):
+    for held_id in held_ids:
+        store.delete_held_order(held_id)
+
+def _expire_now(store):
+    """Expire old held orders now; returns (ttl minutes, deleted count, remaining held orders)."""
+    ttl_minutes = database.get_held_ttl_minutes()
+    deleted_count = len(store.expire_held_orders(ttl_minutes))
+    return ttl_minutes, deleted_count, store.get_held_orders() if deleted_count else None
 
 class ResumeDialog(QDialog):
-    def __init__(self, held_orders):
+    def __init__(self, held_orders, store=None):
         super().__init__()
         self.setWindowTitle("Resume / Manage Held Orders")
         self.resize(600, 500)
         self.held_orders = held_orders
+        self.store = store or database
         self.selected_order = None
         self.setup_ui()
 
@@ -105,21 +118,26 @@ class ResumeDialog(QDialog):
             QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No
         )
         if reply == QMessageBox.StandardButton.Yes:
-            from ..core.database import delete_held_order
-            # Delete from DB (in reverse order to avoid index shift)
-            for i in sorted(selected, reverse=True):
-                order_id = self.held_orders[i]['id']
-                delete_held_order(order_id)
-                # Remove from local list
-                del self.held_orders[i]
-                # Remove from UI
-                self.list_widget.takeItem(i)
-                del self.checkboxes[i]
-            # Reset select all
-            self.select_all_checkbox.setChecked(False)
-            if not self.held_orders:
-                QMessageBox.information(self, "All Cleared", "No held orders remaining.")
-                self.reject()
+            held_ids = [self.held_orders[i]['id'] for i in selected]
+            run_db(_delete_held_orders, self.store, held_ids).then(
+                lambda _: self.remove_orders(selected),
+                lambda e: QMessageBox.critical(self, "Delete Failed", f"Held orders could not be deleted:\n{e}")
+            )
+
+    def remove_orders(self, selected):
+        """Drop deleted held orders from the list."""
+        # In reverse order to avoid index shift
+        for i in sorted(selected, reverse=True):
+            # Remove from local list
+            del self.held_orders[i]
+            # Remove from UI
+            self.list_widget.takeItem(i)
+            del self.checkboxes[i]
+        # Reset select all
+        self.select_all_checkbox.setChecked(False)
+        if not self.held_orders:
+            QMessageBox.information(self, "All Cleared", "No held orders remaining.")
+            self.reject()
 
     def delete_all(self):
         """Delete all held orders."""
@@ -132,32 +150,25 @@ class ResumeDialog(QDialog):
             QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No
         )
         if reply == QMessageBox.StandardButton.Yes:
-            from ..core.database import get_db_connection
-            conn = get_db_connection()
-            cursor = conn.cursor()
-            cursor.execute("DELETE FROM orders WHERE status = 'held'")
-            conn.commit()
-            conn.close()
-            QMessageBox.information(self, "Deleted", "All held orders deleted.")
-            self.held_orders.clear()
-            self.list_widget.clear()
-            self.checkboxes.clear()
-            self.select_all_checkbox.setChecked(False)
+            run_db(self.store.delete_all_held_orders).then(
+                self.on_all_deleted,
+                # On an order server this needs the admin password (Admin Panel)
+                lambda error: QMessageBox.warning(self, "Delete All", f"Could not delete the held orders:\n{error}")
+            )
+
+    def on_all_deleted(self, deleted_count):
+        QMessageBox.information(self, "Deleted", "All held orders deleted.")
+        self.held_orders.clear()
+        self.list_widget.clear()
+        self.checkboxes.clear()
+        self.select_all_checkbox.setChecked(False)
 
     def cleanup_old_orders(self):
-        """Manually delete held orders older than 2 hours."""
-        from datetime import datetime, timedelta
-        from ..core.database import get_db_connection
-        
-        cutoff_time = (datetime.now() - timedelta(hours=2)).strftime("%Y-%m-%d %H:%M:%S")
-        
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        cursor.execute("DELETE FROM orders WHERE status = 'held' AND date_time < ?", (cutoff_time,))
-        deleted_count = cursor.rowcount
-        conn.commit()
-        conn.close()
-        
+        """Delete expired held orders now (in the background)."""
+        run_db(_expire_now, self.store).then(self.on_cleanup_done)
+
+    def on_cleanup_done(self, result):
+        ttl_minutes, deleted_count, held_orders = result
         if deleted_count > 0:
             from PyQt6.QtWidgets import QMessageBox
             QMessageBox.information(
@@ -166,8 +177,6 @@ class ResumeDialog(QDialog):
                 f"{deleted_count} old held order(s) deleted."
             )
             # Refresh the list
-            from ..core.database import get_held_orders
-            held_orders, _ = get_held_orders()
             self.held_orders = held_orders
             self.list_widget.clear()
             self.checkboxes.clear()
@@ -182,4 +191,4 @@ class ResumeDialog(QDialog):
             self.select_all_checkbox.setChecked(False)
         else:
             from PyQt6.QtWidgets import QMessageBox
-            QMessageBox.information(self, "No Old Orders", "No held orders older than 2 hours.")
\ No newline at end of file
+            QMessageBox.information(self, "No Old Orders", f"No held orders older than {ttl_minutes} minutes.")
\ No newline at end of file
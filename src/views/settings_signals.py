@@ -0,0 +1,18 @@
+# src/views/settings_signals.py
+from PyQt6.QtCore import QObject, pyqtSignal
+from ..core.database import add_settings_listener
+
+class SettingsSignals(QObject):
+    """Re-emits core settings changes as a Qt signal."""
+    setting_changed = pyqtSignal(str, str)  # name, value
+
+_instance = None
+
+def settings_signals():
+    """Return the shared SettingsSignals object (created on first use)."""
+    global _instance
+    if _instance is None:
+        _instance = SettingsSignals()
+        # Queued to the receiver's thread if set_setting runs on a worker
+        add_settings_listener(_instance.setting_changed.emit)
+    return _instance
@@ -0,0 +1,77 @@
+# src/views/ui_watchdog.py
+import os
+import sys
+import threading
+import time
+import traceback
+from PyQt6.QtCore import QObject, QTimer
+from ..core.config import UI_STALL_MS, UI_WATCHDOG_INTERVAL_MS
+from ..core import perf
+
+def _where(frame, depth=3):
+    """Innermost frames of a stack as "func (file:line) < caller ..."."""
+    frames = traceback.extract_stack(frame)[-depth:]
+    return " < ".join(
+        f"{f.name} ({os.path.basename(f.filename)}:{f.lineno})" for f in reversed(frames)
+    )
+
+class UiWatchdog(QObject):
+    """Logs UI-thread stalls longer than UI_STALL_MS.
+
+    A timer on the UI thread stamps a heartbeat. A monitor thread that
+    sees the heartbeat go stale grabs the UI thread's stack (where it is
+    stuck); the next heartbeat logs how long the stall lasted and records
+    it as "ui.stall" in Admin → Performance.
+    """
+
+    def __init__(self, threshold_ms=UI_STALL_MS, interval_ms=UI_WATCHDOG_INTERVAL_MS, parent=None):
+        super().__init__(parent)
+        self.threshold = threshold_ms / 1000.0
+        self.interval = interval_ms / 1000.0
+        self.stalls = 0
+        self._ui_thread = threading.get_ident()
+        self._beat = time.monotonic()
+        self._stuck_at = None   # (heartbeat, stack) caught by the monitor
+        self._stop = threading.Event()
+        self._monitor = None
+        self._timer = QTimer(self)
+        self._timer.setInterval(interval_ms)
+        self._timer.timeout.connect(self._heartbeat)
+
+    def start(self):
+        if self._monitor is not None:
+            return
+        self._beat = time.monotonic()
+        self._stop.clear()
+        self._timer.start()
+        self._monitor = threading.Thread(target=self._watch, name="ui-watchdog", daemon=True)
+        self._monitor.start()
+
+    def stop(self):
+        self._timer.stop()
+        self._stop.set()
+        self._monitor = None
+
+    def _heartbeat(self):
+        now = time.monotonic()
+        last, self._beat = self._beat, now
+        stalled = now - last - self.interval
+        if stalled <= self.threshold:
+            return
+        self.stalls += 1
+        ms = stalled * 1000
+        perf.record("ui.stall", ms)
+        stuck_at = self._stuck_at
+        where = f" in {stuck_at[1]}" if stuck_at and stuck_at[0] == last else ""
+        print(f"⚠️ UI thread stalled for {ms:.0f} ms{where}")
+
+    def _watch(self):
+        seen = None
+        while not self._stop.wait(self.interval):
+            beat = self._beat
+            if beat == seen or time.monotonic() - beat <= self.threshold + self.interval:
+                continue
+            seen = beat
+            frame = sys._current_frames().get(self._ui_thread)
+            if frame is not None:
+                self._stuck_at = (beat, _where(frame))
@@ -0,0 +1,17 @@
+# tests/conftest.py
+import pytest
+from src.core import database
+
+@pytest.fixture
+def temp_db(tmp_path, monkeypatch):
+    """Point the database module at a fresh, migrated canteen.db in tmp_path."""
+    monkeypatch.setattr(database, "DB_PATH", str(tmp_path / "canteen.db"))
+    monkeypatch.setattr(database, "ARCHIVE_DIR", str(tmp_path / "archive"))
+    monkeypatch.setattr(database, "_settings_cache", None)
+    monkeypatch.setattr(database, "_settings_seen_version", None)
+    monkeypatch.setattr(database, "_settings_seen_revision", None)
+    monkeypatch.setattr(database, "_settings_listeners", [])
+    database.init_db(progress=lambda *args: None)
+    yield database
+    database.close_db_connection()
+    database._settings_cache = None
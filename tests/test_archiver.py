@@ -0,0 +1,50 @@
+# tests/test_archiver.py
+import os
+from datetime import datetime
+from src.core.archiver import archive_old_orders
+
+ITEMS = [{'id': 1, 'name': 'Tea', 'price': 10.0, 'qty': 2, 'total': 20.0},
+         {'id': 3, 'name': 'Sandwich', 'price': 30.0, 'qty': 1, 'total': 30.0}]
+
+def add_orders(db, times):
+    conn = db.get_db_connection()
+    cursor = conn.cursor()
+    for date_time in times:
+        db.write_completed_order(cursor, ITEMS, 50.0, date_time)
+    conn.commit()
+
+def page_ids(db, **kwargs):
+    ids, before_id = [], None
+    while True:
+        page = db.get_orders_page(before_id=before_id, limit=2, **kwargs)
+        if not page:
+            return ids
+        ids += [row[0] for row in page]
+        before_id = page[-1][0]
+
+def test_archived_months_read_like_live_ones(temp_db):
+    now = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    add_orders(temp_db, ["2024-01-05 09:00:00", "2024-01-20 13:00:00",
+                         "2024-02-11 12:30:00", now])
+    before = (temp_db.get_all_orders(), page_ids(temp_db), temp_db.count_sales_lines(),
+              list(temp_db.iter_sales_lines()))
+
+    assert archive_old_orders(keep_days=30) == ["2024-01", "2024-02"]
+    assert os.path.exists(temp_db.archive_path("2024-01"))
+    conn = temp_db.get_db_connection()
+    assert conn.execute("SELECT COUNT(*) FROM main.orders").fetchone()[0] == 1
+    assert conn.execute("SELECT COUNT(*) FROM main.order_lines").fetchone()[0] == 2
+
+    after = (temp_db.get_all_orders(), page_ids(temp_db), temp_db.count_sales_lines(),
+             list(temp_db.iter_sales_lines()))
+    assert after == before
+    # A range inside one archived month only reads that month
+    assert len(page_ids(temp_db, start="2024-02-01 00:00:00", end="2024-03-01 00:00:00")) == 1
+
+def test_rerun_and_setting(temp_db):
+    add_orders(temp_db, ["2024-03-01 10:00:00"])
+    assert archive_old_orders(keep_days=0) == []
+    temp_db.set_setting("archive_after_days", "30")
+    assert archive_old_orders() == ["2024-03"]
+    assert archive_old_orders() == []
+    assert len(temp_db.get_all_orders()) == 1
@@ -0,0 +1,56 @@
+# tests/test_order_ids.py
+import threading
+import pytest
+from src.core.order_writer import OrderWriter
+
+ITEMS = [{'id': None, 'name': 'Tea', 'price': 10.0, 'qty': 1}]
+
+def test_reserved_blocks_do_not_overlap(temp_db):
+    first = temp_db.reserve_order_ids(10)
+    second = temp_db.reserve_order_ids(10)
+    assert second == first + 10
+    assert temp_db.save_completed_order(ITEMS, 10.0) == second + 10
+
+def test_release_hands_back_the_newest_block(temp_db):
+    first = temp_db.reserve_order_ids(10)
+    assert temp_db.release_order_ids(first, first + 9)
+    assert temp_db.reserve_order_ids(10) == first
+
+def test_release_skips_a_block_reserved_before_another(temp_db):
+    first = temp_db.reserve_order_ids(10)
+    temp_db.reserve_order_ids(10)
+    assert not temp_db.release_order_ids(first, first + 9)
+    assert temp_db.reserve_order_ids(1) == first + 20
+
+# With a block of 4 the writer has already reserved the next one when it stops
+@pytest.mark.parametrize("id_block", [100, 4])
+def test_bill_numbers_carry_on_after_a_restart(temp_db, id_block):
+    writer = OrderWriter(batch_ms=1, id_block=id_block)
+    writer.start()
+    ids = [writer.submit(ITEMS, 10.0).order_id for _ in range(3)]
+    writer.stop()
+    assert ids == [ids[0], ids[0] + 1, ids[0] + 2]
+
+    writer = OrderWriter(batch_ms=1, id_block=id_block)
+    writer.start()
+    ticket = writer.submit(ITEMS, 10.0)
+    writer.stop()
+    assert ticket.committed
+    assert ticket.order_id == ids[-1] + 1
+
+def test_ids_are_reserved_on_the_writer_thread(temp_db, monkeypatch):
+    from src.core import order_writer
+    threads = []
+
+    def reserve(count):
+        threads.append(threading.current_thread().name)
+        return temp_db.reserve_order_ids(count)
+
+    monkeypatch.setattr(order_writer, "reserve_order_ids", reserve)
+    writer = OrderWriter(batch_ms=1, id_block=4)
+    writer.start()
+    tickets = [writer.submit(ITEMS, 10.0) for _ in range(10)]
+    writer.stop()
+    assert all(ticket.committed for ticket in tickets)
+    assert len({ticket.order_id for ticket in tickets}) == 10
+    assert threads and set(threads) == {"order-writer"}
@@ -0,0 +1,20 @@
+# tests/test_order_lines.py
+from src.core.order_writer import OrderWriter
+
+def test_checkout_of_an_item_deleted_from_the_menu(temp_db):
+    item_id = temp_db.add_menu_item("Vada", "Snacks", 12.0)
+    items = [{'id': item_id, 'name': 'Vada', 'price': 12.0, 'qty': 2, 'total': 24.0},
+             {'id': 1, 'name': 'Tea', 'price': 10.0, 'qty': 1, 'total': 10.0}]
+    temp_db.delete_menu_item(item_id)
+
+    writer = OrderWriter(batch_ms=1)
+    writer.start()
+    ticket = writer.submit(items, 34.0)
+    writer.stop()
+    assert ticket.committed, ticket.error
+
+    lines = temp_db.get_db_connection().execute(
+        "SELECT item_id, name, qty FROM order_lines WHERE order_id = ? ORDER BY line_id", (ticket.order_id,)
+    ).fetchall()
+    assert [tuple(line) for line in lines] == [(None, 'Vada', 2), (1, 'Tea', 1)]
+    assert temp_db.get_most_sold_items(5)[0] == (('Vada', 12.0), 2)
@@ -0,0 +1,101 @@
+# tests/test_order_protocol.py
+import asyncio
+import threading
+from datetime import date, timedelta
+import numpy as np
+import pytest
+from src.core.analytics import sales_analytics
+from src.core.order_client import OrderClient, RemoteError
+from src.core.order_server import OrderServer
+
+SECRET = "s3cret"
+ITEMS = [{'id': 1, 'name': 'Tea', 'price': 10.0, 'qty': 2, 'total': 20.0}]
+
+@pytest.fixture
+def server_address(temp_db, tmp_path):
+    """Run an order server on a Unix socket for one test; yields its address."""
+    address = f"unix:{tmp_path / 'orders.sock'}"
+    server = OrderServer(address, secret=SECRET)
+    loop = asyncio.new_event_loop()
+    loop.run_until_complete(server.start())
+    thread = threading.Thread(target=loop.run_forever, daemon=True)
+    thread.start()
+    yield address
+    asyncio.run_coroutine_threadsafe(server.close(), loop).result(10)
+    loop.call_soon_threadsafe(loop.stop)
+    thread.join()
+    loop.close()
+
+@pytest.fixture
+def client(server_address):
+    client = OrderClient(server_address, timeout=5, secret=SECRET)
+    client.connect()
+    yield client
+    client.close()
+
+def test_wrong_secret_is_refused(server_address):
+    client = OrderClient(server_address, timeout=5, secret="guess")
+    with pytest.raises(RemoteError, match="secret"):
+        client.connect()
+    client.close()
+
+def test_open_tcp_port_needs_a_secret():
+    server = OrderServer("0.0.0.0:8765", secret="")
+    with pytest.raises(ValueError, match="POS_SERVER_SECRET"):
+        asyncio.run(server.start())
+
+def test_reads_round_trip(client, temp_db):
+    assert [tuple(row) for row in client.get_menu_items()] == temp_db.get_menu_items()
+    assert [tuple(row) for row in client.get_item_stock([1, 2])] == temp_db.get_item_stock([1, 2])
+
+def test_admin_password_never_crosses_the_wire(client):
+    assert "admin_password" not in client.get_all_settings()
+    client.login_admin("1234")
+    with pytest.raises(RemoteError, match="admin_password"):
+        client.set_settings({"admin_password": "0000"})
+
+def test_admin_calls_need_the_admin_password(client, temp_db):
+    with pytest.raises(RemoteError, match="admin password"):
+        client.add_menu_item("Vada", "Snacks", 12.0)
+    with pytest.raises(RemoteError, match="admin password"):
+        client.delete_all_held_orders()
+    with pytest.raises(RemoteError, match="Wrong admin password"):
+        client.login_admin("0000")
+    client.login_admin("1234")
+    item_id = client.add_menu_item("Vada", "Snacks", 12.0)
+    assert item_id in [row[0] for row in temp_db.get_menu_items()]
+    client.set_settings({"tax_percent": "12.0"})
+    assert temp_db.get_setting("tax_percent") == "12.0"
+
+def test_checkout_round_trip(client, temp_db):
+    ticket = client.writer.submit(ITEMS, 20.0)
+    assert ticket.wait(5)
+    order = temp_db.get_orders_page(order_id=ticket.order_id)[0]
+    assert order[0] == ticket.order_id
+
+def test_checkout_needs_a_reserved_order_id(client, temp_db):
+    first = client.reserve_order_ids(10)
+    assert client.call("checkout", ITEMS, 20.0, order_id=first + 3) == first + 3
+    with pytest.raises(RemoteError, match="not reserved"):
+        client.call("checkout", ITEMS, 20.0, order_id=first + 50)
+    with pytest.raises(RemoteError):
+        client.reserve_order_ids(10 ** 9)
+
+def test_analytics_round_trip(client, temp_db):
+    assert client.writer.submit(ITEMS, 20.0).wait(5)
+    start, end = date.today() - timedelta(days=6), date.today()
+    assert client.get_hourly_rollup(start.isoformat(), end.isoformat()) != []
+    remote = sales_analytics(start, end, store=client)
+    local = sales_analytics(start, end)
+    assert remote.keys() == local.keys()
+    for name, value in local.items():
+        if isinstance(value, np.ndarray):
+            assert np.array_equal(remote[name], value), name
+        else:
+            assert remote[name] == value, name
+    assert remote['orders'] == 1 and remote['units'] == 2
+
+def test_expiry_uses_the_servers_ttl(client, temp_db):
+    held_id = temp_db.save_held_order({"Tea": ITEMS[0]})
+    assert client.expire_held_orders(0) == []
+    assert [order['id'] for order in temp_db.get_held_orders()] == [held_id]
@@ -0,0 +1,15 @@
+# tests/test_perf.py
+from src.core import perf
+
+def test_nothing_is_recorded_while_timing_is_off(monkeypatch):
+    monkeypatch.setattr(perf, "_enabled", True)
+    perf.reset()
+    perf.record("test.op", 1.5)
+    perf.set_enabled(False)
+    perf.record("test.op", 2.5)
+    with perf.span("test.span"):
+        pass
+    assert perf._stats["test.op"].calls == 1
+    assert "test.span" not in perf._stats
+    assert len(perf._recent) == 1
+    perf.reset()
@@ -0,0 +1,27 @@
+# tests/test_search.py
+from src.core.search import MenuSearchIndex
+
+ROWS = [(1, "Dark Rice", "Meals"), (2, "Dry Fruit", "Snacks"), (3, "Tea", "Drinks")]
+
+def test_typing_into_fuzzy_matches_what_a_fresh_search_does():
+    index = MenuSearchIndex(ROWS)
+    index.search("d")
+    index.search("dr")
+    typed = index.search("dri")
+    assert typed == MenuSearchIndex(ROWS).search("dri")
+    assert 1 in typed        # "dri" ~ "Dark RIce"
+
+def test_fuzzy_query_narrows_previous_fuzzy_matches():
+    index = MenuSearchIndex(ROWS)
+    assert index.search("dar") == {1}
+    assert index.search("dark") == {1}
+    assert index.search("darkx") == set()
+
+def test_backspace_widens_again():
+    index = MenuSearchIndex(ROWS)
+    index.search("tea")
+    assert index.search("t") == MenuSearchIndex(ROWS).search("t")
+
+def test_abbreviation_matches():
+    index = MenuSearchIndex([(1, "Paneer Butter Masala", "Meals"), (2, "Tea", "Drinks")])
+    assert index.search("pbm") == {1}
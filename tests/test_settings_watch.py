@@ -0,0 +1,23 @@
+# tests/test_settings_watch.py
+import sqlite3
+
+def test_only_settings_writes_trigger_a_reload(temp_db, monkeypatch):
+    database = temp_db
+    database.reload_settings()
+    reloads = []
+    reload_settings = database.reload_settings
+    monkeypatch.setattr(database, "reload_settings", lambda: reloads.append(1) or reload_settings())
+
+    other = sqlite3.connect(database.DB_PATH)
+    other.execute("INSERT INTO items (name, price) VALUES ('Idli', 30.0)")
+    other.commit()
+    database.check_settings_changed()
+    database.check_settings_changed()
+    assert reloads == []
+
+    other.execute("INSERT OR REPLACE INTO settings (name, value) VALUES ('tax_percent', '7.5')")
+    other.commit()
+    other.close()
+    database.check_settings_changed()
+    assert reloads == [1]
+    assert database.get_setting("tax_percent") == "7.5"
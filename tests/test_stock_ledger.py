@@ -0,0 +1,106 @@
+# tests/test_stock_ledger.py
+from src.core.order_writer import OrderTicket
+from src.core.stock_ledger import StockLedger, UNLIMITED_STOCK
+from src.models.cart import Cart
+
+class MenuStore:
+    """Just what StockLedger reads: two items and no held orders."""
+
+    def get_item_stock(self, item_ids=None):
+        return [(1, 5), (2, UNLIMITED_STOCK)]
+
+    def get_held_order_items(self):
+        return []
+
+class ManualWriter:
+    """Writer that reports orders only when told to."""
+
+    def __init__(self):
+        self.listeners = []
+        self.next_id = 1
+
+    def add_listener(self, callback):
+        self.listeners.append(callback)
+
+    def submit(self, items_list, total):
+        ticket = OrderTicket(self.next_id, items_list, total, "2026-01-01 12:00:00")
+        self.next_id += 1
+        return ticket
+
+    def report(self, order_id, ok):
+        for callback in self.listeners:
+            callback(order_id, ok, None if ok else RuntimeError("disk full"))
+
+def make_ledger():
+    ledger = StockLedger(store=MenuStore())
+    ledger.refresh()
+    return ledger
+
+def test_reserve_stops_at_stock():
+    ledger = make_ledger()
+    assert ledger.reserve("a", 1, 3)
+    assert ledger.reserve("b", 1, 2)
+    assert not ledger.reserve("b", 1)
+    assert ledger.available(1) == 0
+    assert ledger.reserve("b", 2, 500)
+    assert ledger.available(2) == UNLIMITED_STOCK
+
+def test_release_gives_stock_back():
+    ledger = make_ledger()
+    ledger.reserve("a", 1, 4)
+    assert ledger.release("a") == {1}
+    assert ledger.available(1) == 5
+
+def test_commit_holds_stock_back_until_written():
+    ledger = make_ledger()
+    ledger.reserve("a", 1, 2)
+    ledger.reserve("b", 1, 1)
+    assert ledger.commit("a", 10) == {1}
+    assert ledger.stock[1] == 5
+    assert ledger.available(1) == 2
+    ledger.release("b")
+    assert ledger.available(1) == 3
+    assert ledger.settle(10, True) == set()
+    assert ledger.available(1) == 3
+    # The next read of the DB includes the written order
+    ledger.refresh([(1, 3)])
+    assert ledger.available(1) == 3
+
+def test_refresh_during_a_write_that_fails():
+    ledger = make_ledger()
+    ledger.reserve("a", 1, 2)
+    ledger.commit("a", 10)
+    # Menu reload before the writer got to the order: DB still says 5
+    ledger.refresh([(1, 5)])
+    assert ledger.available(1) == 3
+    assert ledger.settle(10, False) == {1}
+    assert ledger.available(1) == 5
+
+def test_pushed_stock_replaces_written_orders():
+    ledger = make_ledger()
+    ledger.reserve("a", 1, 2)
+    ledger.commit("a", 10)
+    ledger.settle(10, True)
+    assert ledger.update_stock([(1, 3)]) == {1}
+    assert ledger.available(1) == 3
+
+def test_failed_order_gives_its_stock_back(temp_db):
+    ledger = make_ledger()
+    writer = ManualWriter()
+    cart = Cart("current", ledger=ledger, writer=writer, store=temp_db)
+    writer.add_listener(lambda order_id, ok, error: cart.order_written(order_id, ok))
+
+    cart.add(1, "Samosa", 15.0)
+    cart.add(1, "Samosa", 15.0)
+    first = cart.checkout()
+    cart.add(1, "Samosa", 15.0)
+    second = cart.checkout()
+    assert ledger.available(1) == 2
+
+    writer.report(first.order_id, False)
+    assert ledger.available(1) == 4
+    writer.report(second.order_id, True)
+    assert ledger.available(1) == 4
+    # Reported twice (or by another cart's listener): nothing changes
+    writer.report(first.order_id, False)
+    assert ledger.available(1) == 4